@@ -0,0 +1,346 @@
+"""
+Measures how the container flow generation scales with the size of the input data. Each scenario is a set of schedules
+that is added with the PortCallManager to a fresh SQLite database in a temporary directory. Then, the container flow is
+generated and exported to each file format. The results are written to a JSON file that can be compared with the
+results of a previous run, e.g. of the last release.
+
+Everything runs offline. Each scenario runs in its own process so that the peak memory usage of one scenario does not
+carry over to the next one.
+
+Examples:
+
+    python benchmarks/run_benchmarks.py --output baseline.json
+    python benchmarks/run_benchmarks.py --scenarios 1_week_10_services --compare-with baseline.json
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import pandas as pd
+
+import conflowgen
+from conflowgen import ContainerFlowGenerationManager, ExportFileFormat, ModeOfTransport, PortCallManager
+from conflowgen.container_flow_data_generation_process.export_container_flow_service import \
+    ExportContainerFlowService
+from conflowgen.database_connection.sqlite_database_connection import SqliteDatabaseConnection
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
+
+path_to_repository = os.path.join(os.path.dirname(os.path.realpath(__file__)), os.pardir)
+
+path_to_deham_cta_data = os.path.join(path_to_repository, "demo", "data", "DEHAM", "CT Altenwerder")
+
+
+class Scenario(NamedTuple):
+    """
+    A set of schedules for a time range.
+    """
+
+    #: The first day of the container flow
+    start_date: datetime.date
+
+    #: The last day of the container flow
+    end_date: datetime.date
+
+    #: Adds the schedules, the arguments are the port call manager, the start date, and the end date
+    add_schedules: Callable[[PortCallManager, datetime.date, datetime.date], None]
+
+
+def _add_synthetic_services(number_services: int) -> Callable[[PortCallManager, datetime.date, datetime.date], None]:
+    """
+    Services of all vehicle types take turns, their sizes are drawn with a fixed seed so that each run uses the same
+    schedules.
+    """
+
+    def add_schedules(port_call_manager: PortCallManager, start_date: datetime.date, _: datetime.date) -> None:
+        seeded_random = random.Random(x=1)
+        for i in range(number_services):
+            vehicle_type = ModeOfTransport.get_scheduled_vehicles()[i % 4]
+            if vehicle_type == ModeOfTransport.deep_sea_vessel:
+                capacity = seeded_random.randint(4000, 14000)
+                moved_capacity = int(capacity * seeded_random.uniform(0.04, 0.08))
+                vehicle_arrives_every_k_days = 7
+            elif vehicle_type == ModeOfTransport.feeder:
+                capacity = seeded_random.randint(400, 1600)
+                moved_capacity = int(capacity * seeded_random.uniform(0.15, 0.4))
+                vehicle_arrives_every_k_days = 7
+            elif vehicle_type == ModeOfTransport.barge:
+                capacity = seeded_random.randint(45, 210)
+                moved_capacity = int(capacity * seeded_random.uniform(0.3, 0.6))
+                vehicle_arrives_every_k_days = 3
+            else:
+                capacity = 96
+                moved_capacity = 96
+                vehicle_arrives_every_k_days = 2
+            port_call_manager.add_large_scheduled_vehicle(
+                vehicle_type=vehicle_type,
+                service_name=f"Benchmark-{vehicle_type}-{i}",
+                vehicle_arrives_at=start_date + datetime.timedelta(days=seeded_random.randint(0, 6)),
+                vehicle_arrives_at_time=datetime.time(hour=seeded_random.randint(0, 23)),
+                average_vehicle_capacity=capacity,
+                average_moved_capacity=moved_capacity,
+                vehicle_arrives_every_k_days=vehicle_arrives_every_k_days
+            )
+
+    return add_schedules
+
+
+def _add_deham_cta_schedules(
+        port_call_manager: PortCallManager,
+        start_date: datetime.date,
+        end_date: datetime.date
+) -> None:
+    """
+    Adds the same schedules as the demo of the Container Terminal Altenwerder (CTA) in the port of Hamburg.
+    """
+    seeded_random = random.Random(x=1)
+    for vehicle_type, file_name, minimum_utilization, maximum_utilization in (
+            (ModeOfTransport.feeder, "feeder_input.csv", 0.3 / 2, 0.8 / 2),
+            (ModeOfTransport.deep_sea_vessel, "deep_sea_vessel_input.csv", 0.25 / 2, 0.5 / 2),
+            (ModeOfTransport.barge, "barge_input.csv", 0.3, 0.6)
+    ):
+        df_vehicles = pd.read_csv(os.path.join(path_to_deham_cta_data, file_name), index_col=[0])
+        for _, row in df_vehicles.iterrows():
+            service_name = row["vehicle_name"] + "-unique"
+            arrival = pd.to_datetime(row["arrival (planned)"])
+            if not start_date <= arrival.date() <= end_date:
+                continue
+            if port_call_manager.has_schedule(service_name, vehicle_type=vehicle_type):
+                continue
+            capacity = row["capacity"]
+            port_call_manager.add_large_scheduled_vehicle(
+                vehicle_type=vehicle_type,
+                service_name=service_name,
+                vehicle_arrives_at=arrival.date(),
+                vehicle_arrives_at_time=arrival.time(),
+                average_vehicle_capacity=capacity,
+                average_moved_capacity=int(round(capacity * seeded_random.uniform(
+                    minimum_utilization, maximum_utilization))),
+                vehicle_arrives_every_k_days=-1
+            )
+
+    df_trains = pd.read_csv(os.path.join(path_to_deham_cta_data, "train_input.csv"), index_col=[0])
+    for _, row in df_trains.iterrows():
+        service_name = row["vehicle_name"]
+        if port_call_manager.has_schedule(service_name, vehicle_type=ModeOfTransport.train):
+            continue
+        port_call_manager.add_large_scheduled_vehicle(
+            vehicle_type=ModeOfTransport.train,
+            service_name=service_name,
+            vehicle_arrives_at=pd.to_datetime(row["arrival_day"]).date(),
+            # One of the half-hour slots between 1:00 and 5:30
+            vehicle_arrives_at_time=(
+                datetime.datetime.combine(datetime.date.min, datetime.time(hour=1))
+                + datetime.timedelta(minutes=30 * seeded_random.randint(0, 9))
+            ).time(),
+            average_vehicle_capacity=96,
+            average_moved_capacity=96,
+            vehicle_arrives_every_k_days=7
+        )
+
+
+scenarios: Dict[str, Scenario] = {
+    "1_week_10_services": Scenario(
+        start_date=datetime.date(2021, 7, 1),
+        end_date=datetime.date(2021, 7, 7),
+        add_schedules=_add_synthetic_services(10)
+    ),
+    "1_month_20_services": Scenario(
+        start_date=datetime.date(2021, 7, 1),
+        end_date=datetime.date(2021, 7, 31),
+        add_schedules=_add_synthetic_services(20)
+    ),
+    "3_months_40_services": Scenario(
+        start_date=datetime.date(2021, 7, 1),
+        end_date=datetime.date(2021, 9, 30),
+        add_schedules=_add_synthetic_services(40)
+    ),
+    "deham_cta": Scenario(
+        start_date=datetime.date(2021, 7, 1),
+        end_date=datetime.date(2021, 7, 31),
+        add_schedules=_add_deham_cta_schedules
+    ),
+}
+
+
+def _export(path_to_folder: str, file_format: ExportFileFormat) -> Optional[float]:
+    """
+    Returns: The time the export has taken or None if the file format is not supported in this environment
+    """
+    export_container_flow_service = ExportContainerFlowService()
+    start_time = time.perf_counter()
+    try:
+        # An absolute path replaces the default export folder so that nothing is written outside the temporary folder
+        export_container_flow_service.export(os.path.join(path_to_folder, file_format.value), file_format)
+    except (ImportError, ValueError) as error:  # e.g. pyarrow is not installed or pandas cannot write xls any more
+        print(f"Skipping export to {file_format.value}: {error}", file=sys.stderr)
+        return None
+    return time.perf_counter() - start_time
+
+
+def run_scenario(
+        scenario_name: str,
+        seed: int,
+        number_processes: Optional[int],
+        in_memory: bool,
+        defer_index_creation: bool
+) -> dict:
+    """
+    Runs one scenario in a fresh database.
+
+    Returns: The measurements of the scenario
+    """
+    scenario = scenarios[scenario_name]
+    with tempfile.TemporaryDirectory() as path_to_temporary_folder:
+        sqlite_database_connection = SqliteDatabaseConnection(sqlite_databases_directory=path_to_temporary_folder)
+        if in_memory:
+            sqlite_database = sqlite_database_connection.choose_database_in_memory("benchmark.sqlite", create=True)
+        else:
+            sqlite_database = sqlite_database_connection.choose_database("benchmark.sqlite", create=True)
+
+        start_time = time.perf_counter()
+        container_flow_generation_manager = ContainerFlowGenerationManager()
+        container_flow_generation_manager.set_properties(
+            name=f"Benchmark {scenario_name}",
+            start_date=scenario.start_date,
+            end_date=scenario.end_date
+        )
+        port_call_manager = PortCallManager()
+        scenario.add_schedules(port_call_manager, scenario.start_date, scenario.end_date)
+        setup_time_in_seconds = time.perf_counter() - start_time
+
+        profile = container_flow_generation_manager.generate(
+            number_processes=number_processes,
+            seed=seed,
+            defer_index_creation=defer_index_creation
+        )
+        generation_time_in_seconds = profile.get_total_wall_time_in_seconds()
+        number_containers = Container.select().count()
+
+        export_time_in_seconds = {
+            file_format.value: _export(path_to_temporary_folder, file_format)
+            for file_format in ExportFileFormat
+        }
+
+        result = {
+            "number_schedules": Schedule.select().count(),
+            "number_large_scheduled_vehicles": LargeScheduledVehicle.select().count(),
+            "number_trucks": Truck.select().count(),
+            "number_containers": number_containers,
+            "setup_time_in_seconds": setup_time_in_seconds,
+            "generation_time_in_seconds": generation_time_in_seconds,
+            "containers_per_second": number_containers / generation_time_in_seconds,
+            "stages": profile.to_dict(),
+            "export_time_in_seconds": export_time_in_seconds,
+        }
+        if in_memory:
+            start_time = time.perf_counter()
+            sqlite_database_connection.persist_in_memory_database()
+            result["persist_time_in_seconds"] = time.perf_counter() - start_time
+        sqlite_database.close()
+    return result
+
+
+def _get_git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=path_to_repository, capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """
+    Prints the relative change of the throughput and of the wall time of each stage.
+
+    Returns: The scenarios whose throughput has dropped by more than the tolerance
+    """
+    regressed_scenarios = []
+    for scenario_name, result in results["scenarios"].items():
+        if scenario_name not in baseline["scenarios"]:
+            print(f"{scenario_name}: not part of the baseline")
+            continue
+        baseline_result = baseline["scenarios"][scenario_name]
+        change = result["containers_per_second"] / baseline_result["containers_per_second"] - 1
+        print(f"{scenario_name}: {result['containers_per_second']:.0f} containers/s "
+              f"(baseline: {baseline_result['containers_per_second']:.0f} containers/s, {change:+.1%})")
+        for stage, stage_profile in result["stages"].items():
+            baseline_wall_time = baseline_result["stages"].get(stage, {}).get("wall_time_in_seconds")
+            if baseline_wall_time:
+                print(f"    {stage:<20} {stage_profile['wall_time_in_seconds']:>9.3f}s "
+                      f"({stage_profile['wall_time_in_seconds'] / baseline_wall_time - 1:+.1%})")
+        if change < -tolerance:
+            regressed_scenarios.append(scenario_name)
+    return regressed_scenarios
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--scenarios", nargs="+", choices=list(scenarios.keys()), default=list(scenarios.keys()))
+    parser.add_argument("--output", default="benchmark_results.json", help="The JSON file to write the results to")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--number-processes", type=int, default=None)
+    parser.add_argument("--in-memory", action="store_true",
+                        help="Keep the database in memory and only persist it to the disk at the end")
+    parser.add_argument("--defer-index-creation", action="store_true",
+                        help="Drop the indexes while containers are created and assigned to vehicles")
+    parser.add_argument("--compare-with", help="A JSON file of a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Fail if the throughput drops by more than this fraction compared to the previous run")
+    args = parser.parse_args()
+
+    results = {
+        "metadata": {
+            "conflowgen_version": conflowgen.__version__,
+            "git_commit": _get_git_commit(),
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+            "started_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "seed": args.seed,
+            "number_processes": args.number_processes,
+            "in_memory": args.in_memory,
+            "defer_index_creation": args.defer_index_creation,
+        },
+        "scenarios": {},
+    }
+    for scenario_name in args.scenarios:
+        print(f"Run scenario {scenario_name}...")
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            result = executor.submit(
+                run_scenario, scenario_name, args.seed, args.number_processes, args.in_memory, args.defer_index_creation
+            ).result()
+        results["scenarios"][scenario_name] = result
+        print(f"{scenario_name}: {result['number_containers']} containers in "
+              f"{result['generation_time_in_seconds']:.1f}s ({result['containers_per_second']:.0f} containers/s)")
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results have been written to {args.output}")
+
+    if args.compare_with:
+        with open(args.compare_with, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressed_scenarios = compare_with_baseline(results, baseline, args.tolerance)
+        if regressed_scenarios:
+            print(f"The throughput has dropped by more than {args.tolerance:.0%} for: {', '.join(regressed_scenarios)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,11 +7,14 @@ __version__ = "0.0.1"
 # List of classes
 from conflowgen.api.container_length_distribution_manager import ContainerLengthDistributionManager
 from conflowgen.api.container_flow_generation_manager import ContainerFlowGenerationManager
+from conflowgen.container_flow_data_generation_process.container_flow_generation_profile import \
+    ContainerFlowGenerationProfile
 from conflowgen.api.database_chooser import DatabaseChooser
 from conflowgen.api.export_container_flow_manager import ExportContainerFlowManager
 from conflowgen.api.mode_of_transport_distribution_manager import ModeOfTransportDistributionManager
 from conflowgen.api.port_call_manager import PortCallManager
 from conflowgen.api.truck_arrival_distribution_manager import TruckArrivalDistributionManager
+from conflowgen.database_connection.sql_tracer import SqlTracer
 from conflowgen.api.container_storage_requirement_distribution_manager import \
     ContainerStorageRequirementDistributionManager
 
@@ -58,9 +61,13 @@ from conflowgen.logging.logging import setup_logger
 
 # List of named tuples
 from conflowgen.preview.vehicle_capacity_exceeded_preview import RequiredAndMaximumCapacityComparison
+from conflowgen.preview.vehicle_capacity_exceeded_preview import RequiredAndMaximumCapacityComparisons
 from conflowgen.preview.inbound_and_outbound_vehicle_capacity_preview import OutboundUsedAndMaximumCapacity
 from conflowgen.posthoc_analysis.abstract_posthoc_analysis import ContainersAndTEUContainerFlowPair
 from conflowgen.posthoc_analysis.container_flow_adjustment_by_vehicle_type_analysis_summary import \
     ContainerFlowAdjustedToVehicleType
 from conflowgen.descriptive_datatypes import TransshipmentAndHinterlandComparison
 from conflowgen.descriptive_datatypes import HinterlandModalSplit
+from conflowgen.container_flow_data_generation_process.container_flow_generation_profile import StageProfile
+from conflowgen.database_connection.sql_tracer import SqlStatementShapeStatistics
+from conflowgen.database_connection.sql_tracer import SlowSqlStatement
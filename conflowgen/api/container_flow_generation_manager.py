@@ -1,10 +1,13 @@
 import datetime
-from typing import Union, Dict
+from typing import Union, Dict, Optional
 
 from conflowgen.application_models.repositories.container_flow_generation_properties_repository import \
     ContainerFlowGenerationPropertiesRepository
+from conflowgen.container_flow_data_generation_process.container_flow_generation_profile import \
+    ContainerFlowGenerationProfile
 from conflowgen.container_flow_data_generation_process.container_flow_generation_service import \
     ContainerFlowGenerationService
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class ContainerFlowGenerationManager:
@@ -85,6 +88,7 @@ class ContainerFlowGenerationManager:
         self.container_flow_generation_properties_repository.set_container_flow_generation_properties(
             properties
         )
+        DataSummariesCache.reset_cache()
 
     def get_properties(self) -> Dict[str, Union[str, datetime.date, float, int]]:
         """
@@ -110,10 +114,45 @@ class ContainerFlowGenerationManager:
                 properties.maximum_dwell_time_of_transshipment_containers_in_hours
         }
 
-    def generate(self) -> None:
+    def generate(
+            self,
+            number_processes: Optional[int] = None,
+            seed: Optional[int] = None,
+            defer_index_creation: bool = False,
+            resume: bool = False,
+            incremental: bool = False
+    ) -> ContainerFlowGenerationProfile:
         """
         Generate the synthetic container flow according to all the information stored in the database so far.
         This triggers a multi-step procedure of generating vehicles and the containers which are delivered or picked up
         by the vehicles.
+
+        Args:
+            number_processes: The number of processes to sample the containers delivered by vehicles adhering to a
+                schedule in parallel. By default, everything is done in the current process.
+            seed: All random numbers are derived from this seed. Using the same seed and the same input data, the same
+                container flow is generated again, no matter how many processes are used. By default, a new seed is
+                drawn each time and written to the log.
+            defer_index_creation: Whether to drop the indexes while containers are created and assigned to vehicles
+                and to re-create them afterwards. For large container flows, this is faster than keeping the indexes
+                up to date row by row.
+            resume: Whether to continue a generation that has been interrupted, e.g. because the process has been
+                terminated. The finished stages are skipped and the assignment of containers to departing vehicles
+                continues after the last chunk that has been written. The seed of the interrupted generation is used
+                again. If no interrupted generation is found, a new one is started.
+            incremental: Whether to only generate the container flow of the schedules again that have been added,
+                edited, or deleted since the last generation. The containers that these schedules deliver are
+                replaced, and only the containers that might depart with their vehicles are assigned to a departing
+                vehicle again. The rest of the container flow is kept. If the properties or any distribution have
+                changed, the whole container flow is generated again. This cannot be combined with ``resume``.
+
+        Returns: The wall time, CPU time, number of SQL statements, number of changed rows, and peak memory usage of
+            each stage of the generation. Use its method ``to_json`` to store it, e.g. to compare nightly runs.
         """
-        self.container_flow_generation_service.generate()
+        return self.container_flow_generation_service.generate(
+            number_processes=number_processes,
+            seed=seed,
+            defer_index_creation=defer_index_creation,
+            resume=resume,
+            incremental=incremental
+        )
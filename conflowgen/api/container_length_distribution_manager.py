@@ -3,6 +3,7 @@ from typing import Dict
 from conflowgen.domain_models.distribution_repositories.container_length_distribution_repository import \
     ContainerLengthDistributionRepository
 from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class ContainerLengthDistributionManager:
@@ -31,3 +32,4 @@ class ContainerLengthDistributionManager:
             container_lengths: The distribution of container lengths and their corresponding frequency.
         """
         self.container_length_repository.set_distribution(container_lengths)
+        DataSummariesCache.reset_cache()
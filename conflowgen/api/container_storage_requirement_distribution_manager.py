@@ -4,6 +4,7 @@ from conflowgen.domain_models.data_types.storage_requirement import StorageRequi
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.distribution_repositories.container_storage_requirement_distribution_repository import \
     ContainerStorageRequirementDistributionRepository
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class ContainerStorageRequirementDistributionManager:
@@ -32,3 +33,4 @@ class ContainerStorageRequirementDistributionManager:
             storage_requirements: The distribution of storage requirements depending on the container length.
         """
         self.storage_requirement_repository.set_distribution(storage_requirements)
+        DataSummariesCache.reset_cache()
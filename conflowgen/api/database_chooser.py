@@ -25,25 +25,57 @@ class DatabaseChooser:
         all_sqlite_databases = self.sqlite_database_connection.list_all_sqlite_databases()
         return all_sqlite_databases
 
-    def load_existing_sqlite_database(self, file_name: str) -> None:
+    def load_existing_sqlite_database(self, file_name: str, in_memory: bool = False) -> None:
         """
         Args:
             file_name: The file name of an SQLite database residing in ``<project root>/data/databases/``
+            in_memory: Whether to restore the content of the file into memory and work on it there. This speeds up
+                the generation as nothing is written to the disk. The file is only updated once
+                :meth:`persist_in_memory_database` or :meth:`close_current_connection` is invoked.
         """
-        self.peewee_sqlite_db = self.sqlite_database_connection.choose_database(file_name, create=False, reset=False)
+        if in_memory:
+            self.peewee_sqlite_db = self.sqlite_database_connection.choose_database_in_memory(
+                file_name, create=False, reset=False
+            )
+        else:
+            self.peewee_sqlite_db = self.sqlite_database_connection.choose_database(
+                file_name, create=False, reset=False
+            )
 
-    def create_new_sqlite_database(self, file_name) -> None:
+    def create_new_sqlite_database(self, file_name: str, in_memory: bool = False) -> None:
         """
         Args:
             file_name: The file name of an SQLite database that will reside in ``<project root>/data/databases/``
+            in_memory: Whether to keep the database in memory. This speeds up the generation as nothing is written to
+                the disk. The file is only written once :meth:`persist_in_memory_database` or
+                :meth:`close_current_connection` is invoked.
+        """
+        if in_memory:
+            self.peewee_sqlite_db = self.sqlite_database_connection.choose_database_in_memory(
+                file_name, create=True, reset=False
+            )
+        else:
+            self.peewee_sqlite_db = self.sqlite_database_connection.choose_database(
+                file_name, create=True, reset=False
+            )
+
+    def persist_in_memory_database(self) -> None:
+        """
+        Write the content of the database that is kept in memory to its file, e.g. after the container flow has been
+        generated. The file is replaced in a single step so that it never contains partially written content.
         """
-        self.peewee_sqlite_db = self.sqlite_database_connection.choose_database(file_name, create=True, reset=False)
+        if not self.peewee_sqlite_db:
+            raise NoCurrentConnectionException("You must first create a connection to an SQLite database.")
+        self.sqlite_database_connection.persist_in_memory_database()
 
     def close_current_connection(self) -> None:
         """
-        Close current connection, e.g. as a preparatory step to create a new SQLite database.
+        Close current connection, e.g. as a preparatory step to create a new SQLite database. A database that is kept
+        in memory is written to its file first.
         """
         if self.peewee_sqlite_db:
+            if self.sqlite_database_connection.is_in_memory():
+                self.sqlite_database_connection.persist_in_memory_database()
             self.peewee_sqlite_db.close()
         else:
             raise NoCurrentConnectionException("You must first create a connection to an SQLite database.")
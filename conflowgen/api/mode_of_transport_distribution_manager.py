@@ -3,6 +3,7 @@ from typing import Dict
 from conflowgen.domain_models.distribution_repositories.mode_of_transport_distribution_repository import \
     ModeOfTransportDistributionRepository
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class ModeOfTransportDistributionManager:
@@ -37,3 +38,4 @@ class ModeOfTransportDistributionManager:
                 describes the fraction that the container is later picked up by vehicle of type ``<second-key>``.
         """
         self.mode_of_transport_distribution_repository.set_mode_of_transport_distributions(distributions)
+        DataSummariesCache.reset_cache()
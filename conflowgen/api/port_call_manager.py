@@ -4,6 +4,7 @@ from typing import List, Tuple, Union
 
 from conflowgen.domain_models.factories.schedule_factory import ScheduleFactory
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class PortCallManager:
@@ -52,6 +53,7 @@ class PortCallManager:
             next_destinations=next_destinations,
             vehicle_arrives_every_k_days=vehicle_arrives_every_k_days
         )
+        DataSummariesCache.reset_cache()
 
     def has_schedule(
             self,
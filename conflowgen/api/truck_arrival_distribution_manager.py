@@ -2,6 +2,7 @@ from typing import Dict
 
 from conflowgen.domain_models.distribution_repositories.truck_arrival_distribution_repository import \
     TruckArrivalDistributionRepository
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class TruckArrivalDistributionManager:
@@ -33,3 +34,4 @@ class TruckArrivalDistributionManager:
                 the nearest key larger than the current key).
         """
         self.truck_arrival_distribution_repository.set_distribution(distribution)
+        DataSummariesCache.reset_cache()
@@ -0,0 +1,31 @@
+from peewee import BooleanField, CharField, IntegerField, TextField
+
+from conflowgen.domain_models.base_model import BaseModel
+
+
+class ContainerFlowGenerationCheckpoint(BaseModel):
+    """
+    Each entry refers to a stage of the container flow generation that has been started. It is used to resume an
+    interrupted generation.
+    """
+    stage = CharField(
+        primary_key=True,
+        help_text="The name of the stage as it is used in the profile of the generation"
+    )
+    is_finished = BooleanField(
+        default=False,
+        help_text="Whether all results of the stage have been written to the database"
+    )
+    number_finished_chunks = IntegerField(
+        default=0,
+        help_text="For stages that write their results in chunks, the number of chunks that have been written"
+    )
+    random_state = TextField(
+        null=True,
+        help_text="For stages that write their results in chunks, the state of the random number generator after the "
+                  "last written chunk, encoded as JSON"
+    )
+    seed = CharField(
+        null=True,
+        help_text="The seed all random numbers of the generation are derived from, only set for the preparation stage"
+    )
@@ -0,0 +1,19 @@
+from peewee import CharField
+
+from conflowgen.domain_models.base_model import BaseModel
+
+
+class ContainerFlowGenerationFingerprint(BaseModel):
+    """
+    Each entry summarizes a part of the input data as it was when the container flow was generated the last time. This
+    is used to detect which schedules have changed since then.
+    """
+    subject = CharField(
+        primary_key=True,
+        help_text="The summarized input data, i.e. 'properties', 'distributions', or 'schedule-' followed by the id of "
+                  "the schedule"
+    )
+    fingerprint = CharField(
+        null=False,
+        help_text="A hash of the input data"
+    )
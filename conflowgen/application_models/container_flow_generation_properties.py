@@ -88,3 +88,8 @@ class ContainerFlowGenerationProperties(BaseModel):
                   'Hartmann, Sönke. "Generating scenarios for simulation and optimization of container terminal '
                   'logistics." Or Spectrum 26.2 (2004): 171-192.'
     )
+    generation_stamp = IntegerField(
+        default=0,
+        help_text="Counts how often the data has been changed, e.g. by generating the container flow or by setting a "
+                  "distribution. Summaries of the data are only reused as long as this number stays the same."
+    )
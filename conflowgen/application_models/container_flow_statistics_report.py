@@ -22,6 +22,7 @@ class ContainerFlowStatisticsReport:
 
     def generate(self):
         vehicles_of_types = self.large_scheduled_vehicle_repository.load_all_vehicles()
+        self.large_scheduled_vehicle_repository.warm_up_cache(vehicles_of_types)
         self._generate_free_capacity_statistics(vehicles_of_types)
 
     def _generate_free_capacity_statistics(self, vehicles_of_types):
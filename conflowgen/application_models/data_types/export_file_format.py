@@ -5,7 +5,12 @@ class ExportFileFormat(enum.Enum):
     """
     The export file format supports tables. The export function enables the user to read in the generated synthetic data
     into another tool, such as a software for mathematical optimization or discrete event simulation.
+    The formats Apache Parquet and Feather (Apache Arrow IPC) require the optional dependency pyarrow. These tables are
+    written batch by batch so that the memory consumption stays bounded, enums are dictionary-encoded and points in
+    time are stored as timestamps.
     """
     csv = "csv"
     xlsx = "xlsx"
     xls = "xls"
+    parquet = "parquet"
+    feather = "feather"
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Optional, Tuple
+
+from conflowgen.application_models.container_flow_generation_checkpoint import ContainerFlowGenerationCheckpoint
+
+
+def _convert_lists_to_tuples(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_convert_lists_to_tuples(element) for element in value)
+    return value
+
+
+class ContainerFlowGenerationCheckpointRepository:
+
+    @staticmethod
+    def reset() -> None:
+        ContainerFlowGenerationCheckpoint.delete().execute()  # pylint: disable=no-value-for-parameter
+
+    @staticmethod
+    def _get_or_create(stage: str) -> ContainerFlowGenerationCheckpoint:
+        checkpoint, _ = ContainerFlowGenerationCheckpoint.get_or_create(stage=stage)
+        return checkpoint
+
+    @staticmethod
+    def has_started() -> bool:
+        return ContainerFlowGenerationCheckpoint.select().exists()
+
+    @staticmethod
+    def is_stage_finished(stage: str) -> bool:
+        return ContainerFlowGenerationCheckpoint.select().where(
+            (ContainerFlowGenerationCheckpoint.stage == stage)
+            & ContainerFlowGenerationCheckpoint.is_finished
+        ).exists()
+
+    @classmethod
+    def mark_stage_as_finished(cls, stage: str) -> None:
+        checkpoint = cls._get_or_create(stage)
+        checkpoint.is_finished = True
+        checkpoint.save()
+
+    @classmethod
+    def set_seed(cls, seed: int) -> None:
+        checkpoint = cls._get_or_create("preparation")
+        checkpoint.seed = str(seed)
+        checkpoint.save()
+
+    @staticmethod
+    def get_seed() -> Optional[int]:
+        checkpoint = ContainerFlowGenerationCheckpoint.get_or_none(
+            ContainerFlowGenerationCheckpoint.stage == "preparation"
+        )
+        if checkpoint is None or checkpoint.seed is None:
+            return None
+        return int(checkpoint.seed)
+
+    @classmethod
+    def save_progress(cls, stage: str, number_finished_chunks: int, random_state: tuple) -> None:
+        checkpoint = cls._get_or_create(stage)
+        checkpoint.number_finished_chunks = number_finished_chunks
+        checkpoint.random_state = json.dumps(random_state)
+        checkpoint.save()
+
+    @staticmethod
+    def get_progress(stage: str) -> Optional[Tuple[int, tuple]]:
+        """
+        Returns: The number of finished chunks and the state of the random number generator after the last finished
+            chunk, or ``None`` if no chunk of the stage has been finished yet
+        """
+        checkpoint = ContainerFlowGenerationCheckpoint.get_or_none(ContainerFlowGenerationCheckpoint.stage == stage)
+        if checkpoint is None or checkpoint.number_finished_chunks == 0:
+            return None
+        return checkpoint.number_finished_chunks, _convert_lists_to_tuples(json.loads(checkpoint.random_state))
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Dict, List, NamedTuple
+
+from conflowgen.application_models.container_flow_generation_fingerprint import ContainerFlowGenerationFingerprint
+from conflowgen.application_models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.application_models.repositories.container_flow_generation_properties_repository import \
+    ContainerFlowGenerationPropertiesRepository
+from conflowgen.database_connection.bulk_insert import insert_many_in_chunks
+from conflowgen.domain_models.base_model import database_proxy
+from conflowgen.domain_models.distribution_models.container_length_distribution import ContainerLengthDistribution
+from conflowgen.domain_models.distribution_models.container_weight_distribution import ContainerWeightDistribution
+from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
+from conflowgen.domain_models.distribution_models.storage_requirement_distribution import StorageRequirementDistribution
+from conflowgen.domain_models.distribution_models.truck_arrival_distribution import TruckArrivalDistribution
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+
+
+class ScheduleChanges(NamedTuple):
+    """
+    The schedules that have changed since the container flow has been generated the last time.
+    """
+
+    #: The ids of the schedules that have been added or edited
+    changed_schedule_ids: List[int]
+
+    #: The ids of the schedules that have been deleted
+    removed_schedule_ids: List[int]
+
+
+def _hash(values) -> str:
+    return hashlib.sha256(repr(values).encode()).hexdigest()
+
+
+class ContainerFlowGenerationFingerprintRepository:
+
+    schedule_subject_prefix = "schedule-"
+
+    # Only the properties that influence the generated container flow are considered
+    ignored_properties = ("id", "name", "generated_at", "last_updated_at", "generation_stamp")
+
+    distribution_models = (
+        ModeOfTransportDistribution,
+        ContainerLengthDistribution,
+        ContainerWeightDistribution,
+        StorageRequirementDistribution,
+        TruckArrivalDistribution
+    )
+
+    @classmethod
+    def compute_fingerprints(cls) -> Dict[str, str]:
+        """
+        Returns: The fingerprints of the current input data, keyed by the subject they summarize
+        """
+        properties = ContainerFlowGenerationPropertiesRepository.get_container_flow_generation_properties()
+        fingerprints = {
+            "properties": _hash([
+                getattr(properties, field.name)
+                for field in ContainerFlowGenerationProperties._meta.sorted_fields  # pylint: disable=protected-access
+                if field.name not in cls.ignored_properties
+            ]),
+            "distributions": _hash([
+                list(model.select().order_by(
+                    *model._meta.sorted_fields  # pylint: disable=protected-access
+                ).tuples())
+                for model in cls.distribution_models
+            ])
+        }
+
+        destinations_per_schedule: Dict[int, list] = {}
+        for schedule_id, sequence_id, destination_name, fraction in Destination.select(
+                Destination.belongs_to_schedule, Destination.sequence_id, Destination.destination_name,
+                Destination.fraction
+        ).order_by(Destination.belongs_to_schedule, Destination.sequence_id).tuples():
+            destinations_per_schedule.setdefault(schedule_id, []).append((sequence_id, destination_name, fraction))
+
+        for schedule in Schedule.select().order_by(Schedule.id):
+            fingerprints[cls.schedule_subject_prefix + str(schedule.id)] = _hash((
+                schedule.service_name,
+                schedule.vehicle_type,
+                schedule.average_vehicle_capacity,
+                schedule.average_moved_capacity,
+                schedule.vehicle_arrives_at,
+                schedule.vehicle_arrives_every_k_days,
+                schedule.vehicle_arrives_at_time,
+                destinations_per_schedule.get(schedule.id, [])
+            ))
+        return fingerprints
+
+    @staticmethod
+    def load_fingerprints() -> Dict[str, str]:
+        """
+        Returns: The fingerprints of the input data as it was when the container flow was generated the last time
+        """
+        return dict(ContainerFlowGenerationFingerprint.select(
+            ContainerFlowGenerationFingerprint.subject, ContainerFlowGenerationFingerprint.fingerprint
+        ).tuples())
+
+    @classmethod
+    def save_fingerprints(cls) -> None:
+        """
+        Stores the fingerprints of the current input data, e.g. after the container flow has been generated.
+        """
+        fingerprints = cls.compute_fingerprints()
+        with database_proxy.atomic():
+            ContainerFlowGenerationFingerprint.delete().execute()  # pylint: disable=no-value-for-parameter
+            insert_many_in_chunks(
+                model=ContainerFlowGenerationFingerprint,
+                fields=(ContainerFlowGenerationFingerprint.subject, ContainerFlowGenerationFingerprint.fingerprint),
+                rows=list(fingerprints.items())
+            )
+
+    @classmethod
+    def get_schedule_changes(cls) -> ScheduleChanges | None:
+        """
+        Returns: The schedules that have changed since the container flow has been generated the last time. If no
+            container flow has been generated before or if the properties or distributions have changed, ``None`` is
+            returned because the whole container flow needs to be generated again.
+        """
+        previous_fingerprints = cls.load_fingerprints()
+        current_fingerprints = cls.compute_fingerprints()
+        for subject in ("properties", "distributions"):
+            if previous_fingerprints.get(subject) != current_fingerprints[subject]:
+                return None
+
+        changed_schedule_ids = [
+            int(subject[len(cls.schedule_subject_prefix):])
+            for subject, fingerprint in current_fingerprints.items()
+            if subject.startswith(cls.schedule_subject_prefix) and previous_fingerprints.get(subject) != fingerprint
+        ]
+        removed_schedule_ids = [
+            int(subject[len(cls.schedule_subject_prefix):])
+            for subject in previous_fingerprints
+            if subject.startswith(cls.schedule_subject_prefix) and subject not in current_fingerprints
+        ]
+        return ScheduleChanges(
+            changed_schedule_ids=changed_schedule_ids,
+            removed_schedule_ids=removed_schedule_ids
+        )
@@ -56,3 +56,25 @@ class ContainerFlowGenerationPropertiesRepository:
             raise DuplicatedContainerFlowGenerationPropertiesEntryException(
                 f"Number of updated rows were {number_properties_entries} but expected only one entry"
             )
+
+    @staticmethod
+    def get_generation_stamp() -> int:
+        """
+        Returns: How often the data has been changed so far
+        """
+        generation_stamp = ContainerFlowGenerationProperties.select(
+            ContainerFlowGenerationProperties.generation_stamp
+        ).scalar()
+        return generation_stamp if generation_stamp is not None else 0
+
+    @classmethod
+    def increment_generation_stamp(cls) -> None:
+        """
+        Records that the data has been changed, e.g. by generating the container flow or by setting a distribution.
+        """
+        properties = cls.get_container_flow_generation_properties()
+        ContainerFlowGenerationProperties.update(
+            generation_stamp=ContainerFlowGenerationProperties.generation_stamp + 1
+        ).where(
+            ContainerFlowGenerationProperties.id == properties.id
+        ).execute()
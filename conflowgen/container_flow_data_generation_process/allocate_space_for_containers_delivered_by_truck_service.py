@@ -1,8 +1,10 @@
 from __future__ import annotations
 import logging
 import random
-from typing import Dict
+from typing import Dict, List
 
+from conflowgen.database_connection.bulk_insert import set_value_in_chunks
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_repositories.mode_of_transport_distribution_repository import \
     ModeOfTransportDistributionRepository
@@ -10,7 +12,7 @@ from conflowgen.domain_models.factories.container_factory import ContainerFactor
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.repositories.large_scheduled_vehicle_repository import LargeScheduledVehicleRepository
-from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle
+from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle, LargeScheduledVehicle
 
 
 class AllocateSpaceForContainersDeliveredByTruckService:
@@ -23,6 +25,7 @@ class AllocateSpaceForContainersDeliveredByTruckService:
         self.mode_of_transport_distribution: Dict[ModeOfTransport, Dict[ModeOfTransport, float]] | None = None
         self.large_scheduled_vehicle_repository = LargeScheduledVehicleRepository()
         self.container_factory = ContainerFactory()
+        self.random_number_generator = random.Random()
 
     def reload_distribution(self, transportation_buffer: float):
         self.mode_of_transport_distribution = self.mode_of_transport_distribution_repository.get_distribution()
@@ -32,6 +35,14 @@ class AllocateSpaceForContainersDeliveredByTruckService:
         self.logger.info(f"Use transport buffer of {transportation_buffer} for allocating containers delivered by "
                          f"trucks")
 
+    @staticmethod
+    def _has_free_capacity(vehicle_distribution: Dict[AbstractLargeScheduledVehicle, float]) -> bool:
+        """
+        If all remaining vehicles of a type are fully loaded, their weights sum up to zero and no vehicle can be drawn
+        from them.
+        """
+        return sum(vehicle_distribution.values()) > 0
+
     @staticmethod
     def _get_number_containers_to_allocate() -> int:
         """Create a balance between the number of containers which are picked up and which are delivered by truck.
@@ -40,14 +51,23 @@ class AllocateSpaceForContainersDeliveredByTruckService:
         As long as the container length distribution for inbound and outbound containers are the same, using the number
         of containers should lead to the same amount of containers as if we would have taken the TEU capacity which is
         more complex to calculate.
+
+        The containers delivered by truck that already exist, e.g. from a previous generation that is only partially
+        repeated, are taken into account.
         """
         number_containers = Container.select().where(
             Container.picked_up_by == ModeOfTransport.truck
         ).count()
-        return number_containers
+        number_existing_containers = Container.select().where(
+            Container.delivered_by == ModeOfTransport.truck
+        ).count()
+        return max(0, number_containers - number_existing_containers)
 
     def allocate(self) -> None:
         """Allocates space for containers on vehicles that are delivered by trucks.
+
+        The containers and the vehicles which capacity is exhausted are kept in memory until all containers have been
+        allocated. Then, they are written to the database at once.
         """
         self.container_factory.reload_distributions()
         truck_to_other_vehicle_distribution: Dict[ModeOfTransport, float] = \
@@ -58,9 +78,11 @@ class AllocateSpaceForContainersDeliveredByTruckService:
         self.large_scheduled_vehicle_repository.reset_cache()
 
         number_containers_to_allocate = self._get_number_containers_to_allocate()
+        self.container_factory.prepare_containers_for_delivering_trucks(number_containers_to_allocate)
 
         # A list of vehicles that have free capacity for further containers. The entries are removed in a lazy fashion.
         vehicles = self.large_scheduled_vehicle_repository.load_all_vehicles()
+        self.large_scheduled_vehicle_repository.warm_up_cache(vehicles, inbound=False)
 
         for vehicle_type, frequency in list(truck_to_other_vehicle_distribution.items()):
             if vehicle_type not in vehicles:  # this class is only concerned about large scheduled vehicles
@@ -70,6 +92,8 @@ class AllocateSpaceForContainersDeliveredByTruckService:
                 del vehicles[vehicle_type]
                 del truck_to_other_vehicle_distribution[vehicle_type]
 
+        container_rows: List[tuple] = []
+        exhausted_large_scheduled_vehicle_ids: List[int] = []
         abort = False
 
         for i in range(number_containers_to_allocate):
@@ -98,7 +122,7 @@ class AllocateSpaceForContainersDeliveredByTruckService:
                 ]
 
                 # pick vehicle type
-                vehicle_type: ModeOfTransport = random.choices(
+                vehicle_type: ModeOfTransport = self.random_number_generator.choices(
                     population=vehicle_types,
                     weights=frequency_of_vehicle_types
                 )[0]
@@ -115,7 +139,14 @@ class AllocateSpaceForContainersDeliveredByTruckService:
                     vehicle: self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
                     for vehicle in vehicles_of_type
                 }
-                vehicle: AbstractLargeScheduledVehicle = random.choices(
+                if not self._has_free_capacity(vehicle_distribution):
+                    del truck_to_other_vehicle_distribution[vehicle_type]
+                    self.logger.info(f"Vehicle type '{vehicle_type}' has no free capacity left and is no further "
+                                     f"tried. This happened at container number {i} of {number_containers_to_allocate} "
+                                     f"(i.e., at {(i / number_containers_to_allocate * 100):.2f}%).")
+                    continue  # try again with another vehicle type (refers to while loop)
+
+                vehicle: AbstractLargeScheduledVehicle = self.random_number_generator.choices(
                     population=list(vehicle_distribution.keys()),
                     weights=list(vehicle_distribution.values())
                 )[0]
@@ -123,9 +154,9 @@ class AllocateSpaceForContainersDeliveredByTruckService:
                 free_capacity_of_vehicle = self.large_scheduled_vehicle_repository.\
                     get_free_capacity_for_outbound_journey(vehicle)
                 if free_capacity_of_vehicle <= self.ignored_capacity:
-                    large_scheduled_vehicle: AbstractLargeScheduledVehicle = vehicle.large_scheduled_vehicle
+                    large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
                     large_scheduled_vehicle.capacity_exhausted_while_allocating_space_for_export_containers = True
-                    large_scheduled_vehicle.save()
+                    exhausted_large_scheduled_vehicle_ids.append(large_scheduled_vehicle.id)
                     vehicles_of_type.remove(vehicle)  # Ignore the vehicle which would be overloaded if chosen
                     vehicle_name: str = vehicle.large_scheduled_vehicle.vehicle_name
                     self.logger.debug(f"Vehicle '{vehicle_name}' of type '{vehicle_type}' has no remaining capacity "
@@ -133,12 +164,26 @@ class AllocateSpaceForContainersDeliveredByTruckService:
                                       f"TEU is less than the required {self.ignored_capacity} TEU.")
                     continue  # try again (possibly new vehicle type, definitely not same vehicle again)
 
-                container = self.container_factory.create_container_for_delivering_truck(vehicle)
-                self.large_scheduled_vehicle_repository.block_capacity_for_outbound_journey(vehicle, container)
+                container_row = self.container_factory.create_container_row_for_delivering_truck(vehicle)
+                container_rows.append(container_row)
+                container_length = container_row[1]
+                self.large_scheduled_vehicle_repository.block_capacity_in_teu_for_outbound_journey(
+                    vehicle=vehicle,
+                    used_capacity_in_teu=ContainerLength.get_factor(container_length)
+                )
                 break  # success, no further looping to search for a suitable vehicle
 
             if abort:  # Not enough vehicles of any kind could be found
                 break  # break out of for loop
 
+        with database_proxy.atomic():
+            self.container_factory.store_container_rows_for_delivering_trucks(container_rows)
+            set_value_in_chunks(
+                model=LargeScheduledVehicle,
+                field=LargeScheduledVehicle.capacity_exhausted_while_allocating_space_for_export_containers,
+                value=True,
+                ids=exhausted_large_scheduled_vehicle_ids
+            )
+
         self.logger.info("All containers that need to be delivered by truck have been assigned to a vehicle that moves "
                          "according to a schedule.")
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import logging
-import random
-from typing import Iterable, Collection, Dict
+from typing import Collection, Dict, List, Tuple
 
+import numpy as np
+
+from conflowgen.database_connection.bulk_insert import set_value_in_chunks
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_repositories.container_destination_distribution_repository import \
     ContainerDestinationDistributionRepository
@@ -18,6 +21,7 @@ class AssignDestinationToContainerService:
     def __init__(self):
         self.repository = ContainerDestinationDistributionRepository()
         self.distribution: Dict[Schedule, Dict[Destination, float]] | None = None
+        self.random_number_generator = np.random.default_rng()
         self.reload_distribution()
 
     def reload_distribution(self):
@@ -32,31 +36,51 @@ class AssignDestinationToContainerService:
 
     def assign(self):
         destination_with_distinct_schedules: Collection[Destination] = Destination.select(
-            Destination.belongs_to_schedule).distinct()
+            Destination.belongs_to_schedule).distinct().order_by(Destination.belongs_to_schedule)
         schedules = [
             destination.belongs_to_schedule
             for destination in destination_with_distinct_schedules  # pylint: disable=not-an-iterable
         ]
+        if not schedules:
+            return
+
+        # Load the containers of all schedules with a single query
+        container_ids_per_schedule: Dict[int, List[int]] = {schedule.id: [] for schedule in schedules}
+        containers_moving_according_to_schedules = Container.select(
+            Container.id, LargeScheduledVehicle.schedule
+        ).join(
+            LargeScheduledVehicle, on=Container.picked_up_by_large_scheduled_vehicle
+        ).where(
+            (LargeScheduledVehicle.schedule << list(container_ids_per_schedule.keys()))
+            & Container.destination.is_null()
+        ).order_by(Container.id)
+        for container_id, schedule_id in containers_moving_according_to_schedules.tuples().iterator():
+            container_ids_per_schedule[schedule_id].append(container_id)
+
+        container_ids_per_destination: List[Tuple[Destination, np.ndarray]] = []
         schedule: Schedule
         number_iterations = len(schedules)
         for i, schedule in enumerate(schedules):
             self.logger.debug(f"Assign destinations to containers that leave the terminal with the service "
                               f"'{schedule.service_name}' of the vehicle type {schedule.vehicle_type}, "
                               f"progress: {i+1} / {number_iterations} ({100*(i + 1)/number_iterations:.2f}%)")
-            containers_moving_according_to_schedule: Iterable[Container] = Container.select().join(
-                LargeScheduledVehicle, on=Container.picked_up_by_large_scheduled_vehicle
-            ).where(
-                Container.picked_up_by_large_scheduled_vehicle.schedule == schedule
-            )
+            container_ids = np.array(container_ids_per_schedule[schedule.id], dtype=np.int64)
             distribution_for_schedule = self.distribution[schedule]
             destinations = list(distribution_for_schedule.keys())
-            frequency_of_destinations = list(distribution_for_schedule.values())
-
-            container: Container
-            for container in containers_moving_according_to_schedule:
-                sampled_destination = random.choices(
-                    population=destinations,
-                    weights=frequency_of_destinations
-                )[0]
-                container.destination = sampled_destination
-                container.save()
+            frequency_of_destinations = np.array(list(distribution_for_schedule.values()), dtype=np.float64)
+
+            # The destinations of all containers of the schedule are drawn at once
+            sampled_destination_indices = self.random_number_generator.choice(
+                len(destinations),
+                size=len(container_ids),
+                p=frequency_of_destinations / frequency_of_destinations.sum()
+            )
+            for destination_index, destination in enumerate(destinations):
+                container_ids_per_destination.append(
+                    (destination, container_ids[sampled_destination_indices == destination_index])
+                )
+
+        # All containers with the same destination are updated together
+        with database_proxy.atomic():
+            for destination, container_ids in container_ids_per_destination:
+                set_value_in_chunks(Container, Container.destination, destination.id, container_ids.tolist())
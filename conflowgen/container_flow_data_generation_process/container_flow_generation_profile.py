@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, NamedTuple, Optional
+
+from conflowgen.database_connection.sql_tracer import SqlTracer
+from conflowgen.domain_models.base_model import database_proxy
+
+
+class StageProfile(NamedTuple):
+    """
+    The resources one stage of the container flow generation has consumed. If a stage is entered several times, e.g.
+    the reports, the consumed resources are summed up.
+    """
+
+    #: The time that has passed on the clock on the wall
+    wall_time_in_seconds: float
+
+    #: The processor time of the current process and all its finished child processes, e.g. the worker processes
+    cpu_time_in_seconds: float
+
+    #: The number of SQL statements issued, not including those that begin and end a transaction
+    number_sql_statements: int
+
+    #: The number of rows inserted, updated, or deleted
+    number_changed_rows: int
+
+    #: The largest amount of memory the current process has occupied so far. On platforms that do not report it, e.g.
+    #: Windows, it is None.
+    peak_resident_set_size_in_megabytes: Optional[float]
+
+
+def _get_cpu_time_in_seconds() -> float:
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def _get_peak_resident_set_size_in_megabytes() -> Optional[float]:
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak_resident_set_size = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # macOS reports bytes while Linux reports kilobytes
+        return peak_resident_set_size / 1024 ** 2
+    return peak_resident_set_size / 1024
+
+
+class ContainerFlowGenerationProfile:
+    """
+    Keeps track of the resources each stage of the container flow generation consumes. This helps to spot regressions
+    and to see which stages take long enough to benefit from more processes. The stages are reported in the order they
+    were first entered.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, StageProfile] = {}
+
+    @contextlib.contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Measures the resources consumed within the context and adds them to the stage. The statements are counted the
+        same way as by :class:`.SqlTracer`, so a trace callback of the SQLite connection or another active tracer is
+        left untouched.
+
+        Args:
+            stage: The name of the stage
+        """
+        connection = database_proxy.connection()
+        total_changes_before = connection.total_changes
+        cpu_time_before = _get_cpu_time_in_seconds()
+        wall_time_before = time.perf_counter()
+        # Only the statements are counted here, slow statements are not reported
+        with SqlTracer(slow_statement_threshold_in_seconds=float("inf")) as sql_tracer:
+            try:
+                yield
+            finally:
+                wall_time = time.perf_counter() - wall_time_before
+                cpu_time = _get_cpu_time_in_seconds() - cpu_time_before
+                number_changed_rows = connection.total_changes - total_changes_before
+                previous = self.stages.get(stage, StageProfile(0, 0, 0, 0, None))
+                self.stages[stage] = StageProfile(
+                    wall_time_in_seconds=previous.wall_time_in_seconds + wall_time,
+                    cpu_time_in_seconds=previous.cpu_time_in_seconds + cpu_time,
+                    number_sql_statements=previous.number_sql_statements + sql_tracer.get_number_statements(),
+                    number_changed_rows=previous.number_changed_rows + number_changed_rows,
+                    peak_resident_set_size_in_megabytes=_get_peak_resident_set_size_in_megabytes()
+                )
+
+    def get_total_wall_time_in_seconds(self) -> float:
+        """
+        Returns: The time all stages have taken together
+        """
+        return sum(stage_profile.wall_time_in_seconds for stage_profile in self.stages.values())
+
+    def to_dict(self) -> Dict[str, Dict[str, float | int | None]]:
+        """
+        Returns: For each stage, the consumed resources
+        """
+        return {
+            stage: stage_profile._asdict()
+            for stage, stage_profile in self.stages.items()
+        }
+
+    def to_json(self) -> str:
+        """
+        Returns: For each stage, the consumed resources as a JSON object, e.g. to be stored next to a nightly run
+        """
+        return json.dumps(self.to_dict(), indent=2)
+
+    def get_text_representation(self) -> str:
+        """
+        Returns: A table with one row for each stage
+        """
+        report = "stage                   wall time (s)  cpu time (s)  SQL statements  changed rows  peak RSS (MB)\n"
+        for stage, stage_profile in self.stages.items():
+            peak_resident_set_size = stage_profile.peak_resident_set_size_in_megabytes
+            report += f"{stage:<24}"
+            report += f"{stage_profile.wall_time_in_seconds:>13.3f}  "
+            report += f"{stage_profile.cpu_time_in_seconds:>12.3f}  "
+            report += f"{stage_profile.number_sql_statements:>14}  "
+            report += f"{stage_profile.number_changed_rows:>12}  "
+            report += f"{peak_resident_set_size:>13.1f}" if peak_resident_set_size is not None else f"{'-':>13}"
+            report += "\n"
+        return report
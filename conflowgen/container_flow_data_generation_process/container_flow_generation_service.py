@@ -1,23 +1,40 @@
+from __future__ import annotations
+
 import datetime
 import logging
+import random
+from typing import Callable, Collection
+
+import numpy as np
 
+from conflowgen.application_models.repositories.container_flow_generation_checkpoint_repository import \
+    ContainerFlowGenerationCheckpointRepository
+from conflowgen.application_models.repositories.container_flow_generation_fingerprint_repository import \
+    ContainerFlowGenerationFingerprintRepository, ScheduleChanges
 from conflowgen.application_models.container_flow_statistics_report import ContainerFlowStatisticsReport
 from conflowgen.application_models.repositories.container_flow_generation_properties_repository import \
     ContainerFlowGenerationPropertiesRepository
 from conflowgen.container_flow_data_generation_process.assign_destination_to_container_service import \
     AssignDestinationToContainerService
+from conflowgen.container_flow_data_generation_process.container_flow_generation_profile import \
+    ContainerFlowGenerationProfile
 from conflowgen.container_flow_data_generation_process.large_scheduled_vehicle_creation_service import \
     LargeScheduledVehicleCreationService
+from conflowgen.container_flow_data_generation_process.remove_container_flow_of_schedules_service import \
+    RemoveContainerFlowOfSchedulesService
+from conflowgen.database_connection.create_tables import create_indexes, drop_indexes
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
 from conflowgen.container_flow_data_generation_process.allocate_space_for_containers_delivered_by_truck_service import \
     AllocateSpaceForContainersDeliveredByTruckService
 from conflowgen.container_flow_data_generation_process.large_scheduled_vehicle_for_onward_transportation_manager \
-    import LargeScheduledVehicleForOnwardTransportationManager
+    import LargeScheduledVehicleForOnwardTransportationManager, OnwardTransportationProgress
 from conflowgen.container_flow_data_generation_process.truck_for_export_containers_manager import \
     TruckForExportContainersManager
 from conflowgen.container_flow_data_generation_process.truck_for_import_containers_manager import \
     TruckForImportContainersManager
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class ContainerFlowGenerationService:
@@ -32,6 +49,9 @@ class ContainerFlowGenerationService:
         self.allocate_space_for_containers_delivered_by_truck_service = \
             AllocateSpaceForContainersDeliveredByTruckService()
         self.assign_destination_to_container_service = AssignDestinationToContainerService()
+        self.container_flow_generation_checkpoint_repository = ContainerFlowGenerationCheckpointRepository()
+        self.container_flow_generation_fingerprint_repository = ContainerFlowGenerationFingerprintRepository()
+        self.remove_container_flow_of_schedules_service = RemoveContainerFlowOfSchedulesService()
 
     def _update_generation_properties_and_distributions(self):
         self.container_flow_generation_properties_manager = ContainerFlowGenerationPropertiesRepository()
@@ -107,56 +127,259 @@ class ContainerFlowGenerationService:
 
         Truck.delete().execute()  # pylint: disable=no-value-for-parameter
 
-    def generate(self):
-        self.logger.info("Remove previous data...")
-        self.clear_previous_container_flow()
-        self.logger.info("Reloading properties and distributions...")
-        self._update_generation_properties_and_distributions()
+    def _seed_random_number_generators(self, seed: int | None) -> int:
+        """Each stage draws from its own stream of random numbers. The streams are independent of each other but are
+        all derived from the same seed so that the whole container flow can be reproduced.
+
+        Returns: The seed, which is drawn if none is given
+        """
+        seed_sequence = np.random.SeedSequence(seed)
+        self.logger.info(f"Use the seed {seed_sequence.entropy} for generating the container flow")
+        (
+            seed_sequence_for_creation,
+            seed_sequence_for_onward_transportation,
+            seed_sequence_for_allocation,
+            seed_sequence_for_containers_delivered_by_truck,
+            seed_sequence_for_import,
+            seed_sequence_for_export,
+            seed_sequence_for_destinations
+        ) = seed_sequence.spawn(7)
+
+        self.large_scheduled_vehicle_creation_service.seed_sequence = seed_sequence_for_creation
+        self.large_scheduled_vehicle_for_onward_transportation_manager.random_number_generator = \
+            self._create_random_number_generator(seed_sequence_for_onward_transportation)
+        self.allocate_space_for_containers_delivered_by_truck_service.random_number_generator = \
+            self._create_random_number_generator(seed_sequence_for_allocation)
+        self.allocate_space_for_containers_delivered_by_truck_service.container_factory.random_number_generator = \
+            np.random.default_rng(seed_sequence_for_containers_delivered_by_truck)
+        self.truck_for_import_containers_manager.random_number_generator = \
+            np.random.default_rng(seed_sequence_for_import)
+        self.truck_for_export_containers_manager.random_number_generator = \
+            np.random.default_rng(seed_sequence_for_export)
+        self.assign_destination_to_container_service.random_number_generator = \
+            np.random.default_rng(seed_sequence_for_destinations)
+        return seed_sequence.entropy
+
+    @staticmethod
+    def _create_random_number_generator(seed_sequence: np.random.SeedSequence) -> random.Random:
+        return random.Random(int.from_bytes(seed_sequence.generate_state(4).tobytes(), "little"))
+
+    def _log_report(
+            self,
+            profile: ContainerFlowGenerationProfile,
+            title: str = "Loading status of vehicles adhering to a schedule:"
+    ) -> None:
+        with profile.measure("reports"):
+            self.logger.info(title)
+            report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
+            report.generate()
+            self.logger.info(report.get_text_representation())
+
+    def _run_stage(self, profile: ContainerFlowGenerationProfile, stage: str, run: Callable[[], None]) -> bool:
+        """Runs a stage within a single transaction. If the stage has been finished by an interrupted generation
+        before, it is skipped.
+
+        Returns: Whether the stage has been run
+        """
+        if self.container_flow_generation_checkpoint_repository.is_stage_finished(stage):
+            self.logger.info(f"Skip the stage '{stage}' which has been finished before")
+            return False
+        with profile.measure(stage), database_proxy.atomic():
+            run()
+            self.container_flow_generation_checkpoint_repository.mark_stage_as_finished(stage)
+        return True
 
+    def _create_fleet(self, number_processes: int | None, schedule_ids: Collection[int] | None = None) -> None:
         self.logger.info("Create fleet including their delivered containers for given time range for each schedule...")
-        self.large_scheduled_vehicle_creation_service.create()
-
-        self.logger.info("Loading status of vehicles adhering to a schedule:")
-        report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
-        report.generate()
-        self.logger.info(report.get_text_representation())
-
-        self.logger.info("Assign containers arriving by vehicles adhering a schedule for onward transportation...")
-        self.large_scheduled_vehicle_for_onward_transportation_manager.choose_departing_vehicle_for_containers()
-        number_assigned_containers = (self.large_scheduled_vehicle_for_onward_transportation_manager
-                                      .number_assigned_containers)
-        number_not_assignable_containers = (self.large_scheduled_vehicle_for_onward_transportation_manager
-                                            .number_not_assignable_containers)
-        assigned_as_fraction = number_assigned_containers / (
-                    number_assigned_containers + number_not_assignable_containers)
-        self.logger.info(
-            f"Containers for which no outgoing vehicle could be found: {(assigned_as_fraction * 100):.2f}%")
-
-        self.logger.info("Loading status of vehicles adhering to a schedule:")
-        report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
-        report.generate()
-        self.logger.info(report.get_text_representation())
+        self.large_scheduled_vehicle_creation_service.create(
+            number_processes=number_processes,
+            schedule_ids=schedule_ids
+        )
+
+    def _assign_containers_for_onward_transportation(
+            self,
+            profile: ContainerFlowGenerationProfile,
+            only_unassigned_containers: bool = False
+    ) -> bool:
+        stage = "onward_assignment"
+        checkpoint_repository = self.container_flow_generation_checkpoint_repository
+        if checkpoint_repository.is_stage_finished(stage):
+            self.logger.info(f"Skip the stage '{stage}' which has been finished before")
+            return False
+
+        progress = checkpoint_repository.get_progress(stage)
+
+        def save_progress(new_progress: OnwardTransportationProgress) -> None:
+            checkpoint_repository.save_progress(
+                stage=stage,
+                number_finished_chunks=new_progress.number_finished_chunks,
+                random_state=new_progress.random_state
+            )
+
+        with profile.measure(stage):
+            self.logger.info("Assign containers arriving by vehicles adhering a schedule for onward transportation...")
+            self.large_scheduled_vehicle_for_onward_transportation_manager.choose_departing_vehicle_for_containers(
+                progress=(OnwardTransportationProgress(*progress) if progress is not None else None),
+                on_chunk_finished=save_progress,
+                only_unassigned_containers=only_unassigned_containers
+            )
+            number_assigned_containers = (self.large_scheduled_vehicle_for_onward_transportation_manager
+                                          .number_assigned_containers)
+            number_not_assignable_containers = (self.large_scheduled_vehicle_for_onward_transportation_manager
+                                                .number_not_assignable_containers)
+            if number_assigned_containers + number_not_assignable_containers > 0:
+                assigned_as_fraction = number_assigned_containers / (
+                            number_assigned_containers + number_not_assignable_containers)
+                self.logger.info(
+                    f"Containers for which no outgoing vehicle could be found: {(assigned_as_fraction * 100):.2f}%")
+            checkpoint_repository.mark_stage_as_finished(stage)
+        return True
 
+    def _generate_trucks_for_picking_up(self) -> None:
         self.logger.info("Generate trucks that pick up containers...")
         self.truck_for_import_containers_manager.generate_trucks_for_picking_up()
 
+    def _allocate_space_for_containers_delivered_by_truck(self) -> None:
         self.logger.info("Generate containers that are delivered by trucks...")
         self.allocate_space_for_containers_delivered_by_truck_service.allocate()
 
-        self.logger.info("Loading status of vehicles adhering to a schedule:")
-        report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
-        report.generate()
-        self.logger.info(report.get_text_representation())
+    def _create_indexes(self) -> None:
+        self.logger.info("Re-create indexes...")
+        create_indexes(database_proxy)
 
+    def _generate_trucks_for_delivering(self) -> None:
         self.logger.info("Generate trucks that deliver containers...")
         self.truck_for_export_containers_manager.generate_trucks_for_delivering()
 
+    def _assign_destinations(self) -> None:
         self.logger.info("Assign containers to next destinations...")
         self.assign_destination_to_container_service.assign()
 
+    def _get_schedule_changes(self) -> ScheduleChanges | None:
+        if not self.container_flow_generation_checkpoint_repository.is_stage_finished("destinations"):
+            self.logger.info("No finished container flow has been found, generate the whole container flow...")
+            return None
+        schedule_changes = self.container_flow_generation_fingerprint_repository.get_schedule_changes()
+        if schedule_changes is None:
+            self.logger.info("The properties or distributions have changed since the last generation, generate the "
+                             "whole container flow...")
+        return schedule_changes
+
+    def generate(
+            self,
+            number_processes: int | None = None,
+            seed: int | None = None,
+            defer_index_creation: bool = False,
+            resume: bool = False,
+            incremental: bool = False
+    ) -> ContainerFlowGenerationProfile:
+        if resume and incremental:
+            raise ValueError("An interrupted generation can only be resumed as a whole")
+
+        profile = ContainerFlowGenerationProfile()
+
+        schedule_changes = self._get_schedule_changes() if incremental else None
+        if schedule_changes is not None and not (
+                schedule_changes.changed_schedule_ids or schedule_changes.removed_schedule_ids):
+            self.logger.info("No schedule has changed since the last generation, nothing to do")
+            return profile
+        if schedule_changes is None:
+            self._generate(profile, number_processes, seed, defer_index_creation, resume, None)
+        else:
+            # An incremental generation cannot be resumed, so it is either applied as a whole or not at all
+            with database_proxy.atomic():
+                self._generate(profile, number_processes, seed, defer_index_creation, False, schedule_changes)
+
+        DataSummariesCache.reset_cache()
         self.logger.info("Container flow generation finished")
+        self.logger.debug("Resources consumed by each stage:\n" + profile.get_text_representation())
+        return profile
+
+    def _generate(
+            self,
+            profile: ContainerFlowGenerationProfile,
+            number_processes: int | None,
+            seed: int | None,
+            defer_index_creation: bool,
+            resume: bool,
+            schedule_changes: ScheduleChanges | None
+    ) -> None:
+        """Runs all stages of the generation. If the schedule changes are given, only the container flow of these
+        schedules is generated again."""
+        checkpoint_repository = self.container_flow_generation_checkpoint_repository
+
+        # The checkpoints are kept after a generation has finished, only an unfinished generation can be resumed
+        if resume and (not checkpoint_repository.has_started()
+                       or checkpoint_repository.is_stage_finished("destinations")):
+            self.logger.info("No interrupted generation has been found, start from scratch...")
+            resume = False
+
+        changed_schedule_ids = None
+        with profile.measure("clear"):
+            if resume:
+                self.logger.info("Resume the interrupted generation...")
+                stored_seed = checkpoint_repository.get_seed()
+                if seed is not None and seed != stored_seed:
+                    self.logger.warning(f"The seed {seed} is ignored, the interrupted generation used the seed "
+                                        f"{stored_seed}")
+                seed = stored_seed
+            elif schedule_changes is not None:
+                changed_schedule_ids = schedule_changes.changed_schedule_ids
+                self.logger.info(f"Remove the previous data of {len(changed_schedule_ids)} changed and "
+                                 f"{len(schedule_changes.removed_schedule_ids)} removed schedules...")
+                self.remove_container_flow_of_schedules_service.remove(
+                    changed_schedule_ids + schedule_changes.removed_schedule_ids
+                )
+                checkpoint_repository.reset()
+            else:
+                self.logger.info("Remove previous data...")
+                self.clear_previous_container_flow()
+                checkpoint_repository.reset()
+            if defer_index_creation and not checkpoint_repository.is_stage_finished("index_creation"):
+                self.logger.info("Drop indexes until all containers are created and assigned to vehicles...")
+                drop_indexes(database_proxy)
+            else:
+                # A previous generation with deferred index creation might have been interrupted
+                create_indexes(database_proxy)
+        DataSummariesCache.reset_cache()
+
+        with profile.measure("preparation"):
+            # Each stage draws from its own stream, so a resumed stage starts with the same random numbers again
+            seed = self._seed_random_number_generators(seed)
+            checkpoint_repository.set_seed(seed)
+            self.logger.info("Reloading properties and distributions...")
+            self._update_generation_properties_and_distributions()
+
+        has_run_any_stage = self._run_stage(
+            profile, "fleet_creation", lambda: self._create_fleet(number_processes, changed_schedule_ids)
+        )
+
+        self._log_report(profile)
+
+        has_run_any_stage |= self._assign_containers_for_onward_transportation(
+            profile,
+            only_unassigned_containers=(schedule_changes is not None)
+        )
+
+        self._log_report(profile)
+
+        has_run_any_stage |= self._run_stage(profile, "import_trucks", self._generate_trucks_for_picking_up)
+
+        has_run_any_stage |= self._run_stage(
+            profile, "export_allocation", self._allocate_space_for_containers_delivered_by_truck
+        )
+
+        if defer_index_creation:
+            self._run_stage(profile, "index_creation", self._create_indexes)
+
+        self._log_report(profile)
+
+        has_run_any_stage |= self._run_stage(profile, "export_trucks", self._generate_trucks_for_delivering)
+
+        has_run_any_stage |= self._run_stage(profile, "destinations", self._assign_destinations)
+
+        self._log_report(profile, "Final capacity status of vehicles adhering to a schedule:")
 
-        self.logger.info("Final capacity status of vehicles adhering to a schedule:")
-        report = ContainerFlowStatisticsReport(transportation_buffer=self.transportation_buffer)
-        report.generate()
-        self.logger.info(report.get_text_representation())
+        # Otherwise, the container flow has not been generated from the current input data
+        if has_run_any_stage:
+            self.container_flow_generation_fingerprint_repository.save_fingerprints()
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import datetime
 import enum
 import logging
 import os
-from typing import Dict, Type
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
 from functools import lru_cache
 
 import numpy as np
 import pandas as pd
-from peewee import ModelSelect
+from peewee import BooleanField, CharField, DateField, DateTimeField, Field, FloatField, ForeignKeyField, \
+    IntegerField, JOIN, ModelSelect, TextField, TimeField, chunked, fn
 
 from conflowgen.application_models.data_types.export_file_format import ExportFileFormat
 from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
@@ -18,6 +20,9 @@ from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.field_types.container_length import ContainerLengthField
+from conflowgen.domain_models.field_types.mode_of_transport import ModeOfTransportField
+from conflowgen.domain_models.field_types.storage_requirement import StorageRequirementField
 from conflowgen.domain_models.large_vehicle_schedule import Destination
 from conflowgen.domain_models.vehicle import DeepSeaVessel, LargeScheduledVehicle, Feeder, Barge, Train, Truck, \
     AbstractLargeScheduledVehicle
@@ -48,20 +53,44 @@ class ExportContainerFlowService:
         cls.logger.debug(msg)
 
     @classmethod
-    def _save_as_csv(cls, df: pd.DataFrame, file_name: str) -> None:
+    def _save_as_csv(cls, model: Type[BaseModel], index_column: str, file_name: str) -> int:
         assert file_name.endswith(".csv")
-        # noinspection PyTypeChecker
-        df.to_csv(file_name)
+        formats_of_datetime_columns = cls._get_formats_of_datetime_columns(model)
+        number_written_rows = 0
+        for df in cls._convert_table_to_pandas_dataframes(model, index_column):
+            for column, (date_format, number_fractional_digits) in formats_of_datetime_columns.items():
+                if column in df.columns and pd.api.types.is_datetime64_any_dtype(df[column]):
+                    df[column] = cls._format_datetime_column(df[column], date_format, number_fractional_digits)
+            # noinspection PyTypeChecker
+            df.to_csv(file_name, mode=("a" if number_written_rows else "w"), header=(number_written_rows == 0))
+            number_written_rows += len(df)
+        return number_written_rows
 
     @classmethod
-    def _save_as_xls(cls, df: pd.DataFrame, file_name: str):
+    def _save_as_excel(cls, model: Type[BaseModel], index_column: str, file_name: str) -> int:
+        """
+        Each chunk is appended to the same sheet. The workbook itself is only written to the file once all chunks have
+        been added.
+        """
+        number_written_rows = 0
+        with pd.ExcelWriter(file_name) as writer:
+            for df in cls._convert_table_to_pandas_dataframes(model, index_column):
+                if number_written_rows == 0:
+                    df.to_excel(writer)
+                else:
+                    df.to_excel(writer, startrow=number_written_rows + 1, header=False)
+                number_written_rows += len(df)
+        return number_written_rows
+
+    @classmethod
+    def _save_as_xls(cls, model: Type[BaseModel], index_column: str, file_name: str) -> int:
         assert file_name.endswith(".xls")
-        df.to_excel(file_name)
+        return cls._save_as_excel(model, index_column, file_name)
 
     @classmethod
-    def _save_as_xlsx(cls, df: pd.DataFrame, file_name: str):
+    def _save_as_xlsx(cls, model: Type[BaseModel], index_column: str, file_name: str) -> int:
         assert file_name.endswith(".xlsx")
-        df.to_excel(file_name)
+        return cls._save_as_excel(model, index_column, file_name)
 
     enums_to_convert = (
         ContainerLength,
@@ -111,6 +140,32 @@ class ExportContainerFlowService:
         }
     }
 
+    # The exported tables with their file name and the column that identifies a row
+    tables_to_export = (
+        ("containers", Container, "id"),
+        ("deep_sea_vessels", DeepSeaVessel, "large_scheduled_vehicle"),
+        ("feeders", Feeder, "large_scheduled_vehicle"),
+        ("barges", Barge, "large_scheduled_vehicle"),
+        ("trains", Train, "large_scheduled_vehicle"),
+        ("trucks", Truck, "id"),
+    )
+
+    # These formats are written batch by batch straight from the database cursor, the others via pandas
+    arrow_based_file_formats = (
+        ExportFileFormat.parquet,
+        ExportFileFormat.feather
+    )
+
+    # Each batch of rows that is fetched from the database cursor and written to a file contains at most this many rows
+    number_rows_per_batch = 65536
+
+    # Columns of these field types are dictionary-encoded with the members of the enum as the dictionary
+    enum_of_field_type = {
+        ContainerLengthField: ContainerLength,
+        StorageRequirementField: StorageRequirement,
+        ModeOfTransportField: ModeOfTransport
+    }
+
     def __init__(self):
         self.save_as_file_format_mapping = {
             ExportFileFormat.csv: self._save_as_csv,
@@ -119,56 +174,103 @@ class ExportContainerFlowService:
         }
 
     @classmethod
-    def _convert_table_to_pandas_dataframe(
+    def _select_with_resolved_foreign_keys(
             cls,
-            model: Type[BaseModel] | ModelSelect,
-            resolved_column: str | None = None
-    ) -> pd.DataFrame:
+            model: Type[BaseModel]
+    ) -> Tuple[ModelSelect, List[Field], List[Tuple[str, List[Field]]]]:
+        """
+        Builds a single query for all rows of the table. The foreign keys to resolve are joined and their columns are
+        selected after the columns of the table itself.
 
-        if resolved_column is not None:
-            cls.debug_once(f"This is a nested call to resolve the column '{resolved_column}'")
+        Returns: The query, the fields of the table, and for each resolved foreign key the fields of the joined table
+        """
+        fields: List[Field] = model._meta.sorted_fields  # pylint: disable=protected-access
+        primary_key_of_model = model._meta.primary_key  # pylint: disable=protected-access
+        columns = [field.name for field in fields]
+        selected_fields = list(fields)
+        query = model.select()
+
+        nested_fields_per_foreign_key: List[Tuple[str, List[Field]]] = []
+        for column, model_of_column in cls.foreign_keys_to_resolve.get(model, {}).items():
+            cls.debug_once(f"Resolving column {column} of model {model}...")
+            model_of_column_alias = model_of_column.alias()
+            primary_key = model_of_column._meta.primary_key  # pylint: disable=protected-access
+            nested_fields = [
+                field for field in model_of_column._meta.sorted_fields  # pylint: disable=protected-access
+                if field is not primary_key and field.name not in cls.columns_to_drop.get(model_of_column, [])
+            ]
+            for nested_field in nested_fields:
+                assert nested_field.name not in columns, "Do not accidentally overwrite a column by a nested column"
+            selected_fields.extend(getattr(model_of_column_alias, field.name) for field in nested_fields)
+            query = query.join_from(
+                model,
+                model_of_column_alias,
+                JOIN.LEFT_OUTER,
+                on=(getattr(model, column) == getattr(model_of_column_alias, primary_key.name))
+            )
+            nested_fields_per_foreign_key.append((column, nested_fields))
 
-        # extract data from sql database
-        data = list(model.select().dicts())
+        query = query.select(*selected_fields).order_by(primary_key_of_model)
+        return query, fields, nested_fields_per_foreign_key
 
-        if type(model) == ModelSelect:  # pylint: disable=unidiomatic-typecheck  # TODO: check if isinstance works
-            model = model.model
+    @classmethod
+    def _convert_to_row(
+            cls,
+            values: Sequence[Any],
+            columns: List[str],
+            nested_fields_per_foreign_key: List[Tuple[str, List[Field]]]
+    ) -> Dict[str, Any]:
+        """
+        The columns of a resolved foreign key are only added to the row if the row references another row.
+        """
+        values = [
+            value.value if isinstance(value, cls.enums_to_convert) else value
+            for value in values
+        ]
+        row = dict(zip(columns, values[:len(columns)]))
+        index_of_first_nested_value = len(columns)
+        for column, nested_fields in nested_fields_per_foreign_key:
+            if row[column] is not None:  # Only if the foreign key points to something, it is resolved
+                row.update(zip(
+                    [nested_field.name for nested_field in nested_fields],
+                    values[index_of_first_nested_value:index_of_first_nested_value + len(nested_fields)]
+                ))
+            index_of_first_nested_value += len(nested_fields)
+        return row
 
-        foreign_keys_to_resolve = {}
-        if model in cls.foreign_keys_to_resolve.keys():
-            foreign_keys_to_resolve = cls.foreign_keys_to_resolve[model]
+    @classmethod
+    def _get_columns_in_order_of_appearance(
+            cls,
+            model: Type[BaseModel],
+            fields: List[Field],
+            nested_fields_per_foreign_key: List[Tuple[str, List[Field]]]
+    ) -> List[str]:
+        """
+        If all rows were converted at once, pandas would add the columns of a resolved foreign key at the first row
+        that references another row. Thus, the columns of the foreign keys are ordered by that row and a foreign key
+        that never references another row has no columns at all. This is determined beforehand so that each chunk of
+        rows has the same columns.
+        """
+        primary_key = model._meta.primary_key  # pylint: disable=protected-access
+        first_references = []
+        for position, (column, nested_fields) in enumerate(nested_fields_per_foreign_key):
+            id_of_first_row = model.select(fn.MIN(primary_key)).where(getattr(model, column).is_null(False)).scalar()
+            if id_of_first_row is not None:
+                first_references.append((id_of_first_row, position, nested_fields))
+        columns = [field.name for field in fields]
+        for _, _, nested_fields in sorted(first_references, key=lambda first_reference: first_reference[:2]):
+            columns.extend(nested_field.name for nested_field in nested_fields)
+        return columns
 
-        # resolve some of the foreign keys
-        for i, row in enumerate(data):
-            for column, value in list(row.items()):
-                if column not in foreign_keys_to_resolve.keys():  # This is not a foreign key to resolve
-                    continue
-                if value is None:  # The foreign key points to nothing, thus no resolution
-                    continue
-                cls.debug_once(f"Resolving column {column} of model {model}...")
-                model_of_column = foreign_keys_to_resolve[column]
-                nested_model_select = model_of_column.select().where(
-                    model_of_column.id == value
-                )
-                nested_df = cls._convert_table_to_pandas_dataframe(
-                    nested_model_select,
-                    resolved_column=column
-                )  # Recursively resolve the relationship
-                assert len(nested_df) == 1, "Only 1:1 relationships between tables are supported"
-                nested_values = nested_df.iloc[0]
-                for nested_column in nested_df.columns:
-                    assert nested_column not in data[i].keys(), "Do not accidentally overwrite a column by a nested " \
-                                                                "column"
-                    data[i][nested_column] = nested_values[nested_column]
-
-        # convert enums to their value
-        for i, row in enumerate(data):
-            for column, value in row.items():
-                if isinstance(value, cls.enums_to_convert):
-                    value: enum.Enum
-                    data[i][column] = value.value
-
-        df_table = pd.DataFrame(data)
+    @classmethod
+    def _convert_rows_to_pandas_dataframe(
+            cls,
+            model: Type[BaseModel],
+            index_column: str,
+            rows: List[Dict[str, Any]],
+            columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        df_table = pd.DataFrame(rows, columns=columns)
 
         # remove any columns that have been (accidentally) inserted, e.g. by resolving foreign keys.
         if model in cls.columns_to_drop:
@@ -188,8 +290,10 @@ class ExportContainerFlowService:
             df_table.rename(columns=columns_to_rename, inplace=True)
 
         # use SQL id instead of newly created pandas id if present
-        if len(data) > 0:
+        if len(rows) > 0:
             df_table.set_index("id", drop=True, inplace=True)
+            if index_column != "id":
+                df_table.set_index(index_column, drop=True, inplace=True)
 
         # use nullable int instead of float (currently we don't use any floats in the whole application)
         for column in df_table.columns:
@@ -198,37 +302,209 @@ class ExportContainerFlowService:
                     df_table[column] = df_table[column].astype("Int64")
                 except TypeError as error:
                     raise CastingException(
-                        f"Column '{column}' for model '{model.model}' could not be casted from float64 to Int64"
+                        f"Column '{column}' for model '{model}' could not be casted from float64 to Int64"
                     ) from error
 
         return df_table
 
     @classmethod
-    def _convert_sql_database_to_pandas_dataframe(cls) -> Dict[str, pd.DataFrame]:
+    def _convert_table_to_pandas_dataframe(
+            cls,
+            model: Type[BaseModel],
+            index_column: str = "id"
+    ) -> pd.DataFrame:
+        """
+        Converts all rows of the table at once, including the resolved foreign keys.
+        """
+        query, fields, nested_fields_per_foreign_key = cls._select_with_resolved_foreign_keys(model)
+        columns = [field.name for field in fields]
+        rows = [
+            cls._convert_to_row(values, columns, nested_fields_per_foreign_key)
+            for values in query.tuples().iterator()
+        ]
+        return cls._convert_rows_to_pandas_dataframe(model, index_column, rows)
+
+    @classmethod
+    def _convert_table_to_pandas_dataframes(
+            cls,
+            model: Type[BaseModel],
+            index_column: str
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Converts the table chunk by chunk while the rows are fetched from the database cursor. Thus, only one chunk is
+        kept in memory at a time. All chunks have the columns that a conversion of all rows at once would have.
+        """
+        query, fields, nested_fields_per_foreign_key = cls._select_with_resolved_foreign_keys(model)
+        columns = [field.name for field in fields]
+        columns_in_order_of_appearance = cls._get_columns_in_order_of_appearance(
+            model, fields, nested_fields_per_foreign_key
+        )
+        is_empty = True
+        for values_of_rows in chunked(query.tuples().iterator(), cls.number_rows_per_batch):
+            is_empty = False
+            rows = [
+                cls._convert_to_row(values, columns, nested_fields_per_foreign_key)
+                for values in values_of_rows
+            ]
+            yield cls._convert_rows_to_pandas_dataframe(model, index_column, rows, columns_in_order_of_appearance)
+        if is_empty:
+            yield cls._convert_rows_to_pandas_dataframe(model, index_column, [])
 
-        df_container = cls._convert_table_to_pandas_dataframe(Container)
-        result = {
-            "containers": df_container,
-        }
+    @classmethod
+    def _get_formats_of_datetime_columns(cls, model: Type[BaseModel]) -> Dict[str, Tuple[str, int]]:
+        """
+        If a whole column is written at once, pandas uses the same format for all its timestamps. Only the date is
+        written if all timestamps are at midnight, otherwise the time is written with as many fractional digits of a
+        second as the most precise timestamp needs. As the table is written chunk by chunk, that format is determined
+        beforehand for the whole table.
 
-        large_schedule_vehicles_as_subtype = {
-            "deep_sea_vessels": DeepSeaVessel,
-            "feeders": Feeder,
-            "barges": Barge,
-            "trains": Train,
-        }
-        for file_name, large_schedule_vehicle_as_subtype in large_schedule_vehicles_as_subtype.items():
-            cls.logger.debug(f"Gathering data for generating the '{file_name}' table...")
-            df = cls._convert_table_to_pandas_dataframe(large_schedule_vehicle_as_subtype)
-            if len(df):
-                df.set_index("large_scheduled_vehicle", drop=True, inplace=True)
+        Returns: For each column with timestamps, the format and the number of fractional digits
+        """
+        query, fields, nested_fields_per_foreign_key = cls._select_with_resolved_foreign_keys(model)
+        selected_fields = fields + [
+            nested_field for _, nested_fields in nested_fields_per_foreign_key for nested_field in nested_fields
+        ]
+        positions_of_datetime_fields = [
+            position for position, field in enumerate(selected_fields) if isinstance(field, DateTimeField)
+        ]
+        if not positions_of_datetime_fields:
+            return {}
+        datetime_fields = [selected_fields[position] for position in positions_of_datetime_fields]
+        # The resolved foreign keys are selected from the joined aliases, thus the columns of the query are reused
+        query = query.select(*[query.selected_columns[position] for position in positions_of_datetime_fields])
+
+        is_only_date = [True] * len(datetime_fields)
+        number_fractional_digits = [0] * len(datetime_fields)
+        for values in query.tuples().iterator():
+            for position, value in enumerate(values):
+                if value is None:
+                    continue
+                if value.time() != datetime.time():
+                    is_only_date[position] = False
+                if value.microsecond % 1000:
+                    number_fractional_digits[position] = 6
+                elif value.microsecond:
+                    number_fractional_digits[position] = max(number_fractional_digits[position], 3)
+
+        columns_to_rename = cls.columns_to_rename.get(model, {})
+        formats_of_datetime_columns = {}
+        for position, field in enumerate(datetime_fields):
+            if is_only_date[position]:
+                date_format = "%Y-%m-%d"
+            elif number_fractional_digits[position]:
+                date_format = "%Y-%m-%d %H:%M:%S.%f"
             else:
-                cls.logger.info(f"No content found for the {file_name} table, the file will be empty.")
-            result[file_name] = df
+                date_format = "%Y-%m-%d %H:%M:%S"
+            column = columns_to_rename.get(field.name, field.name)
+            formats_of_datetime_columns[column] = (date_format, number_fractional_digits[position])
+        return formats_of_datetime_columns
+
+    @staticmethod
+    def _format_datetime_column(column: pd.Series, date_format: str, number_fractional_digits: int) -> pd.Series:
+        formatted_column = column.dt.strftime(date_format)
+        if number_fractional_digits == 3:  # strftime always writes six fractional digits
+            formatted_column = formatted_column.str[:-3]
+        return formatted_column
+
+    @classmethod
+    def _get_arrow_dictionary(cls, enum_type: Type[enum.Enum]) -> object:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        return pa.array([member.value for member in enum_type])
+
+    @classmethod
+    def _get_arrow_type(cls, field: Field) -> object:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        for field_type, enum_type in cls.enum_of_field_type.items():
+            if isinstance(field, field_type):
+                return pa.dictionary(pa.int8(), cls._get_arrow_dictionary(enum_type).type)
+        # The more specific field types must be checked first, e.g. an AutoField is also an IntegerField
+        arrow_type_of_field_type = (
+            (ForeignKeyField, pa.int64()),
+            (IntegerField, pa.int64()),
+            (FloatField, pa.float64()),
+            (BooleanField, pa.bool_()),
+            (DateTimeField, pa.timestamp("us")),
+            (DateField, pa.date32()),
+            (TimeField, pa.time64("us")),
+            (CharField, pa.string()),
+            (TextField, pa.string()),
+        )
+        for field_type, arrow_type in arrow_type_of_field_type:
+            if isinstance(field, field_type):
+                return arrow_type
+        raise CastingException(f"Field '{field.name}' of type {type(field)} can not be exported to an Apache Arrow "
+                               f"based file format")
+
+    @classmethod
+    def _convert_to_arrow_array(cls, field: Field, values: Sequence[Any]) -> object:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        for field_type, enum_type in cls.enum_of_field_type.items():
+            if isinstance(field, field_type):
+                # The dictionary is the same for each batch so that it never needs to be replaced within a file
+                index_of_member = {member: index for index, member in enumerate(enum_type)}
+                indices = pa.array(
+                    [index_of_member[value] if value is not None else None for value in values],
+                    type=pa.int8()
+                )
+                return pa.DictionaryArray.from_arrays(indices, cls._get_arrow_dictionary(enum_type))
+        return pa.array(values, type=cls._get_arrow_type(field))
+
+    @classmethod
+    def _save_table_as_arrow_based_file_format(
+            cls,
+            model: Type[BaseModel],
+            index_column: str,
+            path_to_file: str,
+            file_format: ExportFileFormat
+    ) -> int:
+        """
+        Writes the table batch by batch while the rows are fetched from the database cursor. Thus, only one batch is
+        kept in memory at a time. The columns are the same as for the other file formats but the index column is just
+        the first column. If a row does not reference another row, the resolved columns of that foreign key are null.
 
-        df_trucks = cls._convert_table_to_pandas_dataframe(Truck)
-        result["trucks"] = df_trucks
-        return result
+        Returns: The number of written rows
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+        query, fields, nested_fields_per_foreign_key = cls._select_with_resolved_foreign_keys(model)
+        selected_fields = fields + [
+            nested_field for _, nested_fields in nested_fields_per_foreign_key for nested_field in nested_fields
+        ]
+
+        columns_to_drop = set(cls.columns_to_drop.get(model, []))
+        if index_column != "id":
+            columns_to_drop.add("id")  # as for the other file formats, the id is replaced by the index column
+        exported_columns = [
+            (position, field) for position, field in enumerate(selected_fields) if field.name not in columns_to_drop
+        ]
+        exported_columns.sort(key=lambda exported_column: exported_column[1].name != index_column)
+
+        columns_to_rename = cls.columns_to_rename.get(model, {})
+        schema = pa.schema([
+            pa.field(columns_to_rename.get(field.name, field.name), cls._get_arrow_type(field))
+            for _, field in exported_columns
+        ])
+
+        if file_format == ExportFileFormat.parquet:
+            writer = pq.ParquetWriter(path_to_file, schema)
+        elif file_format == ExportFileFormat.feather:
+            writer = pa.ipc.new_file(path_to_file, schema)
+        else:
+            raise ValueError(f"The file format {file_format} is not based on Apache Arrow")
+
+        number_written_rows = 0
+        with writer:
+            for rows in chunked(query.tuples().iterator(), cls.number_rows_per_batch):
+                values_per_column = list(zip(*rows))
+                batch = pa.RecordBatch.from_arrays(
+                    [cls._convert_to_arrow_array(field, values_per_column[position])
+                     for position, field in exported_columns],
+                    schema=schema
+                )
+                writer.write_batch(batch)
+                number_written_rows += len(rows)
+        return number_written_rows
 
     def export(self, folder_name: str, file_format: ExportFileFormat):
         """Export container flow to other file formats, simplify internal representation for further processing.
@@ -242,14 +518,16 @@ class ExportContainerFlowService:
         self.logger.info(f"Creating folder {path_to_folder}...")
         os.mkdir(path_to_folder)
         self.logger.info(f"Converting SQL database into file format '.{file_format.value}'")
-        dfs = self._convert_sql_database_to_pandas_dataframe()
-        for file_name, df in dfs.items():
+        for file_name, model, index_column in self.tables_to_export:
             full_file_name = file_name + "." + file_format.value
-            path_to_file = os.path.join(
-                path_to_folder,
-                full_file_name
-            )
+            path_to_file = os.path.join(path_to_folder, full_file_name)
             self.logger.debug(f"Saving file '{full_file_name}'...")
-            # noinspection PyArgumentList
-            self.save_as_file_format_mapping[file_format](df, path_to_file)
+            if file_format in self.arrow_based_file_formats:
+                number_written_rows = self._save_table_as_arrow_based_file_format(
+                    model, index_column, path_to_file, file_format
+                )
+            else:
+                number_written_rows = self.save_as_file_format_mapping[file_format](model, index_column, path_to_file)
+            if number_written_rows == 0:
+                self.logger.info(f"No content found for the {file_name} table, the file will be empty.")
         self.logger.info("Export has finished successfully.")
@@ -1,9 +1,15 @@
+from __future__ import annotations
+
+import concurrent.futures
 import datetime
-from typing import List
+from typing import Collection, Iterable, List
 import logging
 
+import numpy as np
+
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
-from conflowgen.domain_models.factories.container_factory import ContainerFactory
+from conflowgen.domain_models.factories.container_factory import ContainerFactory, \
+    create_container_rows_for_large_scheduled_vehicles
 from conflowgen.domain_models.factories.fleet_factory import FleetFactory
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
 from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle
@@ -23,6 +29,7 @@ class LargeScheduledVehicleCreationService:
         self.container_factory = ContainerFactory()
         self.container_flow_start_date = None
         self.container_flow_end_date = None
+        self.seed_sequence = np.random.SeedSequence()
 
     def reload_properties(
             self,
@@ -34,12 +41,28 @@ class LargeScheduledVehicleCreationService:
         self.container_flow_end_date = container_flow_end_date
         self.container_factory.reload_distributions()
 
-    def create(self) -> None:
+    def create(self, number_processes: int | None = None, schedule_ids: Collection[int] | None = None) -> None:
+        """
+        Creates the vehicles of each schedule and the containers they deliver.
+
+        Args:
+            number_processes: If more than one process is used, the containers of the schedules are sampled in parallel
+                in a pool of processes. The database is only written to by the current process. For the same
+                :attr:`seed_sequence`, the results do not depend on the number of processes.
+            schedule_ids: If given, only the vehicles of these schedules are created, e.g. because only these schedules
+                have changed since the last generation.
+        """
         assert self.container_flow_start_date is not None
         assert self.container_flow_end_date is not None
-        schedules: List[Schedule] = Schedule.select().execute()  # pylint: disable=no-value-for-parameter
+        # Each schedule draws from the stream at its position, so the order must not depend on how rows are stored
+        schedules_query = Schedule.select().order_by(Schedule.id)
+        if schedule_ids is not None:
+            schedules_query = schedules_query.where(Schedule.id << list(schedule_ids))
+        schedules: List[Schedule] = list(schedules_query)
+
+        vehicles_per_schedule: List[List[AbstractLargeScheduledVehicle]] = []
         for i, schedule in enumerate(schedules):
-            self.logger.debug(f"Create vehicles and containers for service '{schedule.service_name}' of type "
+            self.logger.debug(f"Create vehicles for service '{schedule.service_name}' of type "
                               f"'{schedule.vehicle_type}', "
                               f"progress: {i+1} / {len(schedules)} ({100*(i + 1)/len(schedules):.2f}%)")
             # noinspection PyArgumentList
@@ -48,5 +71,58 @@ class LargeScheduledVehicleCreationService:
                 latest_at=self.container_flow_end_date,
                 first_at=self.container_flow_start_date
             )
-            for vehicle in vehicles:
-                self.container_factory.create_containers_for_large_scheduled_vehicle(vehicle)
+            vehicles_per_schedule.append(vehicles)
+
+        # The free capacities of all vehicles are looked up at once and stay in the cache until the containers are
+        # stored
+        vehicles_to_fill = self.container_factory.get_vehicles_to_fill([
+            vehicle for vehicles in vehicles_per_schedule for vehicle in vehicles
+        ])
+        vehicles_to_fill_per_schedule = []
+        index_of_first_vehicle = 0
+        for vehicles in vehicles_per_schedule:
+            vehicles_to_fill_per_schedule.append(
+                vehicles_to_fill[index_of_first_vehicle:index_of_first_vehicle + len(vehicles)]
+            )
+            index_of_first_vehicle += len(vehicles)
+
+        # Each schedule has its own stream of random numbers so that it does not matter which process samples it
+        container_attribute_samplers = [
+            self.container_factory.container_attribute_sampler.with_random_number_generator(
+                np.random.default_rng(seed_sequence_of_schedule)
+            )
+            for seed_sequence_of_schedule in self.seed_sequence.spawn(len(schedules))
+        ]
+
+        if number_processes is None or number_processes <= 1:
+            container_rows_per_schedule = map(
+                create_container_rows_for_large_scheduled_vehicles,
+                container_attribute_samplers,
+                vehicles_to_fill_per_schedule
+            )
+            self._store_containers(schedules, vehicles_per_schedule, container_rows_per_schedule)
+        else:
+            self.logger.info(f"Sample the containers of {len(schedules)} schedules in {number_processes} processes")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=number_processes) as executor:
+                container_rows_per_schedule = executor.map(
+                    create_container_rows_for_large_scheduled_vehicles,
+                    container_attribute_samplers,
+                    vehicles_to_fill_per_schedule
+                )
+                self._store_containers(schedules, vehicles_per_schedule, container_rows_per_schedule)
+
+    def _store_containers(
+            self,
+            schedules: List[Schedule],
+            vehicles_per_schedule: List[List[AbstractLargeScheduledVehicle]],
+            container_rows_per_schedule: Iterable[List[List[tuple]]]
+    ) -> None:
+        # The schedules are stored in their original order, no matter in which order they have been sampled
+        for i, (vehicles, container_rows_per_vehicle) in enumerate(zip(
+                vehicles_per_schedule, container_rows_per_schedule)):
+            self.logger.debug(f"Store containers for service '{schedules[i].service_name}', "
+                              f"progress: {i+1} / {len(schedules)} ({100*(i + 1)/len(schedules):.2f}%)")
+            self.container_factory.store_container_rows_for_large_scheduled_vehicles(
+                large_scheduled_vehicles_as_subtype=vehicles,
+                container_rows_per_vehicle=container_rows_per_vehicle
+            )
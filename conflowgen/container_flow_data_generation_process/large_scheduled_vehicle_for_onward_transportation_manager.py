@@ -2,21 +2,64 @@ from __future__ import annotations
 import datetime
 import logging
 import random
-from typing import Collection, Tuple, List
+from typing import Callable, Dict, NamedTuple, Tuple, List
 
-from peewee import fn
+import numpy as np
+from peewee import JOIN
 
+from ..database_connection.bulk_insert import set_value_in_chunks, update_many_in_chunks, \
+    SQLITE_MAXIMUM_NUMBER_OF_VARIABLES
 from ..domain_models.arrival_information import TruckArrivalInformationForDelivery
+from ..domain_models.base_model import database_proxy
 from ..domain_models.container import Container
 from ..domain_models.distribution_repositories.mode_of_transport_distribution_repository import \
     ModeOfTransportDistributionRepository
+from ..domain_models.data_types.container_length import ContainerLength
 from ..domain_models.data_types.mode_of_transport import ModeOfTransport
 from ..domain_models.repositories.schedule_repository import ScheduleRepository
 from ..domain_models.vehicle import AbstractLargeScheduledVehicle, LargeScheduledVehicle, Truck
 
 
+class ContainerForOnwardTransportation(NamedTuple):
+    """
+    The information about a container that is required to choose the vehicle it departs with.
+    It is loaded for all containers at once so that no further queries are required during the assignment.
+    """
+
+    #: The id of the :class:`.Container`
+    id: int
+
+    #: The length of the container
+    length: ContainerLength
+
+    #: The vehicle type the container is delivered by
+    delivered_by: ModeOfTransport
+
+    #: The vehicle type the container is supposed to be picked up by
+    picked_up_by: ModeOfTransport
+
+    #: The point in time the container arrives at the terminal
+    arrival: datetime.datetime
+
+
+class OnwardTransportationProgress(NamedTuple):
+    """
+    How far the assignment of containers to departing vehicles has progressed. This is used to continue an interrupted
+    assignment.
+    """
+
+    #: The number of chunks of containers whose assignments have been written to the database
+    number_finished_chunks: int
+
+    #: The state of the random number generator after the last finished chunk
+    random_state: tuple
+
+
 class LargeScheduledVehicleForOnwardTransportationManager:
 
+    # The containers are loaded by their ids and their assignments are written in chunks of this size
+    number_containers_per_chunk = SQLITE_MAXIMUM_NUMBER_OF_VARIABLES
+
     def __init__(self):
         self.logger = logging.getLogger("conflowgen")
         self.schedule_repository = ScheduleRepository()
@@ -25,6 +68,13 @@ class LargeScheduledVehicleForOnwardTransportationManager:
         self.mode_of_transport_distribution = self.mode_of_transport_distribution_repository.get_distribution()
         self.number_assigned_containers = 0
         self.number_not_assignable_containers = 0
+        self.random_number_generator = random.Random()
+
+        # The assignments are kept in memory and are written to the database once a chunk of containers is handled
+        self._picked_up_by_large_scheduled_vehicle_per_container: Dict[int, int] = {}
+        self._picked_up_by_per_container: Dict[int, ModeOfTransport] = {}
+        self._containers_with_emergency_pickup: List[int] = []
+        self._exhausted_large_scheduled_vehicles: List[int] = []
 
         self.minimum_dwell_time_of_import_containers_in_hours = None
         self.minimum_dwell_time_of_export_containers_in_hours = None
@@ -71,7 +121,12 @@ class LargeScheduledVehicleForOnwardTransportationManager:
 
         self.mode_of_transport_distribution = self.mode_of_transport_distribution_repository.get_distribution()
 
-    def choose_departing_vehicle_for_containers(self) -> None:
+    def choose_departing_vehicle_for_containers(
+            self,
+            progress: OnwardTransportationProgress | None = None,
+            on_chunk_finished: Callable[[OnwardTransportationProgress], None] | None = None,
+            only_unassigned_containers: bool = False
+    ) -> None:
         """For all containers that are already in the database and that continue their journey with a vehicle that
         moves according to a schedule, a suiting vehicle is assigned here.
 
@@ -80,65 +135,111 @@ class LargeScheduledVehicleForOnwardTransportationManager:
 
         This method might be quite time-consuming because it repeatedly checks how many containers are already placed
         on a vehicle to obey the load restriction (maximum capacity of the vehicle available for the terminal).
+        The containers are loaded and updated in chunks so that the memory usage does not grow with the number of
+        containers beyond their ids.
+
+        Args:
+            progress: If given, the assignment continues after the last finished chunk of an interrupted assignment.
+                The random number generator must be in the same state as it was when the interrupted assignment
+                started.
+            on_chunk_finished: Is invoked after the assignments of each chunk have been written, within the same
+                transaction
+            only_unassigned_containers: Whether to skip the containers that have been assigned to a departing vehicle
+                before, e.g. by a previous generation that is only partially repeated
         """
         self.number_assigned_containers = 0
         self.number_not_assignable_containers = 0
+        self._picked_up_by_large_scheduled_vehicle_per_container = {}
+        self._picked_up_by_per_container = {}
+        self._containers_with_emergency_pickup = []
+        self._exhausted_large_scheduled_vehicles = []
 
-        self.large_scheduled_vehicle_repository.reset_cache()
+        self.schedule_repository.reset_cache()
+        self.large_scheduled_vehicle_repository.warm_up_cache(inbound=False)
 
         self.logger.info("Assign containers to departing vehicles that move according to a schedule...")
 
         # Get all containers in a random order which are picked up by a LargeScheduledVehicle
         # This way no vehicle has an advantage over another by its earlier arrival (getting better slots etc.)
-        containers: Collection[Container] = Container.select(
-        ).order_by(fn.Random()).where(
-            Container.picked_up_by << ModeOfTransport.get_scheduled_vehicles()
+        # Only the ids are shuffled here instead of in the database so that the order can be reproduced.
+        container_ids = self._load_ids_of_containers_picked_up_by_scheduled_vehicles(
+            include_emergency_pickups=(progress is not None),
+            only_unassigned_containers=only_unassigned_containers
         )
+        container_ids = np.random.default_rng(self.random_number_generator.getrandbits(128)).permutation(container_ids)
+        number_containers = len(container_ids)
+
+        number_finished_chunks = 0
+        if progress is not None:
+            number_finished_chunks = progress.number_finished_chunks
+            self.random_number_generator.setstate(progress.random_state)
+            self.number_not_assignable_containers = Container.select().where(Container.emergency_pickup).count()
+            self.number_assigned_containers = Container.select().where(
+                Container.picked_up_by_large_scheduled_vehicle.is_null(False) & ~Container.emergency_pickup
+            ).count()
+            self.logger.info(f"Continue after {number_finished_chunks} chunks of containers that have been assigned "
+                             f"before")
+
+        self.logger.info(f"In total {number_containers} containers continue their journey on a vehicle that adhere to "
+                         f"a schedule, assigning these containers to their respective vehicles...")
+        i = number_finished_chunks * self.number_containers_per_chunk
+        for index_of_first_container in range(i, number_containers, self.number_containers_per_chunk):
+            container_ids_of_chunk = container_ids[
+                index_of_first_container:index_of_first_container + self.number_containers_per_chunk
+            ].tolist()
+            for container in self._load_containers_picked_up_by_scheduled_vehicles(container_ids_of_chunk):
+                i += 1
+                if i % 1000 == 0:
+                    self.logger.info(f"Progress: {i} / {number_containers} ({100 * i / number_containers:.2f}%) "
+                                     f"containers have been assigned to a scheduled vehicle to leave the terminal "
+                                     f"again.")
+                self._assign_container(container)
+            number_finished_chunks += 1
+            with database_proxy.atomic():
+                self._write_assignments()
+                if on_chunk_finished is not None:
+                    on_chunk_finished(OnwardTransportationProgress(
+                        number_finished_chunks=number_finished_chunks,
+                        random_state=self.random_number_generator.getstate()
+                    ))
 
-        self.logger.info(f"In total {len(containers)} containers continue their journey on a vehicle that adhere to a "
-                         f"schedule, assigning these containers to their respective vehicles...")
-        for i, container in enumerate(containers):
-            i += 1
-            if i % 1000 == 0 and i > 0:
-                self.logger.info(f"Progress: {i} / {len(containers)} ({100 * i / len(containers):.2f}%) "
-                                 f"containers have been assigned to a scheduled vehicle to leave the terminal again.")
+        self.logger.info("All containers for which a departing vehicle that moves according to a schedule was "
+                         "available have been assigned to one.")
 
-            container_arrival = self._get_arrival_time_of_container(container)
+    def _assign_container(self, container: ContainerForOnwardTransportation) -> None:
+        container_arrival = container.arrival
 
-            minimum_dwell_time_in_hours, maximum_dwell_time_in_hours = self._get_dwell_times(container)
+        minimum_dwell_time_in_hours, maximum_dwell_time_in_hours = self._get_dwell_times(container)
 
-            # this value has been randomly drawn during container generation for the inbound traffic
-            # we try to adhere to that value as good as possible
-            initial_departing_vehicle_type = container.picked_up_by
+        # this value has been randomly drawn during container generation for the inbound traffic
+        # we try to adhere to that value as good as possible
+        initial_departing_vehicle_type = container.picked_up_by
 
-            # Get all vehicles which could be used for the onward transportation of the container
-            available_vehicles = self.schedule_repository.get_departing_vehicles(
-                start=(container_arrival + datetime.timedelta(hours=minimum_dwell_time_in_hours)),
-                end=(container_arrival + datetime.timedelta(hours=maximum_dwell_time_in_hours)),
-                vehicle_type=initial_departing_vehicle_type,
-                required_capacity=container.length
-            )
-
-            if len(available_vehicles) > 0:
-                # this is the case when there is a vehicle available and we can assign the container to that vehicle
-                # which is the happy path
-                self.number_assigned_containers += 1
-                self._pick_vehicle_for_container(available_vehicles, container)
-            else:
-                # maybe no possible vehicles are left of the required vehicle type, then we need to switch if we want to
-                # get the container out of the container yard before storage fees apply
-                self.number_not_assignable_containers += 1
-                self._find_alternative_mode_of_transportation(
-                    container, container_arrival, minimum_dwell_time_in_hours, maximum_dwell_time_in_hours
-                )
+        # Get all vehicles which could be used for the onward transportation of the container
+        available_vehicles = self.schedule_repository.get_departing_vehicles(
+            start=(container_arrival + datetime.timedelta(hours=minimum_dwell_time_in_hours)),
+            end=(container_arrival + datetime.timedelta(hours=maximum_dwell_time_in_hours)),
+            vehicle_type=initial_departing_vehicle_type,
+            required_capacity=container.length
+        )
 
-        self.logger.info("All containers for which a departing vehicle that moves according to a schedule was "
-                         "available have been assigned to one.")
+        if len(available_vehicles) > 0:
+            # this is the case when there is a vehicle available and we can assign the container to that vehicle
+            # which is the happy path
+            self.number_assigned_containers += 1
+            self._pick_vehicle_for_container(available_vehicles, container)
+        else:
+            # maybe no possible vehicles are left of the required vehicle type, then we need to switch if we want to
+            # get the container out of the container yard before storage fees apply
+            self.number_not_assignable_containers += 1
+            self._find_alternative_mode_of_transportation(
+                container, container_arrival, minimum_dwell_time_in_hours, maximum_dwell_time_in_hours
+            )
 
     def _pick_vehicle_for_container(
             self,
             available_vehicles: List[AbstractLargeScheduledVehicle],
-            container: Container
+            container: ContainerForOnwardTransportation
     ) -> AbstractLargeScheduledVehicle:
         """pick vehicle with the probability of its free capacity
         """
@@ -146,23 +247,53 @@ class LargeScheduledVehicleForOnwardTransportationManager:
             vehicle: self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
             for vehicle in available_vehicles
         }
-        vehicle: AbstractLargeScheduledVehicle = random.choices(
+        vehicle: AbstractLargeScheduledVehicle = self.random_number_generator.choices(
             population=list(vehicle_distribution.keys()),
             weights=list(vehicle_distribution.values())
         )[0]
         large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
         vehicle_type = vehicle.get_mode_of_transport()
 
-        container.picked_up_by_large_scheduled_vehicle = large_scheduled_vehicle
-        container.picked_up_by = vehicle_type
-        container.save()
+        if container.picked_up_by != vehicle_type:
+            self._picked_up_by_per_container[container.id] = vehicle_type
+        self._picked_up_by_large_scheduled_vehicle_per_container[container.id] = large_scheduled_vehicle.id
         vehicle_capacity_is_exhausted = self.schedule_repository.block_capacity_for_outbound_journey(vehicle, container)
         if vehicle_capacity_is_exhausted:
             large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation = True
-            large_scheduled_vehicle.save()
+            self._exhausted_large_scheduled_vehicles.append(large_scheduled_vehicle.id)
         return vehicle
 
-    def _get_dwell_times(self, container: Container) -> Tuple[int, int]:
+    def _write_assignments(self) -> None:
+        """Writes the assignments that have been kept in memory to the database, each kind of change in bulk."""
+        with database_proxy.atomic():
+            update_many_in_chunks(
+                model=Container,
+                field=Container.picked_up_by_large_scheduled_vehicle,
+                new_values=list(self._picked_up_by_large_scheduled_vehicle_per_container.items())
+            )
+            update_many_in_chunks(
+                model=Container,
+                field=Container.picked_up_by,
+                new_values=list(self._picked_up_by_per_container.items())
+            )
+            set_value_in_chunks(
+                model=Container,
+                field=Container.emergency_pickup,
+                value=True,
+                ids=self._containers_with_emergency_pickup
+            )
+            set_value_in_chunks(
+                model=LargeScheduledVehicle,
+                field=LargeScheduledVehicle.capacity_exhausted_while_determining_onward_transportation,
+                value=True,
+                ids=self._exhausted_large_scheduled_vehicles
+            )
+        self._picked_up_by_large_scheduled_vehicle_per_container = {}
+        self._picked_up_by_per_container = {}
+        self._containers_with_emergency_pickup = []
+        self._exhausted_large_scheduled_vehicles = []
+
+    def _get_dwell_times(self, container: ContainerForOnwardTransportation) -> Tuple[int, int]:
         """get correct dwell time depending on transportation mode.
         """
         if (container.picked_up_by in (ModeOfTransport.deep_sea_vessel, ModeOfTransport.feeder)
@@ -185,47 +316,113 @@ class LargeScheduledVehicleForOnwardTransportationManager:
         return minimum_dwell_time_in_hours, maximum_dwell_time_in_hours
 
     @staticmethod
-    def _get_arrival_time_of_container(container: Container) -> datetime.datetime:
-        """get container arrival from correct source
+    def _load_ids_of_containers_picked_up_by_scheduled_vehicles(
+            include_emergency_pickups: bool = False,
+            only_unassigned_containers: bool = False
+    ) -> np.ndarray:
+        """Loads the ids of all containers that continue their journey with a vehicle that moves according to a
+        schedule.
+
+        Args:
+            include_emergency_pickups: Whether to include the containers that have switched to another vehicle type,
+                e.g. to a truck, during an interrupted assignment
+            only_unassigned_containers: Whether to exclude the containers that have been assigned to a departing
+                vehicle already
+
+        Returns:
+            The ids in ascending order
         """
-        container_arrival: datetime.datetime
-        if container.delivered_by == ModeOfTransport.truck:
-            truck: Truck = container.delivered_by_truck
-            truck_arrival_information: TruckArrivalInformationForDelivery = truck.truck_arrival_information_for_delivery
-            container_arrival = truck_arrival_information.realized_container_delivery_time
-        else:
-            large_scheduled_vehicle: LargeScheduledVehicle = container.delivered_by_large_scheduled_vehicle
-            container_arrival = large_scheduled_vehicle.scheduled_arrival
-        return container_arrival
+        condition = Container.picked_up_by << ModeOfTransport.get_scheduled_vehicles()
+        if include_emergency_pickups:
+            condition |= Container.emergency_pickup
+        if only_unassigned_containers:
+            condition &= Container.picked_up_by_large_scheduled_vehicle.is_null() & ~Container.emergency_pickup
+        query = Container.select(
+            Container.id
+        ).where(
+            condition
+        ).order_by(
+            Container.id
+        ).tuples()
+        return np.fromiter((container_id for (container_id, ) in query), dtype=np.int64)
+
+    @staticmethod
+    def _load_containers_picked_up_by_scheduled_vehicles(
+            container_ids: List[int]
+    ) -> List[ContainerForOnwardTransportation]:
+        """Loads the containers together with their arrival time at the terminal, using a single query.
+
+        Args:
+            container_ids: The ids of the containers to load, at most as many as SQLite accepts variables
+
+        Returns:
+            The containers in the same order as their ids
+        """
+        query = Container.select(
+            Container.id,
+            Container.length,
+            Container.delivered_by,
+            Container.picked_up_by,
+            TruckArrivalInformationForDelivery.realized_container_delivery_time,
+            LargeScheduledVehicle.scheduled_arrival
+        ).join(
+            Truck, JOIN.LEFT_OUTER, on=(Container.delivered_by_truck == Truck.id)
+        ).join(
+            TruckArrivalInformationForDelivery, JOIN.LEFT_OUTER,
+            on=(Truck.truck_arrival_information_for_delivery == TruckArrivalInformationForDelivery.id)
+        ).switch(
+            Container
+        ).join(
+            LargeScheduledVehicle, JOIN.LEFT_OUTER,
+            on=(Container.delivered_by_large_scheduled_vehicle == LargeScheduledVehicle.id)
+        ).where(
+            Container.id << container_ids
+        ).tuples()
+
+        containers_by_id = {}
+        for (container_id, length, delivered_by, picked_up_by, realized_container_delivery_time,
+             scheduled_arrival) in query:
+            # get container arrival from correct source
+            if delivered_by == ModeOfTransport.truck:
+                arrival = realized_container_delivery_time
+            else:
+                arrival = scheduled_arrival
+            containers_by_id[container_id] = ContainerForOnwardTransportation(
+                id=container_id,
+                length=length,
+                delivered_by=delivered_by,
+                picked_up_by=picked_up_by,
+                arrival=arrival
+            )
+        return [containers_by_id[container_id] for container_id in container_ids]
 
     def _find_alternative_mode_of_transportation(
             self,
-            container: Container,
+            container: ContainerForOnwardTransportation,
             container_arrival: datetime.datetime,
             minimum_dwell_time_in_hours: int | float,
             maximum_dwell_time_in_hours: int | float,
     ):
+        # ignore the one vehicle type which has obviously failed, otherwise we wouldn't search for an alternative here
+        previous_failed_vehicle_type: ModeOfTransport = container.picked_up_by
+
         # It should be clear anyways that this container had to change its vehicle
-        container.emergency_pickup = True
+        self._containers_with_emergency_pickup.append(container.id)
 
         # These are the default values if no suitable vehicle could be found in the next lines
-        container.picked_up_by = ModeOfTransport.truck
-        container.save()
+        self._picked_up_by_per_container[container.id] = ModeOfTransport.truck
 
         # get alternative vehicles
         vehicle_types_and_frequencies = self.mode_of_transport_distribution[container.delivered_by].copy()
-
-        # ignore the one vehicle type which has obviously failed, otherwise we wouldn't search for an alternative here
-        previous_failed_vehicle_type: ModeOfTransport = container.picked_up_by
         del vehicle_types_and_frequencies[previous_failed_vehicle_type]
 
         # try to pick a better vehicle for 5 times, otherwise the previously set default values are automatically used
         for _ in range(5):
-            if len(vehicle_types_and_frequencies.keys()) == 0:
+            if sum(vehicle_types_and_frequencies.values()) == 0:
                 # this default value has been pre-selected anyways, nothing else to do
                 return
 
-            vehicle_type = random.choices(
+            vehicle_type = self.random_number_generator.choices(
                 population=list(vehicle_types_and_frequencies.keys()),
                 weights=list(vehicle_types_and_frequencies.values())
             )[0]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import logging
+from typing import Collection, List, Set
+
+from peewee import chunked
+
+from conflowgen.database_connection.bulk_insert import SQLITE_MAXIMUM_NUMBER_OF_VARIABLES, delete_in_chunks, \
+    set_value_in_chunks
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.base_model import database_proxy
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.vehicle import Barge, DeepSeaVessel, Feeder, LargeScheduledVehicle, Train, Truck
+
+
+class RemoveContainerFlowOfSchedulesService:
+    """
+    Removes the part of a previously generated container flow that depends on some schedules so that it can be
+    generated again while the rest of the container flow is kept.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("conflowgen")
+
+    def remove(self, schedule_ids: Collection[int]) -> None:
+        """
+        Removes the vehicles of the schedules, the containers they deliver, and the containers that are delivered by
+        truck and that they pick up. The remaining containers that they pick up lose their departing vehicle so that it
+        can be chosen again.
+
+        A container that could not be picked up by a vehicle of its initial vehicle type also depends on the schedules
+        if they concern that vehicle type. A feasible departure of the container might show up or disappear if the
+        schedules are changed. Thus, such a container also loses its departing vehicle.
+
+        Args:
+            schedule_ids: The ids of the schedules that have been added, edited, or deleted
+        """
+        large_scheduled_vehicles_of_schedules = LargeScheduledVehicle.select(
+            LargeScheduledVehicle.id
+        ).where(
+            LargeScheduledVehicle.schedule << list(schedule_ids)
+        )
+        large_scheduled_vehicle_ids = [
+            large_scheduled_vehicle_id
+            for (large_scheduled_vehicle_id, ) in large_scheduled_vehicles_of_schedules.tuples()
+        ]
+        vehicle_types = self._get_vehicle_types(schedule_ids, large_scheduled_vehicle_ids)
+        self.logger.info(f"Remove the container flow of {len(schedule_ids)} schedules with "
+                         f"{len(large_scheduled_vehicle_ids)} vehicles...")
+
+        with database_proxy.atomic():
+            truck_ids: List[int] = []
+            large_scheduled_vehicles_with_freed_capacity: Set[int] = set()
+
+            def load_containers(condition) -> List[int]:
+                container_ids = []
+                for (
+                    container_id, delivered_by_truck_id, picked_up_by_large_scheduled_vehicle_id, picked_up_by_truck_id
+                ) in Container.select(
+                    Container.id,
+                    Container.delivered_by_truck,
+                    Container.picked_up_by_large_scheduled_vehicle,
+                    Container.picked_up_by_truck
+                ).where(condition).tuples():
+                    container_ids.append(container_id)
+                    truck_ids.extend(
+                        truck_id for truck_id in (delivered_by_truck_id, picked_up_by_truck_id) if truck_id is not None
+                    )
+                    # The container no longer occupies space on its departing vehicle, the vehicle might be kept
+                    if picked_up_by_large_scheduled_vehicle_id is not None:
+                        large_scheduled_vehicles_with_freed_capacity.add(picked_up_by_large_scheduled_vehicle_id)
+                return container_ids
+
+            # These containers only exist because of the schedules
+            removed_container_ids = load_containers(
+                (Container.delivered_by_large_scheduled_vehicle << large_scheduled_vehicles_of_schedules)
+                | (Container.delivered_by_truck.is_null(False)
+                   & (Container.picked_up_by_large_scheduled_vehicle << large_scheduled_vehicles_of_schedules))
+            )
+            delete_in_chunks(Container, Container.id, removed_container_ids)
+
+            # For the remaining containers, the departing vehicle is chosen again
+            reset_container_ids = load_containers(
+                (Container.picked_up_by_large_scheduled_vehicle << large_scheduled_vehicles_of_schedules)
+                | (Container.emergency_pickup & (Container.picked_up_by_initial << list(vehicle_types)))
+            )
+            self._reset_departing_vehicles(reset_container_ids)
+
+            set_value_in_chunks(
+                model=LargeScheduledVehicle,
+                field=LargeScheduledVehicle.capacity_exhausted_while_determining_onward_transportation,
+                value=False,
+                ids=list(large_scheduled_vehicles_with_freed_capacity - set(large_scheduled_vehicle_ids))
+            )
+            self._remove_trucks(truck_ids)
+
+            # Due to cascading foreign keys, Train, Feeder etc. are also deleted
+            delete_in_chunks(LargeScheduledVehicle, LargeScheduledVehicle.id, large_scheduled_vehicle_ids)
+
+        self.logger.info(f"Removed {len(removed_container_ids)} containers and {len(truck_ids)} trucks, "
+                         f"{len(reset_container_ids)} containers wait for a departing vehicle again")
+
+    @staticmethod
+    def _get_vehicle_types(
+            schedule_ids: Collection[int],
+            large_scheduled_vehicle_ids: List[int]
+    ) -> Set[ModeOfTransport]:
+        """The vehicle type of a schedule might have been edited, so the vehicle types of its vehicles and of the
+        schedule itself are both considered."""
+        vehicle_types = {
+            vehicle_type for (vehicle_type, ) in Schedule.select(
+                Schedule.vehicle_type
+            ).where(
+                Schedule.id << list(schedule_ids)
+            ).tuples()
+        }
+        for model in (Feeder, DeepSeaVessel, Train, Barge):
+            for chunk in chunked(large_scheduled_vehicle_ids, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES):
+                if model.select().where(model.large_scheduled_vehicle << chunk).exists():
+                    vehicle_types.add(model.get_mode_of_transport())
+                    break
+        return vehicle_types
+
+    @staticmethod
+    def _reset_departing_vehicles(container_ids: List[int]) -> None:
+        with database_proxy.atomic():
+            for chunk in chunked(container_ids, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES - 3):
+                Container.update({
+                    Container.picked_up_by: Container.picked_up_by_initial,
+                    Container.picked_up_by_large_scheduled_vehicle: None,
+                    Container.picked_up_by_truck: None,
+                    Container.destination: None,
+                    Container.emergency_pickup: False
+                }).where(
+                    Container.id << chunk
+                ).execute()
+
+    @staticmethod
+    def _remove_trucks(truck_ids: List[int]) -> None:
+        """The arrival information can only be deleted after the trucks that point at it."""
+        truck_arrival_information_for_delivery_ids: List[int] = []
+        truck_arrival_information_for_pickup_ids: List[int] = []
+        for chunk in chunked(truck_ids, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES):
+            for (
+                truck_arrival_information_for_delivery_id, truck_arrival_information_for_pickup_id
+            ) in Truck.select(
+                Truck.truck_arrival_information_for_delivery,
+                Truck.truck_arrival_information_for_pickup
+            ).where(
+                Truck.id << chunk
+            ).tuples():
+                if truck_arrival_information_for_delivery_id is not None:
+                    truck_arrival_information_for_delivery_ids.append(truck_arrival_information_for_delivery_id)
+                if truck_arrival_information_for_pickup_id is not None:
+                    truck_arrival_information_for_pickup_ids.append(truck_arrival_information_for_pickup_id)
+
+        delete_in_chunks(Truck, Truck.id, truck_ids)
+        delete_in_chunks(
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForDelivery.id,
+            truck_arrival_information_for_delivery_ids
+        )
+        delete_in_chunks(
+            TruckArrivalInformationForPickup,
+            TruckArrivalInformationForPickup.id,
+            truck_arrival_information_for_pickup_ids
+        )
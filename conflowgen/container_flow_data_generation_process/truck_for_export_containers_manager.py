@@ -1,11 +1,13 @@
 from __future__ import annotations
 import datetime
 import logging
-import random
-from typing import List, Tuple, Union
+from typing import List, Sequence, Tuple, Union
 
-from conflowgen.tools.weekly_distribution import WeeklyDistribution
-from ..domain_models.arrival_information import TruckArrivalInformationForDelivery
+import numpy as np
+
+from conflowgen.tools.weekly_distribution import WeeklyDistribution, shift_by_hours
+from ..database_connection.bulk_insert import update_many_in_chunks
+from ..domain_models.base_model import database_proxy
 from ..domain_models.container import Container
 from ..domain_models.distribution_repositories.truck_arrival_distribution_repository import \
     TruckArrivalDistributionRepository
@@ -24,6 +26,7 @@ class TruckForExportContainersManager:
         self.truck_arrival_distribution_repository = TruckArrivalDistributionRepository()
         self.distribution: WeeklyDistribution | None = None
         self.vehicle_factory = VehicleFactory()
+        self.random_number_generator = np.random.default_rng()
         self.minimum_dwell_time_in_hours: int | float | None = None
         self.maximum_dwell_time_in_hours: int | float | None = None
         self.time_window_length_in_hours: int | float | None = None
@@ -45,65 +48,67 @@ class TruckForExportContainersManager:
         )
         self.time_window_length_in_hours = self.distribution.time_window_length_in_hours
 
-    def _get_container_delivery_time(
+    def _get_container_delivery_times(
             self,
-            container_departure_time: datetime.datetime
-    ) -> datetime.datetime:
-        latest_slot = container_departure_time.replace(minute=0, second=0, microsecond=0) - datetime.timedelta(hours=1)
-        earliest_slot = (
-            latest_slot
-            - datetime.timedelta(hours=self.maximum_dwell_time_in_hours - 1)  # because the latest slot is reset
+            container_departure_times: Sequence[datetime.datetime]
+    ) -> List[datetime.datetime]:
+        latest_slots = (
+            np.array(container_departure_times, dtype="datetime64[us]").astype("datetime64[h]")
+            - np.timedelta64(1, "h")
+        )
+        earliest_slots = shift_by_hours(
+            latest_slots,
+            -(self.maximum_dwell_time_in_hours - 1)  # because the latest slot is reset
+        )
+        delivery_time_window_starts, _ = self.distribution.sample_time_windows(
+            earliest_slots, self.random_number_generator
         )
-        distribution_slice = self.distribution.get_distribution_slice(earliest_slot)
-
-        time_windows_for_truck_arrival = list(distribution_slice.keys())
-        delivery_time_window_start = random.choices(
-            population=time_windows_for_truck_arrival,
-            weights=list(distribution_slice.values())
-        )[0]
 
         # arrival within the last time slot
-        random_time_component = random.uniform(0, self.time_window_length_in_hours - (1 / 60))
-        assert 0 <= random_time_component < self.time_window_length_in_hours, \
+        random_time_components = self.random_number_generator.uniform(
+            0, self.time_window_length_in_hours - (1 / 60), size=len(earliest_slots)
+        )
+        assert np.all((0 <= random_time_components) & (random_time_components < self.time_window_length_in_hours)), \
             "The random time component be less than the time slot"
 
         # go back to earliest possible day
-        truck_arrival_time = (
-            earliest_slot
-            + datetime.timedelta(hours=delivery_time_window_start)
-            + datetime.timedelta(hours=random_time_component)
+        truck_arrival_times = shift_by_hours(
+            earliest_slots,
+            delivery_time_window_starts + random_time_components
         )
-        return truck_arrival_time
+        return truck_arrival_times.tolist()
+
+    def _get_container_delivery_time(
+            self,
+            container_departure_time: datetime.datetime
+    ) -> datetime.datetime:
+        return self._get_container_delivery_times([container_departure_time])[0]
 
     def generate_trucks_for_delivering(self) -> None:
-        """Looks for all containers that are supposed to be delivered by truck and creates the corresponding truck.
+        """Looks for all containers that are supposed to be delivered by truck and creates the corresponding truck
+        unless it exists already.
         """
-        containers = Container.select().where(
-            Container.delivered_by == ModeOfTransport.truck
-        ).execute()
+        containers: List[Container] = list(Container.select(
+            Container, LargeScheduledVehicle
+        ).join(
+            LargeScheduledVehicle, on=Container.picked_up_by_large_scheduled_vehicle
+        ).where(
+            (Container.delivered_by == ModeOfTransport.truck)
+            & Container.delivered_by_truck.is_null()
+        ).order_by(Container.id))
         self.logger.info(f"In total {len(containers)} containers are delivered by truck, creating these trucks now...")
-        for i, container in enumerate(containers):
-            i += 1
-            if i % 1000 == 0 and i > 0:
-                self.logger.info(
-                    f"Progress: {i} / {len(containers)} ({100 * i / len(containers):.2f}%) trucks generated "
-                    f"for export containers")
+        container_pickup_times: List[datetime.datetime] = []
+        for container in containers:
             picked_up_with: LargeScheduledVehicle = container.picked_up_by_large_scheduled_vehicle
-            container_pickup_time: datetime.datetime = \
-                picked_up_with.delayed_arrival or picked_up_with.scheduled_arrival
-            truck_arrival_time = self._get_container_delivery_time(container_pickup_time)
-            truck_arrival_information_for_delivery = TruckArrivalInformationForDelivery.create(
-                planned_container_delivery_time_at_window_start=truck_arrival_time,
-                realized_container_delivery_time=truck_arrival_time
-            )
-            truck_arrival_information_for_delivery.save()
-            truck = self.vehicle_factory.create_truck(
-                delivers_container=True,
-                picks_up_container=False,
-                truck_arrival_information_for_delivery=truck_arrival_information_for_delivery,
-                truck_arrival_information_for_pickup=None
+            container_pickup_times.append(picked_up_with.delayed_arrival or picked_up_with.scheduled_arrival)
+        truck_arrival_times = self._get_container_delivery_times(container_pickup_times)
+
+        # The trucks and the containers they deliver are written in bulk
+        with database_proxy.atomic():
+            truck_ids = self.vehicle_factory.create_trucks_for_delivering(truck_arrival_times)
+            update_many_in_chunks(
+                model=Container,
+                field=Container.delivered_by_truck,
+                new_values=[(container.id, truck_id) for container, truck_id in zip(containers, truck_ids)]
             )
-            truck.save()
-            container.delivered_by_truck = truck
-            container.save()
         self.logger.info("All trucks that deliver a container are created now.")
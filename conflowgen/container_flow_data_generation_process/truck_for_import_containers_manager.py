@@ -1,10 +1,12 @@
 import datetime
 import logging
-import random
-from typing import List, Tuple, Union
+from typing import List, Sequence, Tuple, Union
 
-from conflowgen.tools.weekly_distribution import WeeklyDistribution
-from ..domain_models.arrival_information import TruckArrivalInformationForPickup
+import numpy as np
+
+from conflowgen.tools.weekly_distribution import WeeklyDistribution, shift_by_hours
+from ..database_connection.bulk_insert import update_many_in_chunks
+from ..domain_models.base_model import database_proxy
 from ..domain_models.container import Container
 from ..domain_models.distribution_repositories.truck_arrival_distribution_repository import \
     TruckArrivalDistributionRepository
@@ -19,6 +21,7 @@ class TruckForImportContainersManager:
         self.truck_arrival_distribution_repository = TruckArrivalDistributionRepository()
         self.distribution: Union[WeeklyDistribution, None] = None
         self.vehicle_factory = VehicleFactory()
+        self.random_number_generator = np.random.default_rng()
 
     def reload_distribution(self, minimum_dwell_time_in_hours: float, maximum_dwell_time_in_hours: float):
         # noinspection PyTypeChecker
@@ -30,52 +33,53 @@ class TruckForImportContainersManager:
             minimum_dwell_time_in_hours=minimum_dwell_time_in_hours
         )
 
+    def _get_container_pickup_times(
+            self,
+            container_arrival_times: Sequence[datetime.datetime]
+    ) -> List[datetime.datetime]:
+        earliest_slots = (
+            np.array(container_arrival_times, dtype="datetime64[us]").astype("datetime64[h]")
+            + np.timedelta64(1, "h")
+        )
+        pickup_time_window_starts, time_window_lengths = self.distribution.sample_time_windows(
+            earliest_slots, self.random_number_generator
+        )
+        random_time_components = self.random_number_generator.uniform(0, time_window_lengths)
+        truck_arrival_times = shift_by_hours(
+            earliest_slots,
+            pickup_time_window_starts  # these are several days, comparable to time slot
+            + random_time_components  # a small random component for the truck arrival time
+        )
+        return truck_arrival_times.tolist()
+
     def _get_container_pickup_time(
             self,
             container_arrival_time: datetime.datetime
     ) -> datetime.datetime:
-        earliest_slot = container_arrival_time.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
-        distribution_slice = self.distribution.get_distribution_slice(earliest_slot)
-        time_windows_for_truck_arrival = list(distribution_slice.keys())
-        pickup_time_window_start = random.choices(
-            population=time_windows_for_truck_arrival,
-            weights=list(distribution_slice.values()))[0]
-        time_window_length_in_hours = (time_windows_for_truck_arrival[1] - time_windows_for_truck_arrival[0])
-        random_time_component = random.uniform(0, time_window_length_in_hours)
-        truck_arrival_time = (
-            earliest_slot
-            + datetime.timedelta(hours=pickup_time_window_start)  # these are several days, comparable to time slot
-            + datetime.timedelta(hours=random_time_component)  # a small random component for the truck arrival time
-        )
-        return truck_arrival_time
+        return self._get_container_pickup_times([container_arrival_time])[0]
 
     def generate_trucks_for_picking_up(self):
-        containers = Container.select().where(
-            Container.picked_up_by == ModeOfTransport.truck
-        ).execute()
+        containers: List[Container] = list(Container.select(
+            Container, LargeScheduledVehicle
+        ).join(
+            LargeScheduledVehicle, on=Container.delivered_by_large_scheduled_vehicle
+        ).where(
+            (Container.picked_up_by == ModeOfTransport.truck)
+            & Container.picked_up_by_truck.is_null()
+        ).order_by(Container.id))
         self.logger.info(f"In total {len(containers)} containers are picked up by truck, creating these trucks now...")
-        for i, container in enumerate(containers):
-            i += 1
-            if i % 1000 == 0 and i > 0:
-                self.logger.info(f"Progress: {i} / {len(containers)} ({100 * i / len(containers):.2f}%) trucks "
-                                 f"generated for import containers")
+        container_arrival_times: List[datetime.datetime] = []
+        for container in containers:
             delivered_by: LargeScheduledVehicle = container.delivered_by_large_scheduled_vehicle
-            container_arrival_time: datetime.datetime = \
-                delivered_by.delayed_arrival or delivered_by.scheduled_arrival
-            truck_arrival_time = self._get_container_pickup_time(container_arrival_time)
-            truck_arrival_information_for_pickup = TruckArrivalInformationForPickup.create(
-                planned_container_pickup_time_prior_berthing=None,  # TODO: set value if required, create ui
-                planned_container_pickup_time_after_initial_storage=None,  # TODO: set value if required, create ui
-                realized_container_pickup_time=truck_arrival_time
-            )
-            truck_arrival_information_for_pickup.save()
-            truck = self.vehicle_factory.create_truck(
-                delivers_container=False,
-                picks_up_container=True,
-                truck_arrival_information_for_delivery=None,
-                truck_arrival_information_for_pickup=truck_arrival_information_for_pickup
+            container_arrival_times.append(delivered_by.delayed_arrival or delivered_by.scheduled_arrival)
+        truck_arrival_times = self._get_container_pickup_times(container_arrival_times)
+
+        # The trucks and the containers they pick up are written in bulk
+        with database_proxy.atomic():
+            truck_ids = self.vehicle_factory.create_trucks_for_picking_up(truck_arrival_times)
+            update_many_in_chunks(
+                model=Container,
+                field=Container.picked_up_by_truck,
+                new_values=[(container.id, truck_id) for container, truck_id in zip(containers, truck_ids)]
             )
-            truck.save()
-            container.picked_up_by_truck = truck
-            container.save()
         self.logger.info("All trucks that pick up a container have been generated.")
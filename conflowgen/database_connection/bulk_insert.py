@@ -0,0 +1,145 @@
+"""
+Bulk operations for writing many rows at once instead of saving each model instance on its own.
+"""
+from typing import Any, Iterable, List, Sequence, Tuple, Type
+
+from peewee import Case, Field, chunked, fn
+
+from conflowgen.domain_models.base_model import BaseModel, database_proxy
+
+# Older SQLite versions only accept this many variables per statement, newer versions accept more.
+SQLITE_MAXIMUM_NUMBER_OF_VARIABLES = 999
+
+
+def insert_many_in_chunks(
+        model: Type[BaseModel],
+        fields: Sequence[Field],
+        rows: Iterable[tuple]
+) -> int:
+    """
+    Inserts all rows within a single transaction. The rows are split into chunks so that no statement exceeds the
+    maximum number of variables SQLite accepts.
+
+    Args:
+        model: The table to insert into
+        fields: The fields in the same order as the values of each row
+        rows: The values to insert
+
+    Returns: The number of inserted rows
+    """
+    number_rows_per_chunk = max(1, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES // len(fields))
+    number_inserted_rows = 0
+    with database_proxy.atomic():
+        for chunk in chunked(rows, number_rows_per_chunk):
+            model.insert_many(chunk, fields=fields).execute()
+            number_inserted_rows += len(chunk)
+    return number_inserted_rows
+
+
+def insert_many_with_consecutive_ids(
+        model: Type[BaseModel],
+        fields: Sequence[Field],
+        rows: Sequence[tuple]
+) -> List[int]:
+    """
+    Inserts all rows within a single transaction and assigns the ids explicitly, continuing after the currently
+    largest id. This way, the ids are known without reading the rows back.
+
+    Args:
+        model: The table to insert into, its primary key must be an integer
+        fields: The fields in the same order as the values of each row, without the primary key
+        rows: The values to insert
+
+    Returns: The ids of the inserted rows in the same order as the rows
+    """
+    primary_key = model._meta.primary_key  # pylint: disable=protected-access
+    with database_proxy.atomic():
+        first_id = (model.select(fn.MAX(primary_key)).scalar() or 0) + 1
+        ids = list(range(first_id, first_id + len(rows)))
+        insert_many_in_chunks(
+            model=model,
+            fields=[primary_key, *fields],
+            rows=((row_id, *row) for row_id, row in zip(ids, rows))
+        )
+    return ids
+
+
+def update_many_in_chunks(
+        model: Type[BaseModel],
+        field: Field,
+        new_values: Sequence[Tuple[int, Any]]
+) -> int:
+    """
+    Sets a different value of a field for each row within a single transaction. Each chunk is updated with a single
+    statement.
+
+    Args:
+        model: The table to update
+        field: The field to write
+        new_values: Pairs of the primary key of the row and the new value
+
+    Returns: The number of updated rows
+    """
+    primary_key = model._meta.primary_key  # pylint: disable=protected-access
+    # Each row requires its primary key and its new value in the CASE expression and its primary key in the WHERE clause
+    number_rows_per_chunk = max(1, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES // 3)
+    number_updated_rows = 0
+    with database_proxy.atomic():
+        for chunk in chunked(new_values, number_rows_per_chunk):
+            number_updated_rows += model.update({
+                field: Case(primary_key, [(row_id, field.db_value(new_value)) for (row_id, new_value) in chunk])
+            }).where(
+                primary_key << [row_id for (row_id, _) in chunk]
+            ).execute()
+    return number_updated_rows
+
+
+def set_value_in_chunks(
+        model: Type[BaseModel],
+        field: Field,
+        value: Any,
+        ids: Sequence[int]
+) -> int:
+    """
+    Sets the same value of a field for all given rows within a single transaction. Each chunk is updated with a single
+    statement.
+
+    Args:
+        model: The table to update
+        field: The field to write
+        value: The new value of the field
+        ids: The primary keys of the rows to update
+
+    Returns: The number of updated rows
+    """
+    primary_key = model._meta.primary_key  # pylint: disable=protected-access
+    # Each row requires its primary key in the WHERE clause and the new value requires one more variable
+    number_rows_per_chunk = SQLITE_MAXIMUM_NUMBER_OF_VARIABLES - 1
+    number_updated_rows = 0
+    with database_proxy.atomic():
+        for chunk in chunked(ids, number_rows_per_chunk):
+            number_updated_rows += model.update({field: value}).where(primary_key << chunk).execute()
+    return number_updated_rows
+
+
+def delete_in_chunks(
+        model: Type[BaseModel],
+        field: Field,
+        values: Sequence[Any]
+) -> int:
+    """
+    Deletes all rows for which the field has one of the given values within a single transaction. Each chunk is
+    deleted with a single statement.
+
+    Args:
+        model: The table to delete from
+        field: The field to compare, e.g. the primary key
+        values: The values of the rows to delete
+
+    Returns: The number of deleted rows
+    """
+    number_deleted_rows = 0
+    with database_proxy.atomic():
+        for chunk in chunked(values, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES):
+            number_deleted_rows += model.delete().where(field << chunk).execute()
+    return number_deleted_rows
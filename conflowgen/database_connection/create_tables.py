@@ -1,7 +1,11 @@
 import logging
+from typing import List, Set, Type
 
 import peewee
+from playhouse.migrate import SchemaMigrator, migrate
 
+from conflowgen.application_models.container_flow_generation_checkpoint import ContainerFlowGenerationCheckpoint
+from conflowgen.application_models.container_flow_generation_fingerprint import ContainerFlowGenerationFingerprint
 from conflowgen.application_models.container_flow_generation_properties import ContainerFlowGenerationProperties
 from conflowgen.domain_models.arrival_information import TruckArrivalInformationForPickup, \
     TruckArrivalInformationForDelivery
@@ -16,10 +20,12 @@ from conflowgen.domain_models.vehicle import DeepSeaVessel, Feeder, LargeSchedul
 
 logger = logging.getLogger("conflowgen")
 
+managed_index_name_prefix = "conflowgen_"
+
 
 def create_tables(sql_db_connection: peewee.Database) -> peewee.Database:
     logger.debug("Creating all tables...")
-    sql_db_connection.create_tables([
+    models = [
         Container,
         Destination,
         LargeScheduledVehicle,
@@ -34,13 +40,110 @@ def create_tables(sql_db_connection: peewee.Database) -> peewee.Database:
         ContainerWeightDistribution,
         ContainerLengthDistribution,
         ContainerFlowGenerationProperties,
+        ContainerFlowGenerationCheckpoint,
+        ContainerFlowGenerationFingerprint,
         TruckArrivalDistribution,
         TruckArrivalInformationForPickup,
         TruckArrivalInformationForDelivery,
         StorageRequirementDistribution
-    ])
-    for table_with_index in (
-        Destination,
-    ):
-        table_with_index.initialize_index()
+    ]
+    sql_db_connection.create_tables(models)
+    add_missing_columns(sql_db_connection, models)
+    create_indexes(sql_db_connection)
     return sql_db_connection
+
+
+def add_missing_columns(sql_db_connection: peewee.Database, models: List[Type[peewee.Model]]) -> None:
+    """
+    Adds the columns that are missing in a database that has been created with a previous version. Existing rows
+    receive the default value of the field.
+
+    Args:
+        sql_db_connection: The database to upgrade
+        models: The models the tables of which are checked
+    """
+    migrator = SchemaMigrator.from_database(sql_db_connection)
+    for model in models:
+        table_name = model._meta.table_name  # pylint: disable=protected-access
+        existing_column_names = {column.name for column in sql_db_connection.get_columns(table_name)}
+        for field in model._meta.sorted_fields:  # pylint: disable=protected-access
+            if field.column_name not in existing_column_names:
+                logger.debug(f"Adding missing column '{field.column_name}' to table '{table_name}'...")
+                migrate(migrator.add_column(table_name, field.column_name, field))
+
+def get_managed_indexes() -> List[peewee.ModelIndex]:
+    """
+    The indexes speed up the lookups that are repeated most often during the generation and the analyses. Foreign keys
+    are additionally indexed on their own by peewee.
+
+    Returns: All indexes that are created and kept in sync by this module, each of their names has the same prefix
+    """
+    return [
+        Destination.initialize_index(),
+        # The loaded containers are counted by vehicle and length, e.g. to determine the free capacity of a vehicle
+        Container.index(
+            Container.delivered_by_large_scheduled_vehicle, Container.length,
+            name="conflowgen_container_delivered_by_large_scheduled_vehicle_length"
+        ),
+        Container.index(
+            Container.picked_up_by_large_scheduled_vehicle, Container.length,
+            name="conflowgen_container_picked_up_by_large_scheduled_vehicle_length"
+        ),
+        # The containers are selected and counted by vehicle type, e.g. those that need to be picked up by truck
+        Container.index(
+            Container.delivered_by, Container.length,
+            name="conflowgen_container_delivered_by_length"
+        ),
+        Container.index(
+            Container.picked_up_by, Container.length,
+            name="conflowgen_container_picked_up_by_length"
+        ),
+        # The vehicles are looked up by their arrival, e.g. to find a vehicle for onward transportation
+        LargeScheduledVehicle.index(
+            LargeScheduledVehicle.scheduled_arrival,
+            name="conflowgen_largescheduledvehicle_scheduled_arrival"
+        ),
+    ]
+
+
+def _get_existing_managed_index_names(sql_db_connection: peewee.Database) -> Set[str]:
+    return {
+        index_metadata.name
+        for table_name in sql_db_connection.get_tables()
+        for index_metadata in sql_db_connection.get_indexes(table_name)
+        if index_metadata.name.startswith(managed_index_name_prefix)
+    }
+
+
+def create_indexes(sql_db_connection: peewee.Database) -> None:
+    """
+    Creates all managed indexes that are missing, e.g. in a database that has been created with a previous version, and
+    drops those managed indexes that are no longer in use.
+
+    Args:
+        sql_db_connection: The database to upgrade
+    """
+    managed_indexes = get_managed_indexes()
+    managed_index_names = {managed_index._name for managed_index in managed_indexes}  # pylint: disable=protected-access
+    for obsolete_index_name in _get_existing_managed_index_names(sql_db_connection) - managed_index_names:
+        logger.debug(f"Dropping obsolete index '{obsolete_index_name}'...")
+        sql_db_connection.execute_sql(f'DROP INDEX IF EXISTS "{obsolete_index_name}"')
+    for managed_index in managed_indexes:
+        try:
+            sql_db_connection.execute(managed_index)
+        except peewee.IntegrityError as error:
+            # Existing data violates the uniqueness, the generation still works but the data should be checked
+            index_name = managed_index._name  # pylint: disable=protected-access
+            logger.warning(f"The index '{index_name}' could not be created: {error}")
+
+
+def drop_indexes(sql_db_connection: peewee.Database) -> None:
+    """
+    Drops all managed indexes. Inserting many rows is faster without them, afterwards they are re-created with
+    :func:`create_indexes`.
+
+    Args:
+        sql_db_connection: The database to drop the indexes in
+    """
+    for index_name in _get_existing_managed_index_names(sql_db_connection):
+        sql_db_connection.execute_sql(f'DROP INDEX IF EXISTS "{index_name}"')
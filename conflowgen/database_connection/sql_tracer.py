@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import logging
+import re
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+from peewee import Database
+
+from conflowgen.domain_models.base_model import database_proxy
+
+
+class NoDatabaseToTraceException(Exception):
+    pass
+
+
+class SqlStatementShapeStatistics(NamedTuple):
+    """
+    All SQL statements that only differ in their parameters share the same shape.
+    """
+
+    #: The SQL statement with all parameters and literals replaced by placeholders
+    shape: str
+
+    #: How often a statement of this shape has been executed
+    number_executions: int
+
+    #: The time all executions of this shape have taken together
+    cumulative_time_in_seconds: float
+
+
+class SlowSqlStatement(NamedTuple):
+    """
+    An SQL statement that took longer than the threshold of the tracer.
+    """
+
+    #: The SQL statement as it has been sent to the database
+    sql: str
+
+    #: The parameters of the statement
+    params: Optional[Sequence]
+
+    #: The time the statement has taken
+    time_in_seconds: float
+
+
+_string_literal = re.compile(r"'(?:[^']|'')*'")
+_number_literal = re.compile(r"\b\d+(?:\.\d+)?\b")
+_placeholder_list = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_repeated_placeholder_lists = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_sql_statement(sql: str) -> str:
+    """
+    Replaces all literals by placeholders and collapses lists of placeholders. This way, e.g. ``IN (?, ?)`` and
+    ``IN (?, ?, ?)`` as well as inserting one or several rows lead to the same shape.
+
+    Args:
+        sql: The SQL statement as it has been sent to the database
+
+    Returns: The shape of the SQL statement
+    """
+    shape = _string_literal.sub("?", sql)
+    shape = _number_literal.sub("?", shape)
+    shape = _placeholder_list.sub("(?...)", shape)
+    shape = _repeated_placeholder_lists.sub("(?...), ...", shape)
+    return _whitespace.sub(" ", shape).strip()
+
+
+class SqlTracer:
+    """
+    Keeps track of all SQL statements issued while the tracer is active. Use it as a context manager around any API
+    call to see how many statements the call issues, which shapes take most of the time, and which statements are
+    slow, e.g.
+
+    .. code-block:: python
+
+        with SqlTracer() as sql_tracer:
+            container_flow_generation_manager.generate()
+        print(sql_tracer.get_text_representation())
+
+    The time of a query covers executing the statement until the first row is available, fetching further rows is not
+    included.
+    """
+
+    def __init__(
+            self,
+            slow_statement_threshold_in_seconds: float = 0.1,
+            database: Optional[Database] = None
+    ):
+        """
+        Args:
+            slow_statement_threshold_in_seconds: Statements that take longer are recorded one by one.
+            database: The database to trace. By default, the database that has been chosen most recently is traced.
+        """
+        self.logger = logging.getLogger("conflowgen")
+        self.slow_statement_threshold_in_seconds = slow_statement_threshold_in_seconds
+        self.database = database
+        self.number_executions_per_shape: Dict[str, int] = {}
+        self.cumulative_time_per_shape: Dict[str, float] = {}
+        self.slow_statements: List[SlowSqlStatement] = []
+        self._traced_database: Optional[Database] = None
+        self._wrapped_execute_sql = None
+
+    def __enter__(self) -> SqlTracer:
+        traced_database = self.database if self.database is not None else database_proxy.obj
+        if traced_database is None:
+            raise NoDatabaseToTraceException("You must first choose a database.")
+        self._traced_database = traced_database
+        # Another tracer might be active already, then both record the statement
+        self._wrapped_execute_sql = traced_database.__dict__.get("execute_sql")
+        execute_sql = traced_database.execute_sql
+
+        def traced_execute_sql(sql, params=None):
+            start_time = time.perf_counter()
+            try:
+                return execute_sql(sql, params)
+            finally:
+                self._record(sql, params, time.perf_counter() - start_time)
+
+        traced_database.execute_sql = traced_execute_sql
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self._wrapped_execute_sql is None:
+            del self._traced_database.execute_sql
+        else:
+            self._traced_database.execute_sql = self._wrapped_execute_sql
+        self._traced_database = None
+        self._wrapped_execute_sql = None
+
+    def _record(self, sql: str, params: Optional[Sequence], time_in_seconds: float) -> None:
+        shape = normalize_sql_statement(sql)
+        self.number_executions_per_shape[shape] = self.number_executions_per_shape.get(shape, 0) + 1
+        self.cumulative_time_per_shape[shape] = self.cumulative_time_per_shape.get(shape, 0) + time_in_seconds
+        if time_in_seconds > self.slow_statement_threshold_in_seconds:
+            self.logger.warning(f"Slow SQL statement took {time_in_seconds:.3f}s: {sql}")
+            self.slow_statements.append(SlowSqlStatement(sql, params, time_in_seconds))
+
+    def get_number_statements(self) -> int:
+        """
+        Returns: The number of statements issued while the tracer was active
+        """
+        return sum(self.number_executions_per_shape.values())
+
+    def get_statistics(self) -> List[SqlStatementShapeStatistics]:
+        """
+        Returns: For each shape, how often it has been executed and how long that took, starting with the shape that
+            took longest
+        """
+        statistics = [
+            SqlStatementShapeStatistics(
+                shape=shape,
+                number_executions=number_executions,
+                cumulative_time_in_seconds=self.cumulative_time_per_shape[shape]
+            )
+            for shape, number_executions in self.number_executions_per_shape.items()
+        ]
+        return sorted(statistics, key=lambda s: s.cumulative_time_in_seconds, reverse=True)
+
+    def get_repeatedly_selected_shapes(self, minimum_number_executions: int = 50) -> List[SqlStatementShapeStatistics]:
+        """
+        A query that is issued once per vehicle or once per container instead of once for all of them (the so-called
+        N+1 pattern) shows up as a SELECT shape that is executed very often.
+
+        Args:
+            minimum_number_executions: How often a shape must be executed to be reported
+
+        Returns: The SELECT shapes that have been executed at least as often as given, starting with the most frequent
+        """
+        statistics = [
+            shape_statistics for shape_statistics in self.get_statistics()
+            if shape_statistics.shape.upper().startswith("SELECT")
+            and shape_statistics.number_executions >= minimum_number_executions
+        ]
+        return sorted(statistics, key=lambda s: s.number_executions, reverse=True)
+
+    def get_text_representation(self, maximum_number_shapes: int = 10) -> str:
+        """
+        Args:
+            maximum_number_shapes: Only the shapes that took longest are listed
+
+        Returns: A summary of the issued statements
+        """
+        report = f"number of statements: {self.get_number_statements()}\n"
+        report += f"number of slow statements: {len(self.slow_statements)}\n"
+        report += "executions  cumulative time (s)  shape\n"
+        for shape_statistics in self.get_statistics()[:maximum_number_shapes]:
+            report += f"{shape_statistics.number_executions:>10}  "
+            report += f"{shape_statistics.cumulative_time_in_seconds:>19.3f}  "
+            report += f"{shape_statistics.shape}\n"
+        return report
@@ -1,6 +1,7 @@
 import logging
 import os
-from typing import List
+import sqlite3
+from typing import List, Tuple
 
 from peewee import SqliteDatabase
 
@@ -21,6 +22,10 @@ class AmbiguousParameterException(Exception):
     pass
 
 
+class NoInMemoryDatabaseException(Exception):
+    pass
+
+
 class SqliteDatabaseConnection:
     """
     The SQLite database stores all content from the API calls to enable reproducible results.
@@ -37,6 +42,7 @@ class SqliteDatabaseConnection:
         else:
             self.sqlite_databases_directory = sqlite_databases_directory
         self.sqlite_db_connection = None
+        self.path_to_persist_in_memory_database = None
 
     def list_all_sqlite_databases(self) -> List[str]:
         """
@@ -47,17 +53,13 @@ class SqliteDatabaseConnection:
                             if _file.endswith("sqlite")]
         return sqlite_databases
 
-    def choose_database(self, database_name: str, create: bool = False, reset: bool = False) -> SqliteDatabase:
-        """
-        Choose the database which will be used from now on for all library calls.
-
-        Args:
-            database_name: The file name of the SQLite database
-            create: Whether to create a new file if none is found
-            reset: Whether to re-create the file if one is found
-
-        Returns: The SQLite database connection
-        """
+    def _get_path_to_sqlite_database(
+            self,
+            database_name: str,
+            create: bool,
+            reset: bool,
+            keep_file_on_reset: bool = False
+    ) -> Tuple[str, bool]:
         path_to_sqlite_database = os.path.join(
             self.sqlite_databases_directory,
             database_name
@@ -67,13 +69,34 @@ class SqliteDatabaseConnection:
             if create and not reset:
                 raise SqliteDatabaseAlreadyExistsException(path_to_sqlite_database)
             if reset:
-                self.logger.debug(f"Deleting old database: '{path_to_sqlite_database}'")
-                os.remove(path_to_sqlite_database)
+                if keep_file_on_reset:
+                    self.logger.debug(f"Old database is kept until it is replaced: '{path_to_sqlite_database}'")
+                else:
+                    self.logger.debug(f"Deleting old database: '{path_to_sqlite_database}'")
+                    os.remove(path_to_sqlite_database)
+                sqlite_database_existed_before = False
         else:
             if not create:
                 raise SqliteDatabaseIsMissingException(path_to_sqlite_database)
             if create:
                 self.logger.debug(f"No previous database detected, creating new: '{path_to_sqlite_database}'")
+        return path_to_sqlite_database, sqlite_database_existed_before
+
+    def choose_database(self, database_name: str, create: bool = False, reset: bool = False) -> SqliteDatabase:
+        """
+        Choose the database which will be used from now on for all library calls.
+
+        Args:
+            database_name: The file name of the SQLite database
+            create: Whether to create a new file if none is found
+            reset: Whether to re-create the file if one is found
+
+        Returns: The SQLite database connection
+        """
+        path_to_sqlite_database, sqlite_database_existed_before = self._get_path_to_sqlite_database(
+            database_name, create, reset
+        )
+        self.path_to_persist_in_memory_database = None
 
         self.sqlite_db_connection = SqliteDatabase(
             path_to_sqlite_database,
@@ -95,6 +118,57 @@ class SqliteDatabaseConnection:
         self.logger.info(f'page_size: {self.sqlite_db_connection.page_size}')
         self.logger.info(f'foreign_keys: {self.sqlite_db_connection.foreign_keys}')
 
+        self._prepare_database(path_to_sqlite_database, sqlite_database_existed_before)
+        return self.sqlite_db_connection
+
+    def choose_database_in_memory(
+            self,
+            database_name: str,
+            create: bool = False,
+            reset: bool = False
+    ) -> SqliteDatabase:
+        """
+        Choose the database which will be used from now on for all library calls, but keep all of its content in
+        memory. This avoids writing to the disk during the generation. If the file exists, its content is restored into
+        memory first. Nothing is written to the file until :meth:`persist_in_memory_database` is invoked.
+
+        Args:
+            database_name: The file name of the SQLite database
+            create: Whether to create a new database if no file is found
+            reset: Whether to start with a new database if a file is found. The file itself is only replaced once the
+                new database is persisted.
+
+        Returns: The SQLite database connection
+        """
+        path_to_sqlite_database, sqlite_database_existed_before = self._get_path_to_sqlite_database(
+            database_name, create, reset, keep_file_on_reset=True
+        )
+        self.path_to_persist_in_memory_database = path_to_sqlite_database
+
+        # All pages of an in-memory database stay in the page cache, there is no file to synchronize with
+        self.sqlite_db_connection = SqliteDatabase(
+            ':memory:',
+            pragmas={
+                'foreign_keys': 1,
+                'ignore_check_constraints': 0,
+                'temp_store': 'memory'
+            }
+        )
+        database_proxy.initialize(self.sqlite_db_connection)
+        self.sqlite_db_connection.connect()
+
+        if sqlite_database_existed_before:
+            self.logger.debug(f"Restore database into memory: '{path_to_sqlite_database}'")
+            sqlite_file_connection = sqlite3.connect(path_to_sqlite_database)
+            try:
+                sqlite_file_connection.backup(self.sqlite_db_connection.connection())
+            finally:
+                sqlite_file_connection.close()
+
+        self._prepare_database(path_to_sqlite_database, sqlite_database_existed_before)
+        return self.sqlite_db_connection
+
+    def _prepare_database(self, path_to_sqlite_database: str, sqlite_database_existed_before: bool) -> None:
         if not sqlite_database_existed_before:
             self.logger.debug(f"Creating new database: '{path_to_sqlite_database}'")
             create_tables(self.sqlite_db_connection)
@@ -102,8 +176,69 @@ class SqliteDatabaseConnection:
             seed_all_distributions()
         else:
             self.logger.debug(f"Open existing database: '{path_to_sqlite_database}'")
+            # The database might have been created by a previous version with fewer tables or other indexes
+            create_tables(self.sqlite_db_connection)
 
-        return self.sqlite_db_connection
+    def is_in_memory(self) -> bool:
+        """
+        Returns: Whether the current database is kept in memory
+        """
+        return self.path_to_persist_in_memory_database is not None
+
+    def persist_in_memory_database(self) -> None:
+        """
+        Writes the content of the in-memory database to its file. The content is first written to a temporary file
+        next to it which then replaces the file in a single step. Thus, the file either contains the previous or the
+        new content, even if the process is interrupted. If writing the temporary file fails, it is removed again.
+        """
+        if not self.is_in_memory():
+            raise NoInMemoryDatabaseException("The current database is not kept in memory.")
+        path_to_sqlite_database = self.path_to_persist_in_memory_database
+        path_to_temporary_file = path_to_sqlite_database + ".tmp"
+        if os.path.isfile(path_to_temporary_file):
+            os.remove(path_to_temporary_file)
+        self.logger.debug(f"Persist in-memory database: '{path_to_sqlite_database}'")
+        try:
+            sqlite_file_connection = sqlite3.connect(path_to_temporary_file)
+            try:
+                self.sqlite_db_connection.connection().backup(sqlite_file_connection)
+            finally:
+                sqlite_file_connection.close()
+            # The content must be on the disk before the file replaces the previous one
+            with open(path_to_temporary_file, "rb+") as temporary_file:
+                os.fsync(temporary_file.fileno())
+        except BaseException:
+            if os.path.isfile(path_to_temporary_file):
+                os.remove(path_to_temporary_file)
+            raise
+
+        if os.path.isfile(path_to_sqlite_database):
+            # The previous content must be complete without its write-ahead log in case the process is interrupted
+            # before the file is replaced
+            sqlite_file_connection = sqlite3.connect(path_to_sqlite_database)
+            try:
+                sqlite_file_connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                sqlite_file_connection.close()
+        os.replace(path_to_temporary_file, path_to_sqlite_database)
+        self._synchronize_directory(os.path.dirname(path_to_sqlite_database))
+
+        # A write-ahead log left behind by a previous connection to the file must not be applied to the new content
+        for suffix in ("-wal", "-shm"):
+            if os.path.isfile(path_to_sqlite_database + suffix):
+                os.remove(path_to_sqlite_database + suffix)
+
+    @staticmethod
+    def _synchronize_directory(path_to_directory: str) -> None:
+        """Makes sure that renaming a file within the directory survives a crash."""
+        if os.name == "nt":
+            # Directories cannot be opened on Windows, there the rename is persisted together with the file
+            return
+        directory_descriptor = os.open(path_to_directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
 
     def delete_database(self, database_name: str) -> None:
         """
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import copy
+import math
+from typing import Dict, NamedTuple
+
+import numpy as np
+
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.tools.distribution_approximator import DistributionApproximator
+
+
+class ContainerAttributes(NamedTuple):
+    """
+    The attributes of several containers, the i-th entry of each array belongs to the i-th container.
+    """
+
+    #: The container lengths as :class:`.ContainerLength` instances
+    length: np.ndarray
+
+    #: The container weights in tons
+    weight: np.ndarray
+
+    #: The storage requirements as :class:`.StorageRequirement` instances
+    storage_requirement: np.ndarray
+
+    #: The vehicle types as :class:`.ModeOfTransport` instances that are supposed to pick up the containers
+    picked_up_by: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.length)
+
+
+class ContainerAttributeSampler:
+    """
+    Samples the attributes of many containers at once. The lengths and the vehicle types that pick up the containers
+    are drawn with the help of a :class:`.DistributionApproximator` while the weights and the storage requirements are
+    drawn depending on the length of each container.
+    """
+
+    ignored_capacity = ContainerLength.get_factor(ContainerLength.other)
+
+    def __init__(
+            self,
+            container_length_distribution: Dict[ContainerLength, float],
+            container_weight_distribution: Dict[ContainerLength, Dict[int, float]],
+            storage_requirement_distribution: Dict[ContainerLength, Dict[StorageRequirement, float]],
+            mode_of_transportation_distribution: Dict[ModeOfTransport, Dict[ModeOfTransport, float]],
+            random_number_generator: np.random.Generator | None = None
+    ):
+        self.container_length_distribution = container_length_distribution
+        self.container_weight_distribution = container_weight_distribution
+        self.storage_requirement_distribution = storage_requirement_distribution
+        self.mode_of_transportation_distribution = mode_of_transportation_distribution
+        if random_number_generator is None:
+            random_number_generator = np.random.default_rng()
+        self.random_number_generator = random_number_generator
+
+        self.container_lengths = list(container_length_distribution.keys())
+        self.teu_factors = np.array(
+            [ContainerLength.get_factor(container_length) for container_length in self.container_lengths],
+            dtype=np.float64
+        )
+
+    def with_random_number_generator(
+            self,
+            random_number_generator: np.random.Generator
+    ) -> ContainerAttributeSampler:
+        """
+        Args:
+            random_number_generator: The source of randomness of the new sampler
+
+        Returns: A sampler with the same distributions but another source of randomness
+        """
+        sampler = copy.copy(self)
+        sampler.random_number_generator = random_number_generator
+        return sampler
+
+    def sample_for_free_capacity(
+            self,
+            free_capacity_in_teu: float,
+            delivered_by: ModeOfTransport
+    ) -> ContainerAttributes:
+        """
+        Samples the containers a vehicle delivers. Containers are added as long as more than
+        :attr:`ignored_capacity` TEU of the free capacity is left.
+
+        Args:
+            free_capacity_in_teu: The capacity of the vehicle that can be filled with containers
+            delivered_by: The vehicle type delivering the containers
+
+        Returns: The attributes of the containers
+        """
+        # this is based on the assumption that the smallest container is a 20' container
+        maximum_number_of_containers = max(0, int(math.ceil(free_capacity_in_teu)))
+        length_approximator = DistributionApproximator.from_distribution(
+            self.container_length_distribution,
+            maximum_number_of_containers,
+            random_number_generator=self.random_number_generator
+        )
+        picked_up_by_approximator = DistributionApproximator.from_distribution(
+            self.mode_of_transportation_distribution[delivered_by],
+            maximum_number_of_containers,
+            random_number_generator=self.random_number_generator
+        )
+
+        # A container is added if the capacity used by all containers added before leaves enough space
+        length_indices = length_approximator.sample_indices(maximum_number_of_containers)
+        used_capacity_before_container = np.cumsum(self.teu_factors[length_indices]) - self.teu_factors[length_indices]
+        number_containers = int(np.searchsorted(
+            used_capacity_before_container,
+            free_capacity_in_teu - self.ignored_capacity,
+            side="left"
+        ))
+
+        return self._complete_attributes(
+            length_indices=length_indices[:number_containers],
+            picked_up_by=picked_up_by_approximator.sample_many(number_containers)
+        )
+
+    def sample(
+            self,
+            number_containers: int,
+            delivered_by: ModeOfTransport
+    ) -> ContainerAttributes:
+        """
+        Samples a given number of containers.
+
+        Args:
+            number_containers: The number of containers to sample
+            delivered_by: The vehicle type delivering the containers
+
+        Returns: The attributes of the containers
+        """
+        length_approximator = DistributionApproximator.from_distribution(
+            self.container_length_distribution,
+            number_containers,
+            random_number_generator=self.random_number_generator
+        )
+        picked_up_by_approximator = DistributionApproximator.from_distribution(
+            self.mode_of_transportation_distribution[delivered_by],
+            number_containers,
+            random_number_generator=self.random_number_generator
+        )
+        return self._complete_attributes(
+            length_indices=length_approximator.sample_indices(number_containers),
+            picked_up_by=picked_up_by_approximator.sample_many(number_containers)
+        )
+
+    def _complete_attributes(
+            self,
+            length_indices: np.ndarray,
+            picked_up_by: np.ndarray
+    ) -> ContainerAttributes:
+        number_containers = len(length_indices)
+        lengths = np.empty(number_containers, dtype=object)
+        weights = np.empty(number_containers, dtype=np.int64)
+        storage_requirements = np.empty(number_containers, dtype=object)
+
+        # The weight and the storage requirement depend on the length, so all containers of one length are drawn at once
+        for length_index, container_length in enumerate(self.container_lengths):
+            is_of_length = length_indices == length_index
+            number_containers_of_length = int(is_of_length.sum())
+            if number_containers_of_length == 0:
+                continue
+            lengths[is_of_length] = container_length
+            weights[is_of_length] = self._draw(
+                self.container_weight_distribution[container_length], number_containers_of_length
+            )
+            storage_requirements[is_of_length] = self._draw(
+                self.storage_requirement_distribution[container_length], number_containers_of_length
+            )
+
+        # Empty containers have a fixed weight
+        is_empty = storage_requirements == StorageRequirement.empty
+        weights[is_empty] = 4
+        weights[is_empty & (lengths == ContainerLength.twenty_feet)] = 2
+
+        return ContainerAttributes(
+            length=lengths,
+            weight=weights,
+            storage_requirement=storage_requirements,
+            picked_up_by=picked_up_by
+        )
+
+    def _draw(self, distribution: Dict[any, float], number_samples: int) -> np.ndarray:
+        categories = np.empty(len(distribution), dtype=object)
+        for category_index, category in enumerate(distribution.keys()):
+            categories[category_index] = category
+        probabilities = np.array(list(distribution.values()), dtype=np.float64)
+        return categories[self.random_number_generator.choice(
+            len(categories),
+            size=number_samples,
+            p=probabilities / probabilities.sum()
+        )]
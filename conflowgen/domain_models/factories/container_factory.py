@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-import math
-import random
-from typing import Dict, MutableSequence, Sequence
+from typing import Dict, List, NamedTuple, Sequence
 
+import numpy as np
+from peewee import fn, chunked
+
+from conflowgen.database_connection.bulk_insert import insert_many_in_chunks, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_repositories.container_length_distribution_repository import \
     ContainerLengthDistributionRepository
@@ -13,12 +16,12 @@ from conflowgen.domain_models.distribution_repositories.mode_of_transport_distri
     ModeOfTransportDistributionRepository
 from conflowgen.domain_models.distribution_repositories.container_storage_requirement_distribution_repository import \
     ContainerStorageRequirementDistributionRepository
+from conflowgen.domain_models.factories.container_attribute_sampler import ContainerAttributeSampler, \
+    ContainerAttributes
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
-from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
 from conflowgen.domain_models.repositories.large_scheduled_vehicle_repository import LargeScheduledVehicleRepository
 from conflowgen.domain_models.vehicle import AbstractLargeScheduledVehicle, LargeScheduledVehicle
-from conflowgen.tools.distribution_approximator import DistributionApproximator
 
 
 class ContainerFactory:
@@ -28,12 +31,41 @@ class ContainerFactory:
 
     ignored_capacity = ContainerLength.get_factor(ContainerLength.other)
 
+    # If the containers for delivering trucks have not been prepared, they are sampled in batches of this size
+    number_containers_for_delivering_trucks_per_batch = 1000
+
+    # The order of the values of a container row as it is created for large scheduled vehicles
+    container_fields_for_large_scheduled_vehicle = (
+        Container.weight,
+        Container.length,
+        Container.storage_requirement,
+        Container.delivered_by,
+        Container.picked_up_by,
+        Container.picked_up_by_initial,
+        Container.delivered_by_large_scheduled_vehicle
+    )
+
+    # The order of the values of a container row as it is created for delivering trucks
+    container_fields_for_delivering_truck = (
+        Container.weight,
+        Container.length,
+        Container.storage_requirement,
+        Container.delivered_by,
+        Container.picked_up_by,
+        Container.picked_up_by_initial,
+        Container.picked_up_by_large_scheduled_vehicle
+    )
+
     def __init__(self):
         self.mode_of_transportation_distribution = None
         self.container_length_distribution = None
         self.container_weight_distribution = None
         self.storage_requirement_distribution = None
+        self.container_attribute_sampler: ContainerAttributeSampler | None = None
+        self._container_attributes_for_delivering_trucks: ContainerAttributes | None = None
+        self._index_of_next_container_for_delivering_truck = 0
         self.large_scheduled_vehicle_repository = LargeScheduledVehicleRepository()
+        self.random_number_generator = np.random.default_rng()
 
     def reload_distributions(self):
         """The user might change the distributions at any time, so reload them at a meaningful point of time!"""
@@ -41,6 +73,14 @@ class ContainerFactory:
         self.container_length_distribution = ContainerLengthDistributionRepository.get_distribution()
         self.container_weight_distribution = ContainerWeightDistributionRepository.get_distribution()
         self.storage_requirement_distribution = ContainerStorageRequirementDistributionRepository.get_distribution()
+        self.container_attribute_sampler = ContainerAttributeSampler(
+            container_length_distribution=self.container_length_distribution,
+            container_weight_distribution=self.container_weight_distribution,
+            storage_requirement_distribution=self.storage_requirement_distribution,
+            mode_of_transportation_distribution=self.mode_of_transportation_distribution,
+            random_number_generator=self.random_number_generator
+        )
+        self.prepare_containers_for_delivering_trucks(0)
 
     def create_containers_for_large_scheduled_vehicle(
             self,
@@ -52,155 +92,248 @@ class ContainerFactory:
         :param large_scheduled_vehicle_as_subtype: Either Feeder, DeepSeaVessel, or Train instance
         :return: The containers that the vehicle delivers
         """
+        last_container_id = Container.select(fn.MAX(Container.id)).scalar() or 0
 
-        self.large_scheduled_vehicle_repository.reset_cache()
-
-        created_containers: MutableSequence[Container] = []
-
-        delivered_by = large_scheduled_vehicle_as_subtype.get_mode_of_transport()
+        self.create_containers_for_large_scheduled_vehicles([large_scheduled_vehicle_as_subtype])
 
         large_scheduled_vehicle: LargeScheduledVehicle = large_scheduled_vehicle_as_subtype.large_scheduled_vehicle
+        created_containers: Sequence[Container] = list(
+            Container.select().where(
+                (Container.delivered_by_large_scheduled_vehicle == large_scheduled_vehicle)
+                & (Container.id > last_container_id)
+            ).order_by(Container.id)
+        )
+        return created_containers
+
+    def create_containers_for_large_scheduled_vehicles(
+            self,
+            large_scheduled_vehicles_as_subtype: Sequence[AbstractLargeScheduledVehicle]
+    ) -> int:
+        """
+        Creates all containers the large vehicles deliver to a terminal, e.g. all vehicles of a schedule. The containers
+        are inserted in bulk within a single transaction.
 
-        free_capacity_in_teu = self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
-            large_scheduled_vehicle_as_subtype
+        :param large_scheduled_vehicles_as_subtype: Feeder, DeepSeaVessel, Barge, or Train instances
+        :return: The number of created containers
+        """
+        vehicles_to_fill = self.get_vehicles_to_fill(large_scheduled_vehicles_as_subtype)
+        container_rows_per_vehicle = create_container_rows_for_large_scheduled_vehicles(
+            container_attribute_sampler=self.container_attribute_sampler,
+            vehicles_to_fill=vehicles_to_fill
+        )
+        return self.store_container_rows_for_large_scheduled_vehicles(
+            large_scheduled_vehicles_as_subtype=large_scheduled_vehicles_as_subtype,
+            container_rows_per_vehicle=container_rows_per_vehicle
         )
 
-        # this is based on the assumption that the smallest container is a 20' container
-        maximum_number_of_containers = int(math.ceil(free_capacity_in_teu))
-        self._load_distribution_approximators(maximum_number_of_containers, delivered_by)
+    def get_vehicles_to_fill(
+            self,
+            large_scheduled_vehicles_as_subtype: Sequence[AbstractLargeScheduledVehicle]
+    ) -> List[VehicleToFill]:
+        """
+        Looks up how much capacity the large vehicles have left for the containers they deliver. The free capacities
+        are kept in the cache until the containers are stored with
+        :meth:`store_container_rows_for_large_scheduled_vehicles`.
+
+        :param large_scheduled_vehicles_as_subtype: Feeder, DeepSeaVessel, Barge, or Train instances
+        :return: Everything that is required to create the containers of each vehicle
+        """
+        self.large_scheduled_vehicle_repository.reset_cache()
+        vehicles_of_types: Dict[ModeOfTransport, List[AbstractLargeScheduledVehicle]] = {}
+        for large_scheduled_vehicle_as_subtype in large_scheduled_vehicles_as_subtype:
+            vehicles_of_types.setdefault(
+                large_scheduled_vehicle_as_subtype.get_mode_of_transport(), []
+            ).append(large_scheduled_vehicle_as_subtype)
+        self.large_scheduled_vehicle_repository.warm_up_cache(vehicles_of_types, outbound=False)
 
-        while (self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
-                large_scheduled_vehicle_as_subtype
-        ) > self.ignored_capacity):
-            container = self._create_single_container_for_large_scheduled_vehicle(
-                delivered_by_large_scheduled_vehicle_as_subtype=large_scheduled_vehicle_as_subtype
+        return [
+            VehicleToFill(
+                large_scheduled_vehicle_id=large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.id,
+                delivered_by=large_scheduled_vehicle_as_subtype.get_mode_of_transport(),
+                free_capacity_in_teu=self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
+                    large_scheduled_vehicle_as_subtype
+                )
             )
-            created_containers.append(container)
-            is_exhausted = self.large_scheduled_vehicle_repository.block_capacity_for_inbound_journey(
+            for large_scheduled_vehicle_as_subtype in large_scheduled_vehicles_as_subtype
+        ]
+
+    def store_container_rows_for_large_scheduled_vehicles(
+            self,
+            large_scheduled_vehicles_as_subtype: Sequence[AbstractLargeScheduledVehicle],
+            container_rows_per_vehicle: Sequence[List[tuple]]
+    ) -> int:
+        """
+        Inserts the containers the large vehicles deliver and blocks the capacity they occupy.
+
+        :param large_scheduled_vehicles_as_subtype: Feeder, DeepSeaVessel, Barge, or Train instances
+        :param container_rows_per_vehicle: For each vehicle the container rows as they are created by
+            :func:`create_container_rows_for_large_scheduled_vehicles`
+        :return: The number of created containers
+        """
+        assert len(large_scheduled_vehicles_as_subtype) == len(container_rows_per_vehicle)
+
+        container_rows: List[tuple] = []
+        exhausted_large_scheduled_vehicles: List[LargeScheduledVehicle] = []
+        for large_scheduled_vehicle_as_subtype, container_rows_of_vehicle in zip(
+                large_scheduled_vehicles_as_subtype, container_rows_per_vehicle):
+            if len(container_rows_of_vehicle) == 0:
+                continue
+            large_scheduled_vehicle: LargeScheduledVehicle = \
+                large_scheduled_vehicle_as_subtype.large_scheduled_vehicle
+            container_rows.extend(container_rows_of_vehicle)
+
+            used_capacity_in_teu = sum(
+                ContainerLength.get_factor(container_row[1]) for container_row in container_rows_of_vehicle
+            )
+            is_exhausted = self.large_scheduled_vehicle_repository.block_capacity_in_teu_for_inbound_journey(
                 vehicle=large_scheduled_vehicle_as_subtype,
-                container=container
+                used_capacity_in_teu=used_capacity_in_teu
             )
             if is_exhausted and not large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation:
                 large_scheduled_vehicle.capacity_exhausted_while_determining_onward_transportation = True
-                large_scheduled_vehicle.save()
+                exhausted_large_scheduled_vehicles.append(large_scheduled_vehicle)
 
-        free_capacity = self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
-            large_scheduled_vehicle_as_subtype
-        )
-        assert free_capacity >= 0, \
-               f"The vehicle {large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.vehicle_name} does not " \
-               f"have sufficient free capacity (in TEU): {free_capacity}."
+            free_capacity = self.large_scheduled_vehicle_repository.get_free_capacity_for_inbound_journey(
+                large_scheduled_vehicle_as_subtype
+            )
+            assert free_capacity >= 0, \
+                   f"The vehicle {large_scheduled_vehicle.vehicle_name} does not " \
+                   f"have sufficient free capacity (in TEU): {free_capacity}."
 
-        return created_containers
+        with database_proxy.atomic():
+            number_created_containers = insert_many_in_chunks(
+                model=Container,
+                fields=self.container_fields_for_large_scheduled_vehicle,
+                rows=container_rows
+            )
+            for exhausted_large_scheduled_vehicles_chunk in chunked(
+                    exhausted_large_scheduled_vehicles, SQLITE_MAXIMUM_NUMBER_OF_VARIABLES):
+                LargeScheduledVehicle.update(
+                    capacity_exhausted_while_determining_onward_transportation=True
+                ).where(
+                    LargeScheduledVehicle.id << [
+                        large_scheduled_vehicle.id
+                        for large_scheduled_vehicle in exhausted_large_scheduled_vehicles_chunk
+                    ]
+                ).execute()
 
-    def _load_distribution_approximators(
-            self,
-            number_of_containers: int,
-            delivered_by: ModeOfTransport
-    ) -> None:
-        self.distribution_approximators: Dict[str, DistributionApproximator] = {
-            "length": DistributionApproximator.from_distribution(
-                self.container_length_distribution,
-                number_of_containers),
-            "picked_up_by": DistributionApproximator.from_distribution(
-                self.mode_of_transportation_distribution[delivered_by],
-                number_of_containers)
-        }
-
-    @staticmethod
-    def _update_weight_according_to_container_type(
-            storage_requirement: StorageRequirement,
-            length: ContainerLength
-    ) -> int | None:
-        weight = None
-        if storage_requirement == StorageRequirement.empty:
-            if length == ContainerLength.twenty_feet:
-                weight = 2
-            else:
-                weight = 4
-        return weight
-
-    def _create_single_container_for_large_scheduled_vehicle(
-            self,
-            delivered_by_large_scheduled_vehicle_as_subtype: AbstractLargeScheduledVehicle
-    ) -> Container:
-        """Creates a generic single container delivered by a specific large scheduled vehicle"""
-
-        delivered_by = delivered_by_large_scheduled_vehicle_as_subtype.get_mode_of_transport()
-        delivered_by_large_scheduled_vehicle = \
-            delivered_by_large_scheduled_vehicle_as_subtype.large_scheduled_vehicle
-
-        length = self.distribution_approximators["length"].sample()
-        weight = random.choices(
-            population=list(self.container_weight_distribution[length].keys()),
-            weights=list(self.container_weight_distribution[length].values()),
-            k=1
-        )[0]
-        picked_up_by = self.distribution_approximators["picked_up_by"].sample()
-        storage_requirement = random.choices(
-            population=list(self.storage_requirement_distribution[length].keys()),
-            weights=list(self.storage_requirement_distribution[length].values()),
-            k=1
-        )[0]
-        new_weight = self._update_weight_according_to_container_type(
-            storage_requirement=storage_requirement,
-            length=length
-        )
-        weight = new_weight if new_weight is not None else weight
-        container = Container.create(
-            weight=weight,
-            length=length,
-            storage_requirement=storage_requirement,
-            delivered_by=delivered_by,
-            picked_up_by=picked_up_by,  # this field is adjusted as needed
-            picked_up_by_initial=picked_up_by,  # this field is later never touched again
-            delivered_by_large_scheduled_vehicle=delivered_by_large_scheduled_vehicle,
-            delivered_by_truck=None
+        return number_created_containers
+
+    def prepare_containers_for_delivering_trucks(self, number_containers: int) -> None:
+        """
+        Samples the attributes of the containers that are delivered by trucks in advance so that the distributions are
+        approximated over all of them and not only over each single container.
+
+        :param number_containers: The number of containers that are going to be created for delivering trucks
+        """
+        self._container_attributes_for_delivering_trucks = self.container_attribute_sampler.sample(
+            number_containers=number_containers,
+            delivered_by=ModeOfTransport.truck
         )
-        container.save()
-        return container
+        self._index_of_next_container_for_delivering_truck = 0
 
     def create_container_for_delivering_truck(
             self,
             picked_up_by_large_scheduled_vehicle_subtype: AbstractLargeScheduledVehicle
     ) -> Container:
         """Creates a generic single container delivered by a truck"""
+        container_row = self.create_container_row_for_delivering_truck(picked_up_by_large_scheduled_vehicle_subtype)
+        container = Container.create(**{
+            field.name: value
+            for field, value in zip(self.container_fields_for_delivering_truck, container_row)
+        })
+        return container
+
+    def create_container_row_for_delivering_truck(
+            self,
+            picked_up_by_large_scheduled_vehicle_subtype: AbstractLargeScheduledVehicle
+    ) -> tuple:
+        """
+        Creates a generic single container delivered by a truck without writing it to the database. The truck itself
+        is created later.
 
+        :param picked_up_by_large_scheduled_vehicle_subtype: The vehicle that picks up the container
+        :return: The values of the container, ordered like :attr:`container_fields_for_delivering_truck`
+        """
         picked_up_by_large_scheduled_vehicle = picked_up_by_large_scheduled_vehicle_subtype.large_scheduled_vehicle
         picked_up_by = picked_up_by_large_scheduled_vehicle_subtype.get_mode_of_transport()
 
-        self._load_distribution_approximators(
-            number_of_containers=1,
-            delivered_by=ModeOfTransport.truck
+        if self._index_of_next_container_for_delivering_truck >= len(self._container_attributes_for_delivering_trucks):
+            self.prepare_containers_for_delivering_trucks(self.number_containers_for_delivering_trucks_per_batch)
+        i = self._index_of_next_container_for_delivering_truck
+        self._index_of_next_container_for_delivering_truck += 1
+        container_attributes = self._container_attributes_for_delivering_trucks
+
+        return (
+            int(container_attributes.weight[i]),
+            container_attributes.length[i],
+            container_attributes.storage_requirement[i],
+            ModeOfTransport.truck,
+            picked_up_by,  # This field is used for the actual pickup
+            picked_up_by,  # This field is only set here and is used for later evaluation
+            picked_up_by_large_scheduled_vehicle.id
         )
 
-        length = self.distribution_approximators["length"].sample()
-        weight = random.choices(
-            population=list(self.container_weight_distribution[length].keys()),
-            weights=list(self.container_weight_distribution[length].values()),
-            k=1
-        )[0]
-        storage_requirement = random.choices(
-            population=list(self.storage_requirement_distribution[length].keys()),
-            weights=list(self.storage_requirement_distribution[length].values()),
-            k=1
-        )[0]
-        new_weight = self._update_weight_according_to_container_type(
-            storage_requirement=storage_requirement,
-            length=length
+    @classmethod
+    def store_container_rows_for_delivering_trucks(cls, container_rows: Sequence[tuple]) -> int:
+        """
+        Inserts the containers delivered by trucks in bulk within a single transaction.
+
+        :param container_rows: The container rows as they are created by
+            :meth:`create_container_row_for_delivering_truck`
+        :return: The number of created containers
+        """
+        return insert_many_in_chunks(
+            model=Container,
+            fields=cls.container_fields_for_delivering_truck,
+            rows=container_rows
         )
-        weight = new_weight if new_weight is not None else weight
-        container = Container.create(
-            weight=weight,
-            length=length,
-            storage_requirement=storage_requirement,
-            delivered_by=ModeOfTransport.truck,
-            picked_up_by=picked_up_by,  # This field is used for the actual pickup
-            picked_up_by_initial=picked_up_by,  # This field is only set here and is used for later evaluation
-            delivered_by_large_scheduled_vehicle=None,
-            delivered_by_truck=None,  # Information is missing yet, inserted later
-            picked_up_by_large_scheduled_vehicle=picked_up_by_large_scheduled_vehicle,
-            picked_up_by_truck=None  # This container is not picked up by a truck
+
+
+class VehicleToFill(NamedTuple):
+    """
+    A large vehicle for which the delivered containers are created, see
+    :func:`create_container_rows_for_large_scheduled_vehicles`.
+    """
+
+    #: The id of the :class:`.LargeScheduledVehicle`
+    large_scheduled_vehicle_id: int
+
+    #: The vehicle type
+    delivered_by: ModeOfTransport
+
+    #: The capacity that is left for the containers the vehicle delivers
+    free_capacity_in_teu: float
+
+
+def create_container_rows_for_large_scheduled_vehicles(
+        container_attribute_sampler: ContainerAttributeSampler,
+        vehicles_to_fill: Sequence[VehicleToFill]
+) -> List[List[tuple]]:
+    """
+    Creates the rows of all containers the large vehicles deliver until their free capacity is exhausted. The values
+    are ordered like :attr:`ContainerFactory.container_fields_for_large_scheduled_vehicle`.
+    As the database is not accessed, this can also be run in another process.
+
+    :param container_attribute_sampler: The sampler including its source of randomness
+    :param vehicles_to_fill: The vehicles to create the containers for
+    :return: For each vehicle the container rows
+    """
+    container_rows_per_vehicle = []
+    for vehicle_to_fill in vehicles_to_fill:
+        container_attributes = container_attribute_sampler.sample_for_free_capacity(
+            free_capacity_in_teu=vehicle_to_fill.free_capacity_in_teu,
+            delivered_by=vehicle_to_fill.delivered_by
         )
-        container.save()
-        return container
+        number_containers = len(container_attributes)
+        picked_up_by = container_attributes.picked_up_by.tolist()
+        container_rows_per_vehicle.append(list(zip(
+            container_attributes.weight.tolist(),
+            container_attributes.length.tolist(),
+            container_attributes.storage_requirement.tolist(),
+            [vehicle_to_fill.delivered_by] * number_containers,
+            picked_up_by,  # this field is adjusted as needed
+            picked_up_by,  # this field is later never touched again
+            [vehicle_to_fill.large_scheduled_vehicle_id] * number_containers
+        )))
+    return container_rows_per_vehicle
@@ -20,7 +20,7 @@ def create_arrivals_within_time_range(
 
     result = []
 
-    if vehicle_arrives_every_k_days > 1:  # usual case
+    if vehicle_arrives_every_k_days > 0:  # usual case
         scheduled_interval = datetime.timedelta(days=vehicle_arrives_every_k_days)
         first_arrival_at_kth_day = (vehicle_arrives_at - range_starts_at) % scheduled_interval
         first_arrival_as_day = range_starts_at + first_arrival_at_kth_day
@@ -49,6 +49,33 @@ def create_arrivals_within_time_range(
             return [vehicle_arrival_time]
         return []
 
+    raise ValueError(f"Vehicle arrival interval ill-defined: every {vehicle_arrives_every_k_days} days")
+
+
+def count_arrivals_within_time_range(
+        range_starts_at: datetime.date,
+        vehicle_arrives_at: datetime.date,
+        range_ends_at: datetime.date,
+        vehicle_arrives_every_k_days: int
+) -> int:
+    """Returns the number of arrivals :func:`create_arrivals_within_time_range` would create without creating them"""
+
+    if range_ends_at <= range_starts_at:
+        raise ValueError(f"Time range ill-defined: from {range_starts_at} to {range_ends_at}")
+
+    if vehicle_arrives_every_k_days > 0:  # usual case
+        first_arrival_as_day = range_starts_at + datetime.timedelta(
+            days=(vehicle_arrives_at - range_starts_at).days % vehicle_arrives_every_k_days
+        )
+        if first_arrival_as_day > range_ends_at:
+            return 0
+        return (range_ends_at - first_arrival_as_day).days // vehicle_arrives_every_k_days + 1
+
+    if vehicle_arrives_every_k_days == -1:  # special case
+        return int(range_starts_at <= vehicle_arrives_at <= range_ends_at)
+
+    raise ValueError(f"Vehicle arrival interval ill-defined: every {vehicle_arrives_every_k_days} days")
+
 
 class FleetFactory:
 
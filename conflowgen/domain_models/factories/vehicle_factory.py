@@ -2,10 +2,12 @@
 The VehicleFactory including its exceptions.
 """
 import datetime
-from typing import Union
+from typing import List, Sequence, Union
 
+from conflowgen.database_connection.bulk_insert import insert_many_with_consecutive_ids
 from conflowgen.domain_models.arrival_information import \
     TruckArrivalInformationForDelivery, TruckArrivalInformationForPickup
+from conflowgen.domain_models.base_model import database_proxy
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
 from conflowgen.domain_models.vehicle import DeepSeaVessel, Feeder, LargeScheduledVehicle, Train, Truck, Barge
 
@@ -59,6 +61,67 @@ class VehicleFactory:
         truck.save()
         return truck
 
+    @staticmethod
+    def create_trucks_for_picking_up(
+            realized_container_pickup_times: Sequence[datetime.datetime]
+    ) -> List[int]:
+        """Creates one truck that picks up a container for each pickup time, including its arrival information. All
+        rows are inserted in bulk within a single transaction.
+
+        Returns: The ids of the created trucks in the same order as the pickup times
+        """
+        with database_proxy.atomic():
+            truck_arrival_information_ids = insert_many_with_consecutive_ids(
+                model=TruckArrivalInformationForPickup,
+                fields=(TruckArrivalInformationForPickup.realized_container_pickup_time,),
+                rows=[
+                    (realized_container_pickup_time,)
+                    for realized_container_pickup_time in realized_container_pickup_times
+                ]
+            )
+            truck_ids = insert_many_with_consecutive_ids(
+                model=Truck,
+                fields=(Truck.delivers_container, Truck.picks_up_container, Truck.truck_arrival_information_for_pickup),
+                rows=[
+                    (False, True, truck_arrival_information_id)
+                    for truck_arrival_information_id in truck_arrival_information_ids
+                ]
+            )
+        return truck_ids
+
+    @staticmethod
+    def create_trucks_for_delivering(
+            realized_container_delivery_times: Sequence[datetime.datetime]
+    ) -> List[int]:
+        """Creates one truck that delivers a container for each delivery time, including its arrival information. All
+        rows are inserted in bulk within a single transaction.
+
+        Returns: The ids of the created trucks in the same order as the delivery times
+        """
+        with database_proxy.atomic():
+            truck_arrival_information_ids = insert_many_with_consecutive_ids(
+                model=TruckArrivalInformationForDelivery,
+                fields=(
+                    TruckArrivalInformationForDelivery.planned_container_delivery_time_at_window_start,
+                    TruckArrivalInformationForDelivery.realized_container_delivery_time
+                ),
+                rows=[
+                    (realized_container_delivery_time, realized_container_delivery_time)
+                    for realized_container_delivery_time in realized_container_delivery_times
+                ]
+            )
+            truck_ids = insert_many_with_consecutive_ids(
+                model=Truck,
+                fields=(
+                    Truck.delivers_container, Truck.picks_up_container, Truck.truck_arrival_information_for_delivery
+                ),
+                rows=[
+                    (True, False, truck_arrival_information_id)
+                    for truck_arrival_information_id in truck_arrival_information_ids
+                ]
+            )
+        return truck_ids
+
     @staticmethod
     def _create_large_vehicle(
             capacity_in_teu: int,
@@ -2,7 +2,7 @@
 Here, timetables are defined
 """
 
-from peewee import AutoField, CharField, DateField, ForeignKeyField, IntegerField, TimeField, FloatField
+from peewee import AutoField, CharField, DateField, ForeignKeyField, IntegerField, TimeField, FloatField, ModelIndex
 
 from .base_model import BaseModel
 from .field_types.mode_of_transport import ModeOfTransportField
@@ -77,9 +77,10 @@ class Destination(BaseModel):
         return "<Destination '{destination_name}'>"
 
     @classmethod
-    def initialize_index(cls):
-        cls.index(
+    def initialize_index(cls) -> ModelIndex:
+        return cls.index(
             cls.belongs_to_schedule,
             cls.destination_name,
-            unique=True
+            unique=True,
+            name="conflowgen_destination_belongs_to_schedule_destination_name"
         )
@@ -1,6 +1,9 @@
+from __future__ import annotations
 import logging
 from typing import Dict, List, Callable
 
+from peewee import fn, ForeignKeyField
+
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
@@ -31,20 +34,103 @@ class LargeScheduledVehicleRepository:
         for vehicle_type in ModeOfTransport.get_scheduled_vehicles():
             large_schedule_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
                 vehicle_type)
-            result[vehicle_type] = list(large_schedule_vehicle_as_subtype.select().join(LargeScheduledVehicle))
+            result[vehicle_type] = list(
+                large_schedule_vehicle_as_subtype.select(
+                    large_schedule_vehicle_as_subtype, LargeScheduledVehicle
+                ).join(LargeScheduledVehicle).order_by(LargeScheduledVehicle.id)
+            )
         return result
 
+    def warm_up_cache(
+            self,
+            vehicles_of_types: Dict[ModeOfTransport, List[AbstractLargeScheduledVehicle]] | None = None,
+            inbound: bool = True,
+            outbound: bool = True
+    ) -> None:
+        """Determines the free capacity of all vehicles at once instead of issuing several queries per vehicle.
+
+        Args:
+            vehicles_of_types: The vehicles to fill the cache for, by default all vehicles are loaded.
+            inbound: Whether to fill the cache for the inbound journey
+            outbound: Whether to fill the cache for the outbound journey, this requires the transportation buffer
+        """
+        if outbound:
+            assert self.transportation_buffer is not None, "First set the value!"
+
+        if vehicles_of_types is None:
+            vehicles_of_types = self.load_all_vehicles()
+
+        loaded_containers_for_inbound_journey = {}
+        if inbound:
+            loaded_containers_for_inbound_journey = self._get_number_containers_per_vehicle_and_length(
+                Container.delivered_by_large_scheduled_vehicle
+            )
+        loaded_containers_for_outbound_journey = {}
+        if outbound:
+            loaded_containers_for_outbound_journey = self._get_number_containers_per_vehicle_and_length(
+                Container.picked_up_by_large_scheduled_vehicle
+            )
+
+        for vehicles in vehicles_of_types.values():
+            for vehicle in vehicles:
+                large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
+                if inbound:
+                    self.free_capacity_for_inbound_journey_buffer[vehicle] = \
+                        self._get_free_capacity_from_loaded_containers(
+                            vehicle=vehicle,
+                            maximum_capacity=large_scheduled_vehicle.moved_capacity,
+                            loaded_containers=loaded_containers_for_inbound_journey.get(large_scheduled_vehicle.id, {})
+                        )
+                if outbound:
+                    self.free_capacity_for_outbound_journey_buffer[vehicle] = \
+                        self._get_free_capacity_from_loaded_containers(
+                            vehicle=vehicle,
+                            maximum_capacity=self._get_maximum_capacity_for_outbound_journey(large_scheduled_vehicle),
+                            loaded_containers=loaded_containers_for_outbound_journey.get(large_scheduled_vehicle.id, {})
+                        )
+
+    @staticmethod
+    def _get_number_containers_per_vehicle_and_length(
+            vehicle_column: ForeignKeyField
+    ) -> Dict[int, Dict[ContainerLength, int]]:
+        """Counts the containers per vehicle (referenced by the id of the large scheduled vehicle) and length with a
+        single aggregating query."""
+        number_containers_per_vehicle_and_length: Dict[int, Dict[ContainerLength, int]] = {}
+        query = Container.select(
+            vehicle_column, Container.length, fn.COUNT(Container.id)
+        ).where(
+            vehicle_column.is_null(False)
+        ).group_by(
+            vehicle_column, Container.length
+        ).tuples()
+        for large_scheduled_vehicle_id, container_length, number_containers in query:
+            number_containers_per_vehicle_and_length.setdefault(
+                large_scheduled_vehicle_id, {}
+            )[container_length] = number_containers
+        return number_containers_per_vehicle_and_length
+
     def block_capacity_for_inbound_journey(
             self,
             vehicle: AbstractLargeScheduledVehicle,
             container: Container
     ) -> bool:
+        used_capacity_in_teu = ContainerLength.get_factor(container_length=container.length)
+        return self.block_capacity_in_teu_for_inbound_journey(
+            vehicle=vehicle,
+            used_capacity_in_teu=used_capacity_in_teu
+        )
+
+    def block_capacity_in_teu_for_inbound_journey(
+            self,
+            vehicle: AbstractLargeScheduledVehicle,
+            used_capacity_in_teu: float
+    ) -> bool:
+        """Blocks the capacity of several containers at once, e.g. after they have been inserted in bulk."""
         assert vehicle in self.free_capacity_for_inbound_journey_buffer, \
             "First .get_free_capacity_for_inbound_journey(vehicle) must be invoked"
 
         # calculate new free capacity
         free_capacity_in_teu = self.free_capacity_for_inbound_journey_buffer[vehicle]
-        used_capacity_in_teu = ContainerLength.get_factor(container_length=container.length)
         new_free_capacity_in_teu = free_capacity_in_teu - used_capacity_in_teu
         assert new_free_capacity_in_teu >= 0, f"vehicle {vehicle} is overloaded, " \
                                               f"free_capacity_in_teu: {free_capacity_in_teu}, " \
@@ -60,12 +146,23 @@ class LargeScheduledVehicleRepository:
             vehicle: AbstractLargeScheduledVehicle,
             container: Container
     ) -> bool:
+        used_capacity_in_teu = ContainerLength.get_factor(container_length=container.length)
+        return self.block_capacity_in_teu_for_outbound_journey(
+            vehicle=vehicle,
+            used_capacity_in_teu=used_capacity_in_teu
+        )
+
+    def block_capacity_in_teu_for_outbound_journey(
+            self,
+            vehicle: AbstractLargeScheduledVehicle,
+            used_capacity_in_teu: float
+    ) -> bool:
+        """Blocks the capacity of containers that have not been written to the database yet."""
         assert vehicle in self.free_capacity_for_outbound_journey_buffer, \
             "First .get_free_capacity_for_outbound_journey(vehicle) must be invoked"
 
         # calculate new free capacity
         free_capacity_in_teu = self.free_capacity_for_outbound_journey_buffer[vehicle]
-        used_capacity_in_teu = ContainerLength.get_factor(container_length=container.length)
         new_free_capacity_in_teu = free_capacity_in_teu - used_capacity_in_teu
         assert new_free_capacity_in_teu >= 0, f"vehicle {vehicle} is overloaded, " \
                                               f"free_capacity_in_teu: {free_capacity_in_teu}, " \
@@ -102,32 +199,50 @@ class LargeScheduledVehicleRepository:
 
         large_scheduled_vehicle: LargeScheduledVehicle = vehicle.large_scheduled_vehicle
 
+        free_capacity_in_teu = self._get_free_capacity_in_teu(
+            vehicle=vehicle,
+            maximum_capacity=self._get_maximum_capacity_for_outbound_journey(large_scheduled_vehicle),
+            container_counter=self._get_number_containers_for_outbound_journey
+        )
+        self.free_capacity_for_outbound_journey_buffer[vehicle] = free_capacity_in_teu
+        return free_capacity_in_teu
+
+    def _get_maximum_capacity_for_outbound_journey(self, large_scheduled_vehicle: LargeScheduledVehicle) -> float:
         total_moved_capacity_for_onward_transportation_in_teu = \
             large_scheduled_vehicle.moved_capacity * (1 + self.transportation_buffer)
         maximum_capacity_of_vehicle = large_scheduled_vehicle.capacity_in_teu
-        total_moved_capacity_for_onward_transportation_in_teu = min(
+        return min(
             total_moved_capacity_for_onward_transportation_in_teu,
             maximum_capacity_of_vehicle
         )
 
-        free_capacity_in_teu = self._get_free_capacity_in_teu(
+    @classmethod
+    def _get_free_capacity_in_teu(
+            cls,
+            vehicle: AbstractLargeScheduledVehicle,
+            maximum_capacity: int,
+            container_counter: Callable[[AbstractLargeScheduledVehicle, ContainerLength], int]
+    ) -> float:
+        loaded_containers = {
+            container_length: container_counter(vehicle, container_length)
+            for container_length in ContainerLength
+        }
+        return cls._get_free_capacity_from_loaded_containers(
             vehicle=vehicle,
-            maximum_capacity=total_moved_capacity_for_onward_transportation_in_teu,
-            container_counter=self._get_number_containers_for_outbound_journey
+            maximum_capacity=maximum_capacity,
+            loaded_containers=loaded_containers
         )
-        self.free_capacity_for_outbound_journey_buffer[vehicle] = free_capacity_in_teu
-        return free_capacity_in_teu
 
     @staticmethod
-    def _get_free_capacity_in_teu(
+    def _get_free_capacity_from_loaded_containers(
             vehicle: AbstractLargeScheduledVehicle,
-            maximum_capacity: int,
-            container_counter: Callable[[AbstractLargeScheduledVehicle, ContainerLength], int]
+            maximum_capacity: int | float,
+            loaded_containers: Dict[ContainerLength, int]
     ) -> float:
-        loaded_20_foot_containers = container_counter(vehicle, ContainerLength.twenty_feet)
-        loaded_40_foot_containers = container_counter(vehicle, ContainerLength.forty_feet)
-        loaded_45_foot_containers = container_counter(vehicle, ContainerLength.forty_five_feet)
-        loaded_other_containers = container_counter(vehicle, ContainerLength.other)
+        loaded_20_foot_containers = loaded_containers.get(ContainerLength.twenty_feet, 0)
+        loaded_40_foot_containers = loaded_containers.get(ContainerLength.forty_feet, 0)
+        loaded_45_foot_containers = loaded_containers.get(ContainerLength.forty_five_feet, 0)
+        loaded_other_containers = loaded_containers.get(ContainerLength.other, 0)
         free_capacity_in_teu = (
                 maximum_capacity
                 - loaded_20_foot_containers * ContainerLength.get_factor(ContainerLength.twenty_feet)
@@ -1,5 +1,6 @@
+import bisect
 import datetime
-from typing import List
+from typing import Dict, List, Tuple
 import logging
 
 from conflowgen.domain_models.container import Container
@@ -11,13 +12,57 @@ from conflowgen.domain_models.vehicle import LargeScheduledVehicle, AbstractLarg
 
 class ScheduleRepository:
 
+    # No container is smaller than this, so a vehicle with less free capacity can never be chosen again.
+    smallest_capacity = min(ContainerLength.get_factor(container_length) for container_length in ContainerLength)
+
     def __init__(self):
         self.logger = logging.getLogger("conflowgen")
         self.large_scheduled_vehicle_repository = LargeScheduledVehicleRepository()
 
+        # For each vehicle type, the vehicles are sorted by their scheduled arrival. The arrivals are kept in a separate
+        # list so that the time range can be looked up by bisection.
+        self._departing_vehicles_index: Dict[
+            ModeOfTransport, Tuple[List[datetime.datetime], List[AbstractLargeScheduledVehicle]]
+        ] = {}
+
     def set_transportation_buffer(self, transportation_buffer: float):
         self.large_scheduled_vehicle_repository.set_transportation_buffer(transportation_buffer)
 
+    def reset_cache(self):
+        """The index of departing vehicles and the free capacities are only loaded once. If vehicles or containers have
+        been added or removed in the meantime, the cache must be reset."""
+        self.large_scheduled_vehicle_repository.reset_cache()
+        self._departing_vehicles_index = {}
+
+    def _get_departing_vehicles_index(
+            self,
+            vehicle_type: ModeOfTransport
+    ) -> Tuple[List[datetime.datetime], List[AbstractLargeScheduledVehicle]]:
+        if vehicle_type in self._departing_vehicles_index:
+            return self._departing_vehicles_index[vehicle_type]
+
+        # Get type, i.e. Feeder, DeepSeaVessel, etc.
+        large_scheduled_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
+            vehicle_type
+        )
+
+        # Load all vehicles of that type at once, including the general information of the vehicle
+        vehicles: List[AbstractLargeScheduledVehicle] = list(
+            large_scheduled_vehicle_as_subtype.select(
+                large_scheduled_vehicle_as_subtype, LargeScheduledVehicle
+            ).join(
+                LargeScheduledVehicle
+            ).order_by(
+                LargeScheduledVehicle.scheduled_arrival, LargeScheduledVehicle.id
+            )
+        )
+        arrivals = [vehicle.large_scheduled_vehicle.scheduled_arrival for vehicle in vehicles]
+        self.logger.debug(f"Loaded {len(vehicles)} vehicles of type {vehicle_type} into the index of departing "
+                          f"vehicles.")
+
+        self._departing_vehicles_index[vehicle_type] = arrivals, vehicles
+        return arrivals, vehicles
+
     def get_departing_vehicles(
             self,
             start: datetime.datetime,
@@ -29,22 +74,16 @@ class ScheduleRepository:
         """
         assert start <= end
 
-        # Get type, i.e. Feeder, DeepSeaVessel, etc.
-        large_scheduled_vehicle_as_subtype = AbstractLargeScheduledVehicle.map_mode_of_transport_to_class(
-            vehicle_type
-        )
-
         # Get all vehicles in the time range
-        vehicles = large_scheduled_vehicle_as_subtype.select().join(LargeScheduledVehicle).where(
-            (large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.scheduled_arrival >= start)
-            & (large_scheduled_vehicle_as_subtype.large_scheduled_vehicle.scheduled_arrival <= end)
-        )
+        arrivals, vehicles = self._get_departing_vehicles_index(vehicle_type)
+        index_of_first_vehicle = bisect.bisect_left(arrivals, start)
+        index_after_last_vehicle = bisect.bisect_right(arrivals, end)
 
         # Check for each of the vehicles how much it has already loaded
         required_capacity_in_teu = ContainerLength.get_factor(required_capacity)
         vehicles_with_sufficient_capacity = []
         vehicle: AbstractLargeScheduledVehicle
-        for vehicle in vehicles:
+        for vehicle in vehicles[index_of_first_vehicle:index_after_last_vehicle]:
             free_capacity_in_teu = self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(
                 vehicle
             )
@@ -57,6 +96,20 @@ class ScheduleRepository:
 
         return vehicles_with_sufficient_capacity
 
+    def _remove_from_departing_vehicles_index(self, vehicle: AbstractLargeScheduledVehicle) -> None:
+        vehicle_type = vehicle.get_mode_of_transport()
+        if vehicle_type not in self._departing_vehicles_index:
+            return
+        arrivals, vehicles = self._departing_vehicles_index[vehicle_type]
+        scheduled_arrival = vehicle.large_scheduled_vehicle.scheduled_arrival
+        index_of_first_candidate = bisect.bisect_left(arrivals, scheduled_arrival)
+        index_after_last_candidate = bisect.bisect_right(arrivals, scheduled_arrival)
+        for i in range(index_of_first_candidate, index_after_last_candidate):
+            if vehicles[i] == vehicle:
+                del arrivals[i]
+                del vehicles[i]
+                return
+
     def block_capacity_for_outbound_journey(
             self,
             vehicle: AbstractLargeScheduledVehicle,
@@ -64,7 +117,12 @@ class ScheduleRepository:
     ) -> bool:
         """Updates the cache for faster execution
         """
-        return self.large_scheduled_vehicle_repository.block_capacity_for_outbound_journey(
+        vehicle_capacity_is_exhausted = self.large_scheduled_vehicle_repository.block_capacity_for_outbound_journey(
             vehicle=vehicle,
             container=container
         )
+        free_capacity_in_teu = self.large_scheduled_vehicle_repository.get_free_capacity_for_outbound_journey(vehicle)
+        if free_capacity_in_teu < self.smallest_capacity:
+            # Not even the smallest container fits, so the vehicle does not need to be checked again
+            self._remove_from_departing_vehicles_index(vehicle)
+        return vehicle_capacity_is_exhausted
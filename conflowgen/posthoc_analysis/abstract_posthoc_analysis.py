@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import abc
-from typing import NamedTuple, Union, Dict
+from typing import NamedTuple, Union, Dict, Hashable, List
 
+from peewee import Field, fn
+
+from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 
 
@@ -50,3 +53,25 @@ class AbstractPosthocAnalysis(abc.ABC):
         if transportation_buffer is not None:
             assert transportation_buffer > -1
             self.transportation_buffer = transportation_buffer
+
+    def _get_state_for_caching(self) -> Hashable:
+        """
+        The results of an analysis are cached for the data in the database and the state of the analysis.
+        """
+        return self.transportation_buffer
+
+    @staticmethod
+    def _count_containers_by_length_and(*fields: Field) -> List[tuple]:
+        """
+        The containers are counted within the database, grouped by the given fields and the container length. This way,
+        only the small aggregated result is loaded instead of each container.
+
+        Returns: For each group, the values of the fields, the container length, and the number of containers
+        """
+        return list(
+            Container.select(
+                *fields, Container.length, fn.COUNT(Container.id)
+            ).group_by(
+                *fields, Container.length
+            ).tuples()
+        )
@@ -6,6 +6,7 @@ from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.posthoc_analysis.abstract_posthoc_analysis import AbstractPosthocAnalysis, \
     ContainersAndTEUContainerFlowPair
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class ContainerFlowAdjustmentByVehicleTypeAnalysis(AbstractPosthocAnalysis):
@@ -15,8 +16,9 @@ class ContainerFlowAdjustmentByVehicleTypeAnalysis(AbstractPosthocAnalysis):
     as it is the case with :class:`.ContainerFlowAdjustmentByVehicleTypeAnalysisReport`.
     """
 
-    @staticmethod
-    def get_initial_to_adjusted_outbound_flow() -> ContainersAndTEUContainerFlowPair:
+    @classmethod
+    @DataSummariesCache.cache_result
+    def get_initial_to_adjusted_outbound_flow(cls) -> ContainersAndTEUContainerFlowPair:
         """
         When containers are generated, in order to obey the maximum dwell time, the vehicle type that is used for
         onward transportation might change. The initial outbound vehicle type is the vehicle type that is drawn
@@ -44,15 +46,13 @@ class ContainerFlowAdjustmentByVehicleTypeAnalysis(AbstractPosthocAnalysis):
             for vehicle_type_initial in ModeOfTransport
         }
 
-        # Iterate over all containers and count number of containers / used TEU capacity
-        container: Container
-        for container in Container.select():
-            vehicle_type_initial = container.picked_up_by_initial
-            vehicle_type_adjusted = container.picked_up_by
-            teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-            initial_to_adjusted_outbound_flow_in_containers[vehicle_type_initial][vehicle_type_adjusted] += 1
+        # Count number of containers / used TEU capacity for each combination of vehicle types
+        for vehicle_type_initial, vehicle_type_adjusted, container_length, number_containers in \
+                cls._count_containers_by_length_and(Container.picked_up_by_initial, Container.picked_up_by):
+            initial_to_adjusted_outbound_flow_in_containers[vehicle_type_initial][vehicle_type_adjusted] += \
+                number_containers
             initial_to_adjusted_outbound_flow_in_teu[vehicle_type_initial][vehicle_type_adjusted] += \
-                teu_factor_of_container
+                ContainerLength.get_factor(container_length) * number_containers
 
         return ContainersAndTEUContainerFlowPair(
             containers=initial_to_adjusted_outbound_flow_in_containers,
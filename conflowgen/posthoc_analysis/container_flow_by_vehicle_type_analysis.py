@@ -5,6 +5,7 @@ from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.posthoc_analysis.abstract_posthoc_analysis import AbstractPosthocAnalysis
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class ContainerFlowByVehicleTypeAnalysis(AbstractPosthocAnalysis):
@@ -17,8 +18,9 @@ class ContainerFlowByVehicleTypeAnalysis(AbstractPosthocAnalysis):
     def __init__(self):
         super().__init__(transportation_buffer=None)
 
-    @staticmethod
-    def get_inbound_to_outbound_flow() -> Dict[ModeOfTransport, Dict[ModeOfTransport, int | float]]:
+    @classmethod
+    @DataSummariesCache.cache_result
+    def get_inbound_to_outbound_flow(cls) -> Dict[ModeOfTransport, Dict[ModeOfTransport, int | float]]:
         """This is the overview of the generated inbound to outbound container flow."""
         inbound_to_outbound_flow: Dict[ModeOfTransport, Dict[ModeOfTransport, int | float]] = {
             vehicle_type_inbound:
@@ -29,11 +31,9 @@ class ContainerFlowByVehicleTypeAnalysis(AbstractPosthocAnalysis):
             for vehicle_type_inbound in ModeOfTransport
         }
 
-        container: Container
-        for container in Container.select():
-            inbound_vehicle_type = container.delivered_by
-            outbound_vehicle_type = container.picked_up_by
-            teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-            inbound_to_outbound_flow[inbound_vehicle_type][outbound_vehicle_type] += teu_factor_of_container
+        for inbound_vehicle_type, outbound_vehicle_type, container_length, number_containers in \
+                cls._count_containers_by_length_and(Container.delivered_by, Container.picked_up_by):
+            inbound_to_outbound_flow[inbound_vehicle_type][outbound_vehicle_type] += \
+                ContainerLength.get_factor(container_length) * number_containers
 
         return inbound_to_outbound_flow
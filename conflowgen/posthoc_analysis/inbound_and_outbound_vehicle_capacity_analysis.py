@@ -5,8 +5,10 @@ from typing import Dict, Tuple
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
 from conflowgen.domain_models.vehicle import LargeScheduledVehicle
 from conflowgen.posthoc_analysis.abstract_posthoc_analysis import AbstractPosthocAnalysis
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
 
 
 class InboundAndOutboundVehicleCapacityAnalysis(AbstractPosthocAnalysis):
@@ -21,8 +23,9 @@ class InboundAndOutboundVehicleCapacityAnalysis(AbstractPosthocAnalysis):
             transportation_buffer=transportation_buffer
         )
 
-    @staticmethod
-    def get_inbound_capacity_of_vehicles() -> Dict[ModeOfTransport, int]:
+    @classmethod
+    @DataSummariesCache.cache_result
+    def get_inbound_capacity_of_vehicles(cls) -> Dict[ModeOfTransport, int]:
         """
         This is the used capacity of all vehicles separated by vehicle type on their inbound journey in TEU.
 
@@ -33,14 +36,13 @@ class InboundAndOutboundVehicleCapacityAnalysis(AbstractPosthocAnalysis):
             for vehicle_type in ModeOfTransport
         }
 
-        container: Container
-        for container in Container.select():
-            inbound_vehicle_type = container.delivered_by
-            teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-            inbound_capacity[inbound_vehicle_type] += teu_factor_of_container
+        for inbound_vehicle_type, container_length, number_containers in cls._count_containers_by_length_and(
+                Container.delivered_by):
+            inbound_capacity[inbound_vehicle_type] += ContainerLength.get_factor(container_length) * number_containers
 
         return inbound_capacity
 
+    @DataSummariesCache.cache_result
     def get_outbound_capacity_of_vehicles(self) -> Tuple[Dict[ModeOfTransport, int], Dict[ModeOfTransport, int]]:
         """
         This is the used and the maximum capacity of all vehicles separated by vehicle type on their outbound journey
@@ -59,19 +61,20 @@ class InboundAndOutboundVehicleCapacityAnalysis(AbstractPosthocAnalysis):
             for vehicle_type in ModeOfTransport
         }
 
-        container: Container
-        for container in Container.select():
-            outbound_vehicle_type: ModeOfTransport = container.picked_up_by
-            teu_factor_of_container: float = ContainerLength.get_factor(container.length)
-            outbound_actual_capacity[outbound_vehicle_type] += teu_factor_of_container
+        for outbound_vehicle_type, container_length, number_containers in self._count_containers_by_length_and(
+                Container.picked_up_by):
+            outbound_actual_capacity[outbound_vehicle_type] += \
+                ContainerLength.get_factor(container_length) * number_containers
 
-        large_scheduled_vehicle: LargeScheduledVehicle
-        for large_scheduled_vehicle in LargeScheduledVehicle.select():
+        # The vehicle type is joined instead of being loaded for each vehicle separately
+        vehicle_type: ModeOfTransport
+        for moved_capacity, capacity_in_teu, vehicle_type in LargeScheduledVehicle.select(
+                LargeScheduledVehicle.moved_capacity, LargeScheduledVehicle.capacity_in_teu, Schedule.vehicle_type
+        ).join(Schedule).tuples():
             maximum_capacity_of_vehicle = min(
-                large_scheduled_vehicle.moved_capacity * (1 + self.transportation_buffer),
-                large_scheduled_vehicle.capacity_in_teu
+                moved_capacity * (1 + self.transportation_buffer),
+                capacity_in_teu
             )
-            vehicle_type: ModeOfTransport = large_scheduled_vehicle.schedule.vehicle_type
             outbound_maximum_capacity[vehicle_type] += maximum_capacity_of_vehicle
 
         outbound_maximum_capacity[ModeOfTransport.truck] = -1  # Not meaningful, trucks can always be added as required
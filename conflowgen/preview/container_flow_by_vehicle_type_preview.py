@@ -58,6 +58,9 @@ class ContainerFlowByVehicleTypePreview(AbstractPreview):
     ):
         self.validator.validate(mode_of_transport_distribution)
         self.mode_of_transport_distribution = mode_of_transport_distribution
+        self.inbound_and_outbound_vehicle_capacity_preview.hypothesize_with_mode_of_transport_distribution(
+            mode_of_transport_distribution
+        )
 
     def get_inbound_to_outbound_flow(
             self
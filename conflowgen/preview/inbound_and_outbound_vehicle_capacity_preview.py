@@ -8,8 +8,8 @@ from conflowgen.domain_models.distribution_repositories.mode_of_transport_distri
     ModeOfTransportDistributionRepository
 from conflowgen.domain_models.distribution_validators.mode_of_transport_distribution_validator import \
     ModeOfTransportDistributionValidator
-from conflowgen.domain_models.factories.fleet_factory import create_arrivals_within_time_range
-from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.preview.scheduled_vehicle_capacity_engine import ScheduledVehicleCapacityEngine, \
+    ScheduledVehicleCapacities
 
 
 class OutboundUsedAndMaximumCapacity(NamedTuple):
@@ -84,6 +84,13 @@ class InboundAndOutboundVehicleCapacityPreview(AbstractPreview):
         self.validator.validate(mode_of_transport_distribution)
         self.mode_of_transport_distribution = mode_of_transport_distribution
 
+    def _get_capacities_of_scheduled_vehicles(self) -> ScheduledVehicleCapacities:
+        return ScheduledVehicleCapacityEngine.get_capacities(
+            self.start_date,
+            self.end_date,
+            self.transportation_buffer
+        )
+
     def get_inbound_capacity_of_vehicles(self) -> Dict[ModeOfTransport, int]:
         """
         For the inbound capacity, first vehicles that adhere to a schedule are considered. Trucks, which are created
@@ -94,17 +101,7 @@ class InboundAndOutboundVehicleCapacityPreview(AbstractPreview):
             vehicle_type: 0
             for vehicle_type in ModeOfTransport
         }
-
-        for schedule in Schedule.select():
-            arrivals = create_arrivals_within_time_range(
-                self.start_date,
-                schedule.vehicle_arrives_at,
-                self.end_date,
-                schedule.vehicle_arrives_every_k_days,
-                schedule.vehicle_arrives_at_time
-            )
-            total_capacity_moved_by_vessel = len(arrivals) * schedule.average_moved_capacity
-            inbound_capacity[schedule.vehicle_type] += total_capacity_moved_by_vessel
+        inbound_capacity.update(self._get_capacities_of_scheduled_vehicles().moved)
 
         inbound_capacity[ModeOfTransport.truck] = self._get_truck_capacity_for_export_containers(inbound_capacity)
 
@@ -116,6 +113,7 @@ class InboundAndOutboundVehicleCapacityPreview(AbstractPreview):
         reported. If a vehicle type reaches the maximum outbound capacity, this means that containers need to be
         redistributed to other vehicle types due to a lack of capacity.
         """
+        capacities_of_scheduled_vehicles = self._get_capacities_of_scheduled_vehicles()
         outbound_used_capacity: Dict[ModeOfTransport, int | float] = {
             vehicle_type: 0
             for vehicle_type in ModeOfTransport
@@ -125,37 +123,15 @@ class InboundAndOutboundVehicleCapacityPreview(AbstractPreview):
             for vehicle_type in ModeOfTransport
         }
 
-        for schedule in Schedule.select():
-
-            assert schedule.average_moved_capacity <= schedule.average_vehicle_capacity, \
-                "A vehicle cannot move a larger amount of containers (in TEU) than its capacity, " \
-                f"the input data is malformed. Schedule '{schedule.service_name}' of vehicle type " \
-                f"{schedule.vehicle_type} has an average moved capacity of {schedule.average_moved_capacity} but an " \
-                f"averaged vehicle capacity of {schedule.average_vehicle_capacity}."
-
-            arrivals = create_arrivals_within_time_range(
-                self.start_date,
-                schedule.vehicle_arrives_at,
-                self.end_date,
-                schedule.vehicle_arrives_every_k_days,
-                schedule.vehicle_arrives_at_time
-            )
-
-            # If all container flows are balanced, only the average moved capacity is required
-            total_average_capacity_moved_by_vessel = len(arrivals) * schedule.average_moved_capacity
-            outbound_used_capacity[schedule.vehicle_type] += total_average_capacity_moved_by_vessel
-
-            # If there are unbalanced container flows, a vehicle departs with more containers than it delivered
-            maximum_capacity_of_vehicle = min(
-                schedule.average_moved_capacity * (1 + self.transportation_buffer),
-                schedule.average_vehicle_capacity
-            )
-            total_maximum_capacity_moved_by_vessel = len(arrivals) * maximum_capacity_of_vehicle
-            outbound_maximum_capacity[schedule.vehicle_type] += total_maximum_capacity_moved_by_vessel
-
-        inbound_capacity = self.get_inbound_capacity_of_vehicles()
+        # If all container flows are balanced, only the average moved capacity is required
+        outbound_used_capacity.update(capacities_of_scheduled_vehicles.moved)
+
+        # If there are unbalanced container flows, a vehicle departs with more containers than it delivered
+        outbound_maximum_capacity.update(capacities_of_scheduled_vehicles.maximum)
+
+        # The vehicles that adhere to a schedule deliver the same capacity as they move on their outbound journey
         outbound_used_capacity[ModeOfTransport.truck] = self._get_truck_capacity_for_export_containers(
-            inbound_capacity
+            outbound_used_capacity
         )
         outbound_maximum_capacity[ModeOfTransport.truck] = -1  # Not meaningful, trucks can always be added as required
 
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import datetime
+from typing import Dict, NamedTuple
+
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.factories.fleet_factory import count_arrivals_within_time_range
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
+
+
+class ScheduledVehicleCapacities(NamedTuple):
+    """
+    The capacity of all vehicles that arrive according to a schedule within a time range, in TEU and summed up by
+    vehicle type. Trucks are not included as they do not adhere to a schedule.
+    """
+
+    #: The capacity the vehicles move, i.e. they deliver it on their inbound journey and, if all container flows are
+    #: balanced, they take it on their outbound journey
+    moved: Dict[ModeOfTransport, int | float]
+
+    #: The capacity the vehicles can take at most on their outbound journey
+    maximum: Dict[ModeOfTransport, int | float]
+
+
+class ScheduledVehicleCapacityEngine:
+    """
+    All previews are based on the vehicles that arrive according to the schedules. The schedules are only loaded and
+    their arrivals are only counted once for each time range and transportation buffer, no matter how many previews use
+    them and how many mode of transport distributions are tried out.
+    """
+
+    @classmethod
+    @DataSummariesCache.cache_result
+    def get_capacities(
+            cls,
+            start_date: datetime.date,
+            end_date: datetime.date,
+            transportation_buffer: float
+    ) -> ScheduledVehicleCapacities:
+        """
+        Args:
+            start_date: The earliest day to consider for scheduled vehicles
+            end_date: The latest day to consider for scheduled vehicles
+            transportation_buffer: The fraction of how much more a vehicle takes with it on an outbound journey
+                compared to an inbound journey as long as the total vehicle capacity is not exceeded.
+
+        Returns: The moved and the maximum capacity of the vehicles
+        """
+        moved_capacity: Dict[ModeOfTransport, int | float] = {
+            vehicle_type: 0
+            for vehicle_type in ModeOfTransport.get_scheduled_vehicles()
+        }
+        maximum_capacity: Dict[ModeOfTransport, int | float] = {
+            vehicle_type: 0
+            for vehicle_type in ModeOfTransport.get_scheduled_vehicles()
+        }
+
+        schedule: Schedule
+        for schedule in Schedule.select():
+            assert schedule.average_moved_capacity <= schedule.average_vehicle_capacity, \
+                "A vehicle cannot move a larger amount of containers (in TEU) than its capacity, " \
+                f"the input data is malformed. Schedule '{schedule.service_name}' of vehicle type " \
+                f"{schedule.vehicle_type} has an average moved capacity of {schedule.average_moved_capacity} but an " \
+                f"averaged vehicle capacity of {schedule.average_vehicle_capacity}."
+
+            number_arrivals = count_arrivals_within_time_range(
+                start_date,
+                schedule.vehicle_arrives_at,
+                end_date,
+                schedule.vehicle_arrives_every_k_days
+            )
+
+            # If all container flows are balanced, only the average moved capacity is required
+            moved_capacity[schedule.vehicle_type] += number_arrivals * schedule.average_moved_capacity
+
+            # If there are unbalanced container flows, a vehicle departs with more containers than it delivered
+            maximum_capacity_of_vehicle = min(
+                schedule.average_moved_capacity * (1 + transportation_buffer),
+                schedule.average_vehicle_capacity
+            )
+            maximum_capacity[schedule.vehicle_type] += number_arrivals * maximum_capacity_of_vehicle
+
+        return ScheduledVehicleCapacities(
+            moved=moved_capacity,
+            maximum=maximum_capacity
+        )
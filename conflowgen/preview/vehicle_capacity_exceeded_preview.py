@@ -2,6 +2,8 @@ from __future__ import annotations
 import datetime
 from typing import Dict, NamedTuple, Union
 
+import numpy as np
+
 from conflowgen.preview.abstract_preview import AbstractPreview
 from conflowgen.preview.container_flow_by_vehicle_type_preview import \
     ContainerFlowByVehicleTypePreview
@@ -9,7 +11,9 @@ from conflowgen.preview.inbound_and_outbound_vehicle_capacity_preview import \
     InboundAndOutboundVehicleCapacityPreview
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.distribution_validators.mode_of_transport_distribution_validator import \
-    ModeOfTransportDistributionValidator
+    ModeOfTransportDistributionValidator, ModeOfTransportProportionOutOfRangeException, \
+    ModeOfTransportProportionsUnequalOneException
+from conflowgen.preview.scheduled_vehicle_capacity_engine import ScheduledVehicleCapacityEngine
 
 
 class RequiredAndMaximumCapacityComparison(NamedTuple):
@@ -23,6 +27,17 @@ class RequiredAndMaximumCapacityComparison(NamedTuple):
     exceeded: bool
 
 
+class RequiredAndMaximumCapacityComparisons(NamedTuple):
+    """
+    This is the comparison of :class:`.RequiredAndMaximumCapacityComparison` for several mode of transport
+    distributions at once. Each array has the shape (number of distributions, number of vehicle types) and the vehicle
+    types are in the order of :class:`.ModeOfTransport`.
+    """
+    currently_planned: np.ndarray
+    maximum: np.ndarray
+    exceeded: np.ndarray
+
+
 class VehicleCapacityExceededPreview(AbstractPreview):
     """
     The preview examines the outbound traffic and checks if the intended transportation demands can be satisfied by the
@@ -116,3 +131,80 @@ class VehicleCapacityExceededPreview(AbstractPreview):
             )
 
         return comparison
+
+    @staticmethod
+    def convert_mode_of_transport_distribution_to_array(
+            mode_of_transport_distribution: Dict[ModeOfTransport, Dict[ModeOfTransport, float]]
+    ) -> np.ndarray:
+        """
+        Args:
+            mode_of_transport_distribution: A mode of transport distribution
+
+        Returns: The distribution as an array of the shape (5, 5). The first axis is the vehicle type that delivers the
+            container, the second axis is the vehicle type that picks it up. Both are in the order of
+            :class:`.ModeOfTransport`.
+        """
+        return np.array([
+            [mode_of_transport_distribution[delivered_by][picked_up_by] for picked_up_by in ModeOfTransport]
+            for delivered_by in ModeOfTransport
+        ], dtype=np.float64)
+
+    def compare_for_mode_of_transport_distributions(
+            self,
+            mode_of_transport_distributions: np.ndarray
+    ) -> RequiredAndMaximumCapacityComparisons:
+        """
+        Compare the required and the maximum capacity of the vehicles on their outbound journey like :meth:`compare`
+        but for many mode of transport distributions at once, e.g. for a grid search. The capacities of the vehicles
+        that adhere to a schedule are only determined once for all distributions.
+
+        Args:
+            mode_of_transport_distributions: An array of the shape (k, 5, 5) with k mode of transport distributions as
+                created by :meth:`convert_mode_of_transport_distribution_to_array`
+
+        Returns: The comparison for each of the k mode of transport distributions
+        """
+        distributions = np.asarray(mode_of_transport_distributions, dtype=np.float64)
+        number_vehicle_types = len(ModeOfTransport)
+        if distributions.ndim != 3 or distributions.shape[1:] != (number_vehicle_types, number_vehicle_types):
+            raise ValueError(f"Expected an array of the shape (k, {number_vehicle_types}, {number_vehicle_types}) but "
+                             f"received one of the shape {distributions.shape}")
+        if not ((0 <= distributions) & (distributions <= 1)).all():
+            raise ModeOfTransportProportionOutOfRangeException(
+                f"distributions: {np.argwhere((distributions < 0) | (distributions > 1))[:, 0].tolist()}"
+            )
+        sums_of_fractions = distributions.sum(axis=2)
+        if not np.isclose(sums_of_fractions, 1, rtol=0, atol=0.1).all():
+            raise ModeOfTransportProportionsUnequalOneException(
+                f"distributions: {np.argwhere(~np.isclose(sums_of_fractions, 1, rtol=0, atol=0.1))[:, 0].tolist()}"
+            )
+
+        capacities_of_scheduled_vehicles = ScheduledVehicleCapacityEngine.get_capacities(
+            self.start_date,
+            self.end_date,
+            self.transportation_buffer
+        )
+        index_of_truck = list(ModeOfTransport).index(ModeOfTransport.truck)
+        inbound_capacity_of_scheduled_vehicles = np.array([
+            capacities_of_scheduled_vehicles.moved.get(vehicle_type, 0) for vehicle_type in ModeOfTransport
+        ], dtype=np.float64)
+        maximum_capacity = np.array([
+            capacities_of_scheduled_vehicles.maximum.get(vehicle_type, -1) for vehicle_type in ModeOfTransport
+        ], dtype=np.float64)  # Trucks have no maximum, they can always be added as required
+
+        # For each import container picked up by truck, one export container is delivered by truck
+        inbound_capacity = np.repeat(inbound_capacity_of_scheduled_vehicles[np.newaxis, :], len(distributions), axis=0)
+        inbound_capacity[:, index_of_truck] = \
+            distributions[:, :, index_of_truck] @ inbound_capacity_of_scheduled_vehicles
+
+        # The flow from each inbound vehicle type to each outbound vehicle type, summed up per outbound vehicle type
+        currently_planned = np.einsum("ki,kio->ko", inbound_capacity, distributions)
+
+        maximum = np.repeat(maximum_capacity[np.newaxis, :], len(distributions), axis=0)
+        exceeded = (currently_planned > maximum) & (maximum != -1)
+
+        return RequiredAndMaximumCapacityComparisons(
+            currently_planned=currently_planned,
+            maximum=maximum,
+            exceeded=exceeded
+        )
@@ -43,6 +43,41 @@ class TestDatabaseChooser(unittest.TestCase):
             self.database_chooser.create_new_sqlite_database("test")
         mock_method.assert_called_once_with("test", create=True, reset=False)
 
+    def test_load_existing_sqlite_database_in_memory(self):
+        with unittest.mock.patch.object(
+                self.database_chooser.sqlite_database_connection,
+                'choose_database_in_memory',
+                return_value=None) as mock_method:
+            self.database_chooser.load_existing_sqlite_database("test", in_memory=True)
+        mock_method.assert_called_once_with("test", create=False, reset=False)
+
+    def test_create_new_sqlite_database_in_memory(self):
+        with unittest.mock.patch.object(
+                self.database_chooser.sqlite_database_connection,
+                'choose_database_in_memory',
+                return_value=None) as mock_method:
+            self.database_chooser.create_new_sqlite_database("test", in_memory=True)
+        mock_method.assert_called_once_with("test", create=True, reset=False)
+
+    def test_close_current_connection_persists_in_memory_database(self):
+        with unittest.mock.patch.object(
+                self.database_chooser,
+                'peewee_sqlite_db'), \
+                unittest.mock.patch.object(
+                    self.database_chooser.sqlite_database_connection,
+                    'is_in_memory',
+                    return_value=True), \
+                unittest.mock.patch.object(
+                    self.database_chooser.sqlite_database_connection,
+                    'persist_in_memory_database',
+                    return_value=None) as mock_method:
+            self.database_chooser.close_current_connection()
+        mock_method.assert_called_once()
+
+    def test_persist_in_memory_database_without_connection(self):
+        with self.assertRaises(NoCurrentConnectionException):
+            self.database_chooser.persist_in_memory_database()
+
     def test_close_current_connection_with_connection(self):
         with unittest.mock.patch.object(
                 self.database_chooser,
@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from conflowgen.application_models.container_flow_generation_checkpoint import ContainerFlowGenerationCheckpoint
+from conflowgen.application_models.repositories.container_flow_generation_checkpoint_repository import \
+    ContainerFlowGenerationCheckpointRepository
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestContainerFlowGenerationCheckpointRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            ContainerFlowGenerationCheckpoint
+        ])
+        self.repository = ContainerFlowGenerationCheckpointRepository()
+
+    def test_nothing_has_started_in_empty_database(self):
+        self.assertFalse(self.repository.has_started())
+        self.assertFalse(self.repository.is_stage_finished("fleet_creation"))
+        self.assertIsNone(self.repository.get_seed())
+        self.assertIsNone(self.repository.get_progress("onward_assignment"))
+
+    def test_mark_stage_as_finished(self):
+        self.repository.mark_stage_as_finished("fleet_creation")
+        self.assertTrue(self.repository.has_started())
+        self.assertTrue(self.repository.is_stage_finished("fleet_creation"))
+        self.assertFalse(self.repository.is_stage_finished("onward_assignment"))
+
+        self.repository.reset()
+        self.assertFalse(self.repository.is_stage_finished("fleet_creation"))
+
+    def test_store_large_seed(self):
+        seed = 2 ** 127 + 1
+        self.repository.set_seed(seed)
+        self.assertEqual(self.repository.get_seed(), seed)
+
+    def test_restore_random_state(self):
+        random_number_generator = random.Random(1)
+        random_number_generator.random()
+        self.repository.save_progress(
+            stage="onward_assignment",
+            number_finished_chunks=3,
+            random_state=random_number_generator.getstate()
+        )
+        self.assertFalse(self.repository.is_stage_finished("onward_assignment"))
+
+        number_finished_chunks, random_state = self.repository.get_progress("onward_assignment")
+
+        self.assertEqual(number_finished_chunks, 3)
+        restored_random_number_generator = random.Random()
+        restored_random_number_generator.setstate(random_state)
+        self.assertEqual(restored_random_number_generator.random(), random_number_generator.random())
@@ -0,0 +1,95 @@
+import datetime
+import unittest
+
+from conflowgen.application_models.container_flow_generation_fingerprint import ContainerFlowGenerationFingerprint
+from conflowgen.application_models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.application_models.repositories.container_flow_generation_fingerprint_repository import \
+    ContainerFlowGenerationFingerprintRepository, ScheduleChanges
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.distribution_models.container_length_distribution import ContainerLengthDistribution
+from conflowgen.domain_models.distribution_models.container_weight_distribution import ContainerWeightDistribution
+from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
+from conflowgen.domain_models.distribution_models.storage_requirement_distribution import StorageRequirementDistribution
+from conflowgen.domain_models.distribution_models.truck_arrival_distribution import TruckArrivalDistribution
+from conflowgen.domain_models.distribution_seeders.seed_database import seed_all_distributions
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestContainerFlowGenerationFingerprintRepository(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            ContainerFlowGenerationFingerprint,
+            ContainerFlowGenerationProperties,
+            ModeOfTransportDistribution,
+            ContainerLengthDistribution,
+            ContainerWeightDistribution,
+            StorageRequirementDistribution,
+            TruckArrivalDistribution,
+            Schedule,
+            Destination
+        ])
+        seed_all_distributions()
+        self.schedule = self._create_schedule("TestFeederService")
+        self.repository = ContainerFlowGenerationFingerprintRepository()
+
+    @staticmethod
+    def _create_schedule(service_name: str) -> Schedule:
+        return Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name=service_name,
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+
+    def test_no_previous_generation(self):
+        self.assertIsNone(self.repository.get_schedule_changes())
+
+    def test_nothing_has_changed(self):
+        self.repository.save_fingerprints()
+        self.assertEqual(
+            self.repository.get_schedule_changes(),
+            ScheduleChanges(changed_schedule_ids=[], removed_schedule_ids=[])
+        )
+
+    def test_schedules_have_changed(self):
+        self.repository.save_fingerprints()
+        self.schedule.average_moved_capacity = 200
+        self.schedule.save()
+        new_schedule = self._create_schedule("NewFeederService")
+        self.assertEqual(
+            self.repository.get_schedule_changes(),
+            ScheduleChanges(changed_schedule_ids=[self.schedule.id, new_schedule.id], removed_schedule_ids=[])
+        )
+
+        self.repository.save_fingerprints()
+        Destination.create(belongs_to_schedule=self.schedule, sequence_id=1, destination_name="A")
+        new_schedule.delete_instance()
+        self.assertEqual(
+            self.repository.get_schedule_changes(),
+            ScheduleChanges(changed_schedule_ids=[self.schedule.id], removed_schedule_ids=[new_schedule.id])
+        )
+
+    def test_changed_distribution_requires_whole_generation(self):
+        self.repository.save_fingerprints()
+        ContainerLengthDistribution.update(fraction=0.5).where(
+            ContainerLengthDistribution.container_length == ContainerLength.twenty_feet
+        ).execute()
+        self.assertIsNone(self.repository.get_schedule_changes())
+
+    def test_changed_name_is_ignored(self):
+        self.repository.save_fingerprints()
+        properties = ContainerFlowGenerationProperties.get()
+        properties.name = "Another name"
+        properties.save()
+        self.assertIsNotNone(self.repository.get_schedule_changes())
+
+        properties.transportation_buffer = 0.1
+        properties.save()
+        self.assertIsNone(self.repository.get_schedule_changes())
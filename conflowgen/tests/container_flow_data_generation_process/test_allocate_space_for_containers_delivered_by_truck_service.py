@@ -188,3 +188,85 @@ class TestAllocateSpaceForContainersDeliveredByTruckService(unittest.TestCase):
         created_container = (set(containers) - {container}).pop()
         self.assertTrue(created_container.delivered_by, ModeOfTransport.truck)
         self.assertTrue(created_container.picked_up_by_large_scheduled_vehicle, feeder.large_scheduled_vehicle)
+
+    def test_does_nothing_if_all_vehicles_are_fully_loaded(self):
+        now = datetime.datetime.now()
+        feeder = self._create_feeder(scheduled_arrival=now + datetime.timedelta(days=1))
+
+        # The import container already exists
+        Container.create(
+            weight=20,
+            length=ContainerLength.twenty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.feeder,
+            delivered_by_large_scheduled_vehicle=feeder.large_scheduled_vehicle,
+            picked_up_by=ModeOfTransport.truck,
+            picked_up_by_initial=ModeOfTransport.truck
+        )
+
+        # The feeder is already fully loaded for its outbound journey
+        for _ in range(300):
+            Container.create(
+                weight=20,
+                length=ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=ModeOfTransport.deep_sea_vessel,
+                picked_up_by=ModeOfTransport.feeder,
+                picked_up_by_initial=ModeOfTransport.feeder,
+                picked_up_by_large_scheduled_vehicle=feeder.large_scheduled_vehicle
+            )
+
+        self.assertIsNone(self.service.allocate())
+        self.assertEqual(Container.select().count(), 301)
+
+    def test_skip_vehicle_type_if_all_vehicles_of_that_type_are_fully_loaded(self):
+        now = datetime.datetime.now()
+        feeder = self._create_feeder(scheduled_arrival=now + datetime.timedelta(days=1))
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.deep_sea_vessel,
+            service_name="TestDeepSeaService",
+            vehicle_arrives_at=now.date(),
+            vehicle_arrives_at_time=now.time(),
+            average_vehicle_capacity=1000,
+            average_moved_capacity=1000,
+        )
+        deep_sea_vessel_lsv = LargeScheduledVehicle.create(
+            capacity_in_teu=schedule.average_vehicle_capacity,
+            moved_capacity=schedule.average_moved_capacity,
+            scheduled_arrival=now + datetime.timedelta(days=1),
+            schedule=schedule
+        )
+        DeepSeaVessel.create(large_scheduled_vehicle=deep_sea_vessel_lsv)
+
+        # The import container already exists
+        Container.create(
+            weight=20,
+            length=ContainerLength.twenty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.deep_sea_vessel,
+            delivered_by_large_scheduled_vehicle=deep_sea_vessel_lsv,
+            picked_up_by=ModeOfTransport.truck,
+            picked_up_by_initial=ModeOfTransport.truck
+        )
+
+        # The feeder has exactly zero free capacity, so the weights of all feeders sum up to zero
+        for _ in range(300):
+            Container.create(
+                weight=20,
+                length=ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=ModeOfTransport.deep_sea_vessel,
+                delivered_by_large_scheduled_vehicle=deep_sea_vessel_lsv,
+                picked_up_by=ModeOfTransport.feeder,
+                picked_up_by_initial=ModeOfTransport.feeder,
+                picked_up_by_large_scheduled_vehicle=feeder.large_scheduled_vehicle
+            )
+
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                Container.delete().where(Container.delivered_by == ModeOfTransport.truck).execute()
+                self.service.random_number_generator.seed(seed)
+                self.assertIsNone(self.service.allocate())
+                created_container = Container.get(Container.delivered_by == ModeOfTransport.truck)
+                self.assertEqual(created_container.picked_up_by, ModeOfTransport.deep_sea_vessel)
+                self.assertEqual(created_container.picked_up_by_large_scheduled_vehicle, deep_sea_vessel_lsv)
@@ -202,3 +202,41 @@ class TestAssignDestinationToContainerService(unittest.TestCase):
         container_update: Container = Container.get_by_id(container.id)
 
         self.assertIsNone(container_update.destination)
+
+    def test_assign_destinations_to_many_containers(self):
+        truck = self._create_truck(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        containers = []
+        for _ in range(2000):  # more containers than variables in a single statement
+            container = self._create_container_for_truck(truck)
+            container.picked_up_by_large_scheduled_vehicle = feeder.large_scheduled_vehicle
+            container.save()
+            containers.append(container)
+
+        schedule = feeder.large_scheduled_vehicle.schedule
+        destination_1 = Destination.create(
+            belongs_to_schedule=schedule,
+            sequence_id=1,
+            destination_name="TestDestination1",
+        )
+        destination_2 = Destination.create(
+            belongs_to_schedule=schedule,
+            sequence_id=2,
+            destination_name="TestDestination2",
+        )
+        self.repository.set_distribution({
+            schedule: {
+                destination_1: 0.2,
+                destination_2: 0.8
+            }
+        })
+        self.service.reload_distribution()
+
+        self.service.assign()
+
+        number_containers_with_destination_1 = Container.select().where(
+            Container.destination == destination_1).count()
+        number_containers_with_destination_2 = Container.select().where(
+            Container.destination == destination_2).count()
+        self.assertEqual(number_containers_with_destination_1 + number_containers_with_destination_2, 2000)
+        self.assertAlmostEqual(number_containers_with_destination_1 / 2000, 0.2, delta=0.05)
@@ -1,19 +1,26 @@
 import datetime
+import json
 import unittest
+import unittest.mock
 
 from conflowgen import PortCallManager
+from conflowgen.application_models.container_flow_generation_fingerprint import ContainerFlowGenerationFingerprint
 from conflowgen.application_models.container_flow_generation_properties import ContainerFlowGenerationProperties
 from conflowgen.application_models.repositories.container_flow_generation_properties_repository import \
     ContainerFlowGenerationPropertiesRepository
 from conflowgen.database_connection.create_tables import create_tables
+from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
 from conflowgen.domain_models.distribution_models.storage_requirement_distribution import StorageRequirementDistribution
 from conflowgen.domain_models.distribution_seeders import mode_of_transport_distribution_seeder
 from conflowgen.domain_models.distribution_seeders.seed_database import seed_all_distributions
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.container_flow_data_generation_process.container_flow_generation_profile import \
+    ContainerFlowGenerationProfile
 from conflowgen.container_flow_data_generation_process.container_flow_generation_service import \
     ContainerFlowGenerationService
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
 from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
 
 
@@ -61,4 +68,348 @@ class TestContainerFlowGeneratorService__generate(unittest.TestCase):
             average_moved_capacity=100,
             next_destinations=None
         )
-        self.container_Flow_generator_service.generate()
+        with self.assertLogs("conflowgen", level="INFO") as logs:
+            self.container_Flow_generator_service.generate()
+        self.assertIn("INFO:conflowgen:Final capacity status of vehicles adhering to a schedule:", logs.output)
+
+    @staticmethod
+    def _get_container_flow() -> list:
+        container_flow = []
+        for container in Container.select().order_by(Container.id):
+            container_flow.append((
+                container.weight,
+                container.length,
+                container.storage_requirement,
+                container.delivered_by,
+                container.picked_up_by,
+                container.picked_up_by_initial,
+                container.emergency_pickup,
+                container.delivered_by_large_scheduled_vehicle_id,
+                container.picked_up_by_large_scheduled_vehicle_id,
+                container.destination_id,
+                container.delivered_by_truck.truck_arrival_information_for_delivery.realized_container_delivery_time
+                if container.delivered_by_truck is not None else None,
+                container.picked_up_by_truck.truck_arrival_information_for_pickup.realized_container_pickup_time
+                if container.picked_up_by_truck is not None else None
+            ))
+        return container_flow
+
+    def test_same_seed_leads_to_same_container_flow(self):
+        create_tables(self.sqlite_db)
+        seed_all_distributions()
+        port_call_manager = PortCallManager()
+        for vehicle_type in (ModeOfTransport.feeder, ModeOfTransport.deep_sea_vessel, ModeOfTransport.train):
+            port_call_manager.add_large_scheduled_vehicle(
+                vehicle_type=vehicle_type,
+                service_name=f"Test {vehicle_type}",
+                vehicle_arrives_at=datetime.date(2021, 7, 9),
+                vehicle_arrives_at_time=datetime.time(11),
+                average_vehicle_capacity=300,
+                average_moved_capacity=100,
+                next_destinations=None
+            )
+
+        self.container_Flow_generator_service.generate(seed=42)
+        first_container_flow = self._get_container_flow()
+        self.assertGreater(len(first_container_flow), 0)
+
+        self.container_Flow_generator_service.generate(seed=42, number_processes=2)
+        second_container_flow = self._get_container_flow()
+        self.assertListEqual(first_container_flow, second_container_flow)
+
+    def test_profile_covers_all_stages(self):
+        create_tables(self.sqlite_db)
+        seed_all_distributions()
+        port_call_manager = PortCallManager()
+        port_call_manager.add_large_scheduled_vehicle(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeeder",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=800,
+            average_moved_capacity=100,
+            next_destinations=None
+        )
+        profile = self.container_Flow_generator_service.generate(seed=1)
+
+        self.assertListEqual(
+            list(profile.stages.keys()),
+            ["clear", "preparation", "fleet_creation", "reports", "onward_assignment", "import_trucks",
+             "export_allocation", "export_trucks", "destinations"]
+        )
+        for stage, stage_profile in profile.stages.items():
+            with self.subTest(stage=stage):
+                self.assertGreaterEqual(stage_profile.wall_time_in_seconds, 0)
+                self.assertGreaterEqual(stage_profile.cpu_time_in_seconds, 0)
+                self.assertGreaterEqual(stage_profile.number_changed_rows, 0)
+        self.assertGreater(profile.stages["fleet_creation"].number_sql_statements, 0)
+        self.assertGreaterEqual(
+            profile.stages["fleet_creation"].number_changed_rows,
+            Container.select().where(Container.delivered_by == ModeOfTransport.feeder).count()
+        )
+        self.assertEqual(profile.stages["clear"].number_changed_rows, 0)
+
+        second_profile = self.container_Flow_generator_service.generate(seed=1)
+        # Removing the previous container flow deletes the containers and vehicles
+        self.assertGreaterEqual(second_profile.stages["clear"].number_changed_rows, Container.select().count())
+
+        profile_as_json = json.loads(profile.to_json())
+        self.assertSetEqual(set(profile_as_json.keys()), set(profile.stages.keys()))
+        self.assertSetEqual(
+            set(profile_as_json["fleet_creation"].keys()),
+            {"wall_time_in_seconds", "cpu_time_in_seconds", "number_sql_statements", "number_changed_rows",
+             "peak_resident_set_size_in_megabytes"}
+        )
+
+    def test_profiling_keeps_trace_callback(self):
+        traced_statements = []
+        connection = self.sqlite_db.connection()
+        connection.set_trace_callback(traced_statements.append)
+        self.addCleanup(connection.set_trace_callback, None)
+        profile = ContainerFlowGenerationProfile()
+
+        with profile.measure("count"):
+            Schedule.select().count()
+        Schedule.select().count()
+
+        self.assertEqual(profile.stages["count"].number_sql_statements, 1)
+        self.assertEqual(len([statement for statement in traced_statements if "schedule" in statement]), 2)
+
+    def test_generate_increments_generation_stamp(self):
+        create_tables(self.sqlite_db)
+        seed_all_distributions()
+        PortCallManager().add_large_scheduled_vehicle(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeeder",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=800,
+            average_moved_capacity=100,
+            next_destinations=None
+        )
+        generation_stamp = ContainerFlowGenerationPropertiesRepository.get_generation_stamp()
+
+        self.container_Flow_generator_service.generate(seed=1)
+
+        self.assertGreater(ContainerFlowGenerationPropertiesRepository.get_generation_stamp(), generation_stamp)
+
+    def test_defer_index_creation(self):
+        create_tables(self.sqlite_db)
+        seed_all_distributions()
+        port_call_manager = PortCallManager()
+        port_call_manager.add_large_scheduled_vehicle(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeeder",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=800,
+            average_moved_capacity=100,
+            next_destinations=None
+        )
+        self.container_Flow_generator_service.generate(seed=1)
+        container_flow_with_indexes = self._get_container_flow()
+
+        profile = self.container_Flow_generator_service.generate(seed=1, defer_index_creation=True)
+        self.assertIn("index_creation", profile.stages)
+        self.assertListEqual(self._get_container_flow(), container_flow_with_indexes)
+        index_names = {index_metadata.name for index_metadata in self.sqlite_db.get_indexes("container")}
+        self.assertIn("conflowgen_container_picked_up_by_large_scheduled_vehicle_length", index_names)
+
+    def _add_schedules_for_resuming(self) -> None:
+        create_tables(self.sqlite_db)
+        seed_all_distributions()
+        port_call_manager = PortCallManager()
+        for vehicle_type in (ModeOfTransport.feeder, ModeOfTransport.deep_sea_vessel, ModeOfTransport.train):
+            port_call_manager.add_large_scheduled_vehicle(
+                vehicle_type=vehicle_type,
+                service_name=f"Test {vehicle_type}",
+                vehicle_arrives_at=datetime.date(2021, 7, 9),
+                vehicle_arrives_at_time=datetime.time(11),
+                average_vehicle_capacity=300,
+                average_moved_capacity=100,
+                next_destinations=None
+            )
+
+    def test_resume_after_interrupted_stage(self):
+        self._add_schedules_for_resuming()
+        self.container_Flow_generator_service.generate(seed=3)
+        uninterrupted_container_flow = self._get_container_flow()
+
+        with unittest.mock.patch.object(
+                self.container_Flow_generator_service.allocate_space_for_containers_delivered_by_truck_service,
+                "allocate",
+                side_effect=KeyboardInterrupt
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self.container_Flow_generator_service.generate(seed=3)
+        self.assertEqual(Container.select().where(Container.delivered_by == ModeOfTransport.truck).count(), 0)
+
+        profile = self.container_Flow_generator_service.generate(resume=True)
+
+        self.assertNotIn("fleet_creation", profile.stages)
+        self.assertNotIn("onward_assignment", profile.stages)
+        self.assertIn("export_allocation", profile.stages)
+        self.assertListEqual(self._get_container_flow(), uninterrupted_container_flow)
+
+    def test_resume_within_onward_assignment(self):
+        self._add_schedules_for_resuming()
+        onward_transportation_manager = \
+            self.container_Flow_generator_service.large_scheduled_vehicle_for_onward_transportation_manager
+        onward_transportation_manager.number_containers_per_chunk = 20
+        self.container_Flow_generator_service.generate(seed=4)
+        uninterrupted_container_flow = self._get_container_flow()
+
+        assign_container = onward_transportation_manager._assign_container  # pylint: disable=protected-access
+        number_assigned_containers = 0
+
+        def assign_container_until_interruption(container):
+            nonlocal number_assigned_containers
+            number_assigned_containers += 1
+            if number_assigned_containers == 50:
+                raise KeyboardInterrupt
+            assign_container(container)
+
+        with unittest.mock.patch.object(
+                onward_transportation_manager, "_assign_container", side_effect=assign_container_until_interruption
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                self.container_Flow_generator_service.generate(seed=4)
+        self.assertEqual(
+            Container.select().where(
+                Container.picked_up_by_large_scheduled_vehicle.is_null(False) | Container.emergency_pickup
+            ).count(),
+            40,
+            "The assignments of the first two chunks have been written"
+        )
+
+        self.container_Flow_generator_service.generate(resume=True)
+
+        self.assertListEqual(self._get_container_flow(), uninterrupted_container_flow)
+
+    def test_resume_without_interrupted_generation(self):
+        self._add_schedules_for_resuming()
+        profile = self.container_Flow_generator_service.generate(seed=5, resume=True)
+        self.assertIn("fleet_creation", profile.stages)
+        self.assertGreater(Container.select().count(), 0)
+
+    def test_resume_after_finished_generation(self):
+        self._add_schedules_for_resuming()
+        self.container_Flow_generator_service.generate(seed=1)
+        PortCallManager().add_large_scheduled_vehicle(
+            vehicle_type=ModeOfTransport.barge,
+            service_name="Test barge",
+            vehicle_arrives_at=datetime.date(2021, 7, 10),
+            vehicle_arrives_at_time=datetime.time(9),
+            average_vehicle_capacity=100,
+            average_moved_capacity=50,
+            next_destinations=None
+        )
+
+        profile = self.container_Flow_generator_service.generate(seed=2, resume=True)
+
+        self.assertIn("fleet_creation", profile.stages)
+        self.assertGreater(
+            Container.select().where(Container.delivered_by == ModeOfTransport.barge).count(), 0,
+            "A new generation has been started"
+        )
+
+    def _assert_container_flow_is_complete(self) -> None:
+        self.assertEqual(Container.select().where(
+            (Container.picked_up_by == ModeOfTransport.truck) & Container.picked_up_by_truck.is_null()
+        ).count(), 0)
+        self.assertEqual(Container.select().where(
+            (Container.delivered_by == ModeOfTransport.truck) & Container.delivered_by_truck.is_null()
+        ).count(), 0)
+        self.assertEqual(Container.select().where(
+            (Container.picked_up_by << ModeOfTransport.get_scheduled_vehicles())
+            & Container.picked_up_by_large_scheduled_vehicle.is_null()
+        ).count(), 0)
+        self.assertEqual(
+            Truck.select().count(),
+            Container.select().where(
+                Container.delivered_by_truck.is_null(False) | Container.picked_up_by_truck.is_null(False)
+            ).count(),
+            "Each truck delivers or picks up exactly one container"
+        )
+
+    def test_incremental_generation_of_changed_schedules(self):
+        self._add_schedules_for_resuming()
+        self.container_Flow_generator_service.generate(seed=6)
+        train_schedule = Schedule.get(Schedule.vehicle_type == ModeOfTransport.train)
+        ids_of_containers_of_unchanged_schedules = [
+            container.id for container in Container.select().join(
+                LargeScheduledVehicle, on=Container.delivered_by_large_scheduled_vehicle
+            ).where(
+                LargeScheduledVehicle.schedule != train_schedule
+            )
+        ]
+
+        train_schedule.average_moved_capacity = 50
+        train_schedule.save()
+        PortCallManager().add_large_scheduled_vehicle(
+            vehicle_type=ModeOfTransport.barge,
+            service_name="Test barge",
+            vehicle_arrives_at=datetime.date(2021, 7, 10),
+            vehicle_arrives_at_time=datetime.time(9),
+            average_vehicle_capacity=100,
+            average_moved_capacity=50,
+            next_destinations=None
+        )
+        self.container_Flow_generator_service.generate(incremental=True)
+
+        self.assertEqual(
+            Container.select().where(Container.id << ids_of_containers_of_unchanged_schedules).count(),
+            len(ids_of_containers_of_unchanged_schedules),
+            "The containers delivered by the vehicles of unchanged schedules are kept"
+        )
+        for schedule in Schedule.select():
+            with self.subTest(schedule=schedule.service_name):
+                self.assertGreater(Container.select().join(
+                    LargeScheduledVehicle, on=Container.delivered_by_large_scheduled_vehicle
+                ).where(
+                    LargeScheduledVehicle.schedule == schedule
+                ).count(), 0)
+        self._assert_container_flow_is_complete()
+        self.assertListEqual(self.sqlite_db.execute_sql("PRAGMA foreign_key_check").fetchall(), [])
+
+    def test_incremental_generation_without_changes(self):
+        self._add_schedules_for_resuming()
+        self.container_Flow_generator_service.generate(seed=6)
+        container_flow = self._get_container_flow()
+
+        profile = self.container_Flow_generator_service.generate(incremental=True)
+
+        self.assertDictEqual(profile.stages, {})
+        self.assertListEqual(self._get_container_flow(), container_flow)
+
+    def test_incremental_generation_after_changed_properties(self):
+        self._add_schedules_for_resuming()
+        self.container_Flow_generator_service.generate(seed=6)
+        properties_repository = ContainerFlowGenerationPropertiesRepository()
+        properties = properties_repository.get_container_flow_generation_properties()
+        properties.transportation_buffer = 0.1
+        properties_repository.set_container_flow_generation_properties(properties)
+
+        profile = self.container_Flow_generator_service.generate(seed=6, incremental=True)
+        container_flow_of_incremental_generation = self._get_container_flow()
+
+        self.assertIn("fleet_creation", profile.stages)
+        self.container_Flow_generator_service.generate(seed=6)
+        self.assertListEqual(
+            container_flow_of_incremental_generation, self._get_container_flow(),
+            "The whole container flow has been generated again"
+        )
+
+    def test_fingerprints_are_kept_if_all_stages_are_skipped(self):
+        self._add_schedules_for_resuming()
+        with unittest.mock.patch.object(
+                self.container_Flow_generator_service.container_flow_generation_checkpoint_repository,
+                "is_stage_finished",
+                return_value=True
+        ), unittest.mock.patch.object(self.container_Flow_generator_service, "_log_report"):
+            self.container_Flow_generator_service.generate(seed=6)
+        self.assertEqual(ContainerFlowGenerationFingerprint.select().count(), 0)
+
+    def test_incremental_generation_cannot_be_resumed(self):
+        with self.assertRaises(ValueError):
+            self.container_Flow_generator_service.generate(resume=True, incremental=True)
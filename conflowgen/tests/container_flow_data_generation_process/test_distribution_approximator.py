@@ -5,6 +5,8 @@ Check if distributions are approximated.
 import collections
 import unittest
 
+import numpy as np
+
 from conflowgen.tools.distribution_approximator import DistributionApproximator, SamplerExhaustedException
 
 
@@ -84,3 +86,48 @@ class TestDistributionApproximator(unittest.TestCase):
         self.assertGreaterEqual(counted_samples["a"], 1)
         self.assertGreaterEqual(counted_samples["b"], 1)
         self.assertEqual(counted_samples["a"] + counted_samples["b"], 3)
+
+    def test_sample_many(self) -> None:
+        """Check if drawing all elements at once reaches the target distribution as well."""
+        da = DistributionApproximator({
+            "a": 4,
+            "b": 2,
+            "c": 10
+        })
+        first_samples = da.sample_many(6)
+        second_samples = da.sample_many(10)
+        counted_samples = collections.Counter(list(first_samples) + list(second_samples))
+
+        self.assertDictEqual(counted_samples, {
+            "a": 4,
+            "b": 2,
+            "c": 10
+        })
+        with self.assertRaises(SamplerExhaustedException):
+            da.sample()
+
+    def test_sample_many_after_sample(self) -> None:
+        """Check if both ways of sampling can be mixed."""
+        da = DistributionApproximator({
+            "a": 1,
+            "b": 3
+        }, random_number_generator=np.random.default_rng(42))
+        all_samples = [da.sample()] + list(da.sample_many(3))
+        counted_samples = collections.Counter(all_samples)
+
+        self.assertDictEqual(counted_samples, {
+            "a": 1,
+            "b": 3
+        })
+        with self.assertRaises(SamplerExhaustedException):
+            da.sample_many(1)
+
+    def test_same_seed_leads_to_same_samples(self) -> None:
+        samples = []
+        for _ in range(2):
+            da = DistributionApproximator.from_distribution({
+                "a": 0.3,
+                "b": 0.7
+            }, 101, random_number_generator=np.random.default_rng(1))
+            samples.append(list(da.sample_many(101)))
+        self.assertListEqual(samples[0], samples[1])
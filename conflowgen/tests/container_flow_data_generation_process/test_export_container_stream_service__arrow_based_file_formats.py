@@ -0,0 +1,129 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import pyarrow as pa
+import pyarrow.feather
+import pyarrow.parquet
+
+from conflowgen.application_models.data_types.export_file_format import ExportFileFormat
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck, Feeder
+from conflowgen.container_flow_data_generation_process.export_container_flow_service import \
+    ExportContainerFlowService
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestExportContainerFlowService__ArrowBasedFileFormats(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule,
+            Container,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
+            LargeScheduledVehicle,
+            Feeder,
+            Destination
+        ])
+        self.service = ExportContainerFlowService()
+        self.temporary_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temporary_directory.cleanup)
+
+    def _create_containers(self) -> None:
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 8, 2),
+            vehicle_arrives_at_time=datetime.time(10, 0),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300,
+            vehicle_arrives_every_k_days=-1
+        )
+        destination = Destination.create(
+            belongs_to_schedule=schedule,
+            sequence_id=1,
+            destination_name="TestDestination1",
+            fraction=0.4
+        )
+        for i in range(5):
+            Container.create(
+                weight=20 + i,
+                delivered_by=ModeOfTransport.truck,
+                picked_up_by=ModeOfTransport.feeder,
+                picked_up_by_initial=ModeOfTransport.feeder,
+                length=ContainerLength.forty_feet if i % 2 else ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                destination=destination if i % 2 else None
+            )
+
+    def _save(self, model, index_column: str, file_format: ExportFileFormat) -> pa.Table:
+        path_to_file = os.path.join(self.temporary_directory.name, "table." + file_format.value)
+        self.service._save_table_as_arrow_based_file_format(model, index_column, path_to_file, file_format)
+        if file_format == ExportFileFormat.parquet:
+            return pyarrow.parquet.read_table(path_to_file)
+        return pyarrow.feather.read_table(path_to_file)
+
+    def test_save_container_table_in_several_batches(self):
+        self._create_containers()
+        number_rows_per_batch = ExportContainerFlowService.number_rows_per_batch
+        ExportContainerFlowService.number_rows_per_batch = 2
+        self.addCleanup(setattr, ExportContainerFlowService, "number_rows_per_batch", number_rows_per_batch)
+        df_container = self.service._convert_table_to_pandas_dataframe(Container)
+
+        for file_format in (ExportFileFormat.parquet, ExportFileFormat.feather):
+            with self.subTest(file_format=file_format):
+                table = self._save(Container, "id", file_format)
+                self.assertEqual(table.column_names[0], "id")
+                self.assertSetEqual(set(table.column_names[1:]), set(df_container.columns))
+                if file_format == ExportFileFormat.feather:
+                    # Parquet restores only dictionaries of strings, integers are dictionary-encoded within the file
+                    self.assertEqual(table.schema.field("length").type, pa.dictionary(pa.int8(), pa.int64()))
+                self.assertEqual(table.schema.field("delivered_by").type, pa.dictionary(pa.int8(), pa.string()))
+                df_table = table.to_pandas().set_index("id")
+                self.assertListEqual(list(df_table["weight"]), list(df_container["weight"]))
+                self.assertListEqual(list(df_table["length"]), list(df_container["length"]))
+                self.assertListEqual(list(df_table["picked_up_by"]), list(df_container["picked_up_by"]))
+                self.assertListEqual(
+                    table.column("destination_name").to_pylist(),
+                    [None, "TestDestination1", None, "TestDestination1", None]
+                )
+
+    def test_save_truck_table_with_timestamps(self):
+        pickup_time = datetime.datetime(2021, 8, 2, 10, 30)
+        Truck.create(
+            delivers_container=False,
+            picks_up_container=True,
+            truck_arrival_information_for_pickup=TruckArrivalInformationForPickup.create(
+                realized_container_pickup_time=pickup_time
+            )
+        )
+        for file_format in (ExportFileFormat.parquet, ExportFileFormat.feather):
+            with self.subTest(file_format=file_format):
+                table = self._save(Truck, "id", file_format)
+                self.assertNotIn("truck_arrival_information_for_pickup", table.column_names)
+                self.assertEqual(table.schema.field("realized_container_pickup_time").type, pa.timestamp("us"))
+                self.assertListEqual(table.column("realized_container_pickup_time").to_pylist(), [pickup_time])
+                self.assertListEqual(table.column("realized_container_delivery_time").to_pylist(), [None])
+
+    def test_save_empty_feeder_table(self):
+        for file_format in (ExportFileFormat.parquet, ExportFileFormat.feather):
+            with self.subTest(file_format=file_format):
+                table = self._save(Feeder, "large_scheduled_vehicle", file_format)
+                self.assertEqual(table.num_rows, 0)
+                self.assertEqual(table.column_names[0], "large_scheduled_vehicle")
+                self.assertNotIn("id", table.column_names)
+                self.assertIn("scheduled_arrival", table.column_names)
+
+    def test_reject_file_format_not_based_on_apache_arrow(self):
+        with self.assertRaises(ValueError):
+            self._save(Container, "id", ExportFileFormat.csv)
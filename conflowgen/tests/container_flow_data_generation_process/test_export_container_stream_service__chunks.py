@@ -0,0 +1,130 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck, Feeder
+from conflowgen.container_flow_data_generation_process.export_container_flow_service import \
+    ExportContainerFlowService
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestExportContainerFlowService__Chunks(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule,
+            Container,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
+            LargeScheduledVehicle,
+            Feeder,
+            Destination
+        ])
+        self.service = ExportContainerFlowService()
+        self.temporary_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temporary_directory.cleanup)
+        number_rows_per_batch = ExportContainerFlowService.number_rows_per_batch
+        ExportContainerFlowService.number_rows_per_batch = 2
+        self.addCleanup(setattr, ExportContainerFlowService, "number_rows_per_batch", number_rows_per_batch)
+
+    def _create_trucks(self) -> None:
+        # The first trucks only pick up containers, so these columns come first when all rows are converted at once
+        for hour in range(3):
+            Truck.create(
+                delivers_container=False,
+                picks_up_container=True,
+                truck_arrival_information_for_pickup=TruckArrivalInformationForPickup.create(
+                    realized_container_pickup_time=datetime.datetime(2021, 8, 2, 10 + hour, 30, 0, 250000)
+                )
+            )
+        # Only in a later chunk, the timestamps need more fractional digits or are not at midnight
+        for day in range(3):
+            delivery_time = datetime.datetime(2021, 8, 3 + day)
+            Truck.create(
+                delivers_container=True,
+                picks_up_container=False,
+                truck_arrival_information_for_delivery=TruckArrivalInformationForDelivery.create(
+                    planned_container_delivery_time_at_window_start=delivery_time,
+                    realized_container_delivery_time=delivery_time + datetime.timedelta(microseconds=day)
+                )
+            )
+        Truck.create(
+            delivers_container=False,
+            picks_up_container=True,
+            truck_arrival_information_for_pickup=TruckArrivalInformationForPickup.create(
+                realized_container_pickup_time=datetime.datetime(2021, 8, 2, 10, 30, 0, 123456)
+            )
+        )
+
+    @staticmethod
+    def _create_containers() -> None:
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 8, 2),
+            vehicle_arrives_at_time=datetime.time(10, 0),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300,
+            vehicle_arrives_every_k_days=-1
+        )
+        destination = Destination.create(
+            belongs_to_schedule=schedule,
+            sequence_id=1,
+            destination_name="TestDestination1",
+            fraction=0.4
+        )
+        for i in range(5):
+            Container.create(
+                weight=20 + i,
+                delivered_by=ModeOfTransport.truck,
+                picked_up_by=ModeOfTransport.feeder,
+                picked_up_by_initial=ModeOfTransport.feeder,
+                length=ContainerLength.forty_feet if i % 2 else ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                destination=destination if i == 3 else None
+            )
+
+    def _save_as_csv(self, model, index_column: str) -> str:
+        path_to_file = os.path.join(self.temporary_directory.name, "table.csv")
+        self.service._save_as_csv(model, index_column, path_to_file)
+        with open(path_to_file, encoding="utf-8") as file:
+            return file.read()
+
+    def _convert_at_once_to_csv(self, model, index_column: str) -> str:
+        return self.service._convert_table_to_pandas_dataframe(model, index_column).to_csv()
+
+    def test_save_truck_table_as_csv_in_several_chunks(self):
+        self._create_trucks()
+        self.assertEqual(self._save_as_csv(Truck, "id"), self._convert_at_once_to_csv(Truck, "id"))
+
+    def test_save_container_table_as_csv_in_several_chunks(self):
+        self._create_containers()
+        self.assertEqual(self._save_as_csv(Container, "id"), self._convert_at_once_to_csv(Container, "id"))
+
+    def test_save_empty_feeder_table_as_csv(self):
+        self.assertEqual(
+            self._save_as_csv(Feeder, "large_scheduled_vehicle"),
+            self._convert_at_once_to_csv(Feeder, "large_scheduled_vehicle")
+        )
+
+    def test_save_truck_table_as_xlsx_in_several_chunks(self):
+        self._create_trucks()
+        path_to_file = os.path.join(self.temporary_directory.name, "table.xlsx")
+        path_to_file_written_at_once = os.path.join(self.temporary_directory.name, "table_at_once.xlsx")
+
+        self.service._save_as_xlsx(Truck, "id", path_to_file)
+        self.service._convert_table_to_pandas_dataframe(Truck, "id").to_excel(path_to_file_written_at_once)
+
+        pd.testing.assert_frame_equal(pd.read_excel(path_to_file), pd.read_excel(path_to_file_written_at_once))
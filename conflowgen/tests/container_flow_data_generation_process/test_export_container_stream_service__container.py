@@ -1,6 +1,10 @@
 import datetime
 import unittest
 
+import pandas as pd
+
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
@@ -191,3 +195,42 @@ class TestExportContainerFlowService__Container(unittest.TestCase):
             container_df_entry.destination_sequence_id,
             1
         )
+
+    def test_convert_truck_table_to_pandas_dataframe(self):
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup
+        ])
+        pickup_time = datetime.datetime(2021, 8, 2, 10, 30)
+        delivery_time = datetime.datetime(2021, 8, 3, 11, 45)
+        Truck.create(
+            delivers_container=False,
+            picks_up_container=True,
+            truck_arrival_information_for_pickup=TruckArrivalInformationForPickup.create(
+                realized_container_pickup_time=pickup_time
+            )
+        )
+        Truck.create(
+            delivers_container=True,
+            picks_up_container=False,
+            truck_arrival_information_for_delivery=TruckArrivalInformationForDelivery.create(
+                planned_container_delivery_time_at_window_start=delivery_time,
+                realized_container_delivery_time=delivery_time
+            )
+        )
+        df_truck = self.service._convert_table_to_pandas_dataframe(Truck)
+        self.assertEqual(len(df_truck), 2)
+        self.assertListEqual(
+            list(df_truck.columns),
+            [
+                "delivers_container", "picks_up_container", "planned_container_pickup_time_prior_berthing",
+                "planned_container_pickup_time_after_initial_storage", "realized_container_pickup_time",
+                "planned_container_delivery_time_at_window_start", "realized_container_delivery_time"
+            ]
+        )
+        self.assertEqual(df_truck.loc[1, "realized_container_pickup_time"], pickup_time)
+        self.assertTrue(pd.isna(df_truck.loc[1, "realized_container_delivery_time"]))
+        self.assertEqual(df_truck.loc[2, "realized_container_delivery_time"], delivery_time)
+        self.assertTrue(pd.isna(df_truck.loc[2, "realized_container_pickup_time"]))
@@ -0,0 +1,60 @@
+import datetime
+import unittest
+
+import numpy as np
+
+from conflowgen.container_flow_data_generation_process.large_scheduled_vehicle_creation_service import \
+    LargeScheduledVehicleCreationService
+from conflowgen.database_connection.create_tables import create_tables
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.distribution_seeders.seed_database import seed_all_distributions
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestLargeScheduledVehicleCreationService(unittest.TestCase):
+
+    def _create_containers(self, number_processes) -> list:
+        sqlite_db = setup_sqlite_in_memory_db()
+        create_tables(sqlite_db)
+        seed_all_distributions()
+        for vehicle_type, service_name in (
+                (ModeOfTransport.feeder, "TestFeeder"),
+                (ModeOfTransport.deep_sea_vessel, "TestDeepSeaVessel"),
+                (ModeOfTransport.train, "TestTrain")
+        ):
+            Schedule.create(
+                vehicle_type=vehicle_type,
+                service_name=service_name,
+                vehicle_arrives_at=datetime.date(2021, 7, 9),
+                vehicle_arrives_at_time=datetime.time(11),
+                average_vehicle_capacity=300,
+                average_moved_capacity=150
+            )
+        service = LargeScheduledVehicleCreationService()
+        service.reload_properties(
+            container_flow_start_date=datetime.date(2021, 7, 1),
+            container_flow_end_date=datetime.date(2021, 7, 31)
+        )
+        service.seed_sequence = np.random.SeedSequence(2021)
+        service.create(number_processes=number_processes)
+        return list(
+            Container.select(
+                Container.id, Container.weight, Container.length, Container.storage_requirement,
+                Container.delivered_by, Container.picked_up_by, Container.delivered_by_large_scheduled_vehicle
+            ).order_by(Container.id).tuples()
+        )
+
+    def test_create(self) -> None:
+        containers = self._create_containers(number_processes=None)
+        self.assertGreater(len(containers), 0)
+        self.assertSetEqual(
+            {container[4] for container in containers},
+            {ModeOfTransport.feeder, ModeOfTransport.deep_sea_vessel, ModeOfTransport.train}
+        )
+
+    def test_create_in_several_processes_leads_to_same_containers(self) -> None:
+        containers_created_in_one_process = self._create_containers(number_processes=1)
+        containers_created_in_several_processes = self._create_containers(number_processes=2)
+        self.assertListEqual(containers_created_in_one_process, containers_created_in_several_processes)
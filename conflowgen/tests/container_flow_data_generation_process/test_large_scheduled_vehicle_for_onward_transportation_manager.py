@@ -1,6 +1,8 @@
 import datetime
+import random
 import unittest
 
+from conflowgen.database_connection.sql_tracer import SqlTracer
 from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
     TruckArrivalInformationForPickup
 from conflowgen.domain_models.container import Container
@@ -13,7 +15,7 @@ from conflowgen.domain_models.large_vehicle_schedule import Schedule, Destinatio
 from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Train, Barge, Feeder, DeepSeaVessel, Truck, \
     AbstractLargeScheduledVehicle
 from conflowgen.container_flow_data_generation_process.large_scheduled_vehicle_for_onward_transportation_manager \
-    import LargeScheduledVehicleForOnwardTransportationManager
+    import LargeScheduledVehicleForOnwardTransportationManager, ContainerForOnwardTransportation
 from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
 
 
@@ -284,3 +286,118 @@ class TestLargeScheduledVehicleForExportContainersManager(unittest.TestCase):
             self.assertEqual(container.picked_up_by_large_scheduled_vehicle, feeder.large_scheduled_vehicle)
             teu_loaded += ContainerLength.get_factor(container.length)
         self.assertLessEqual(teu_loaded, 80, "Feeder must not be loaded with more than what it can carry")
+
+    def test_write_assignments_in_bulk(self):
+        train = self._create_train(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        for _ in range(train.large_scheduled_vehicle.moved_capacity):  # here only 20' containers
+            self._create_container_for_large_scheduled_vehicle(train)
+
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        feeder.large_scheduled_vehicle.moved_capacity = 80  # in TEU
+        feeder.large_scheduled_vehicle.save()
+
+        with SqlTracer() as sql_tracer:
+            self.manager.choose_departing_vehicle_for_containers()
+
+        number_update_statements = sum(
+            statistics.number_executions for statistics in sql_tracer.get_statistics()
+            if statistics.shape.startswith("UPDATE")
+        )
+        self.assertLessEqual(number_update_statements, 4, "Each kind of change is written with a single statement")
+
+        self.assertEqual(self.manager.number_assigned_containers, 80)
+        self.assertEqual(
+            Container.select().where(
+                Container.picked_up_by_large_scheduled_vehicle == feeder.large_scheduled_vehicle
+            ).count(),
+            80
+        )
+        containers_with_emergency_pickup = Container.select().where(Container.emergency_pickup)
+        self.assertEqual(containers_with_emergency_pickup.count(), 10)
+        for container in containers_with_emergency_pickup:
+            self.assertEqual(container.picked_up_by, ModeOfTransport.truck)
+        feeder_lsv_reloaded = LargeScheduledVehicle.get_by_id(feeder.large_scheduled_vehicle.id)
+        self.assertTrue(feeder_lsv_reloaded.capacity_exhausted_while_determining_onward_transportation)
+
+    def test_load_containers_with_their_arrival(self):
+        truck_arrival = datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0)
+        train_arrival = datetime.datetime(year=2021, month=8, day=6, hour=10, minute=30)
+        truck = self._create_truck(truck_arrival)
+        train = self._create_train(train_arrival)
+        container_delivered_by_truck = self._create_container_for_truck(truck)
+        container_delivered_by_train = self._create_container_for_large_scheduled_vehicle(train)
+
+        # noinspection PyProtectedMember
+        containers = self.manager._load_containers_picked_up_by_scheduled_vehicles(
+            [container_delivered_by_train.id, container_delivered_by_truck.id]
+        )
+
+        self.assertListEqual(containers, [
+            ContainerForOnwardTransportation(
+                id=container_delivered_by_train.id,
+                length=ContainerLength.twenty_feet,
+                delivered_by=ModeOfTransport.train,
+                picked_up_by=ModeOfTransport.feeder,
+                arrival=train_arrival
+            ),
+            ContainerForOnwardTransportation(
+                id=container_delivered_by_truck.id,
+                length=ContainerLength.twenty_feet,
+                delivered_by=ModeOfTransport.truck,
+                picked_up_by=ModeOfTransport.feeder,
+                arrival=truck_arrival
+            )
+        ])
+
+    def test_no_query_per_container(self):
+        truck = self._create_truck(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        train = self._create_train(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        for _ in range(20):
+            self._create_container_for_truck(truck)
+            self._create_container_for_large_scheduled_vehicle(train)
+        self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+
+        with SqlTracer() as sql_tracer:
+            self.manager.choose_departing_vehicle_for_containers()
+
+        self.assertListEqual(sql_tracer.get_repeatedly_selected_shapes(minimum_number_executions=10), [])
+
+    def test_assign_containers_in_several_chunks(self):
+        train = self._create_train(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        for _ in range(train.large_scheduled_vehicle.moved_capacity):  # here only 20' containers
+            self._create_container_for_large_scheduled_vehicle(train)
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        feeder.large_scheduled_vehicle.moved_capacity = 80  # in TEU
+        feeder.large_scheduled_vehicle.save()
+
+        self.manager.number_containers_per_chunk = 7
+        self.manager.choose_departing_vehicle_for_containers()
+
+        self.assertEqual(
+            Container.select().where(
+                Container.picked_up_by_large_scheduled_vehicle == feeder.large_scheduled_vehicle
+            ).count(),
+            80
+        )
+        self.assertEqual(Container.select().where(Container.emergency_pickup).count(), 10)
+
+    def test_assignment_is_reproducible(self):
+        train = self._create_train(datetime.datetime(year=2021, month=8, day=5, hour=9, minute=0))
+        for _ in range(train.large_scheduled_vehicle.moved_capacity):  # here only 20' containers
+            self._create_container_for_large_scheduled_vehicle(train)
+        feeder = self._create_feeder(datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15))
+        feeder.large_scheduled_vehicle.moved_capacity = 80  # in TEU
+        feeder.large_scheduled_vehicle.save()
+
+        assignments = []
+        for _ in range(2):
+            Container.update(
+                picked_up_by=ModeOfTransport.feeder, picked_up_by_large_scheduled_vehicle=None, emergency_pickup=False
+            ).execute()  # pylint: disable=no-value-for-parameter
+            self.manager.random_number_generator = random.Random(1)
+            self.manager.choose_departing_vehicle_for_containers()
+            assignments.append(list(Container.select(
+                Container.id, Container.picked_up_by_large_scheduled_vehicle, Container.emergency_pickup
+            ).order_by(Container.id).tuples()))
+
+        self.assertListEqual(assignments[0], assignments[1])
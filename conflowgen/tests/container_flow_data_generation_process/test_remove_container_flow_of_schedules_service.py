@@ -0,0 +1,94 @@
+import datetime
+import unittest
+
+from conflowgen import PortCallManager
+from conflowgen.application_models.repositories.container_flow_generation_properties_repository import \
+    ContainerFlowGenerationPropertiesRepository
+from conflowgen.container_flow_data_generation_process.container_flow_generation_service import \
+    ContainerFlowGenerationService
+from conflowgen.container_flow_data_generation_process.remove_container_flow_of_schedules_service import \
+    RemoveContainerFlowOfSchedulesService
+from conflowgen.database_connection.create_tables import create_tables
+from conflowgen.database_connection.sql_tracer import SqlTracer
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.distribution_seeders.seed_database import seed_all_distributions
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestRemoveContainerFlowOfSchedulesService(unittest.TestCase):
+
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        create_tables(self.sqlite_db)
+        seed_all_distributions()
+        properties_repository = ContainerFlowGenerationPropertiesRepository()
+        properties = properties_repository.get_container_flow_generation_properties()
+        properties.start_date = datetime.date(2021, 7, 1)
+        properties.end_date = datetime.date(2021, 7, 31)
+        properties_repository.set_container_flow_generation_properties(properties)
+        port_call_manager = PortCallManager()
+        for vehicle_type in (ModeOfTransport.feeder, ModeOfTransport.deep_sea_vessel):
+            port_call_manager.add_large_scheduled_vehicle(
+                vehicle_type=vehicle_type,
+                service_name=f"Test {vehicle_type}",
+                vehicle_arrives_at=datetime.date(2021, 7, 9),
+                vehicle_arrives_at_time=datetime.time(11),
+                average_vehicle_capacity=300,
+                average_moved_capacity=100,
+                next_destinations=None
+            )
+        ContainerFlowGenerationService().generate(seed=1)
+        self.service = RemoveContainerFlowOfSchedulesService()
+
+    def test_remove_container_flow_of_schedule(self):
+        feeder_schedule = Schedule.get(Schedule.vehicle_type == ModeOfTransport.feeder)
+        feeder_ids = [vehicle.id for vehicle in LargeScheduledVehicle.select().where(
+            LargeScheduledVehicle.schedule == feeder_schedule
+        )]
+
+        self.service.remove([feeder_schedule.id])
+
+        self.assertEqual(LargeScheduledVehicle.select().where(
+            LargeScheduledVehicle.schedule == feeder_schedule
+        ).count(), 0)
+        self.assertEqual(Container.select().where(
+            (Container.delivered_by_large_scheduled_vehicle << feeder_ids)
+            | (Container.picked_up_by_large_scheduled_vehicle << feeder_ids)
+        ).count(), 0)
+        self.assertListEqual(self.sqlite_db.execute_sql("PRAGMA foreign_key_check").fetchall(), [])
+
+    def test_only_affected_containers_are_loaded(self):
+        feeder_schedule = Schedule.get(Schedule.vehicle_type == ModeOfTransport.feeder)
+        with SqlTracer(database=self.sqlite_db) as sql_tracer:
+            self.service.remove([feeder_schedule.id])
+        selected_shapes_of_container_table = [
+            shape_statistics.shape for shape_statistics in sql_tracer.get_statistics()
+            if shape_statistics.shape.startswith("SELECT") and 'FROM "container"' in shape_statistics.shape
+        ]
+        self.assertGreater(len(selected_shapes_of_container_table), 0)
+        for shape in selected_shapes_of_container_table:
+            with self.subTest(shape=shape):
+                self.assertIn("WHERE", shape)
+
+    def test_reset_flag_of_vehicles_with_freed_capacity(self):
+        feeder_schedule = Schedule.get(Schedule.vehicle_type == ModeOfTransport.feeder)
+        container_loaded_on_kept_vehicle = Container.select().join(
+            LargeScheduledVehicle, on=Container.delivered_by_large_scheduled_vehicle
+        ).where(
+            (LargeScheduledVehicle.schedule == feeder_schedule)
+            & Container.picked_up_by_large_scheduled_vehicle.is_null(False)
+        ).first()
+        kept_vehicle = container_loaded_on_kept_vehicle.picked_up_by_large_scheduled_vehicle
+        self.assertNotEqual(kept_vehicle.schedule_id, feeder_schedule.id)
+        kept_vehicle.capacity_exhausted_while_determining_onward_transportation = True
+        kept_vehicle.save()
+
+        self.service.remove([feeder_schedule.id])
+
+        self.assertIsNone(Container.get_or_none(Container.id == container_loaded_on_kept_vehicle.id))
+        kept_vehicle = LargeScheduledVehicle.get_by_id(kept_vehicle.id)
+        self.assertFalse(kept_vehicle.capacity_exhausted_while_determining_onward_transportation)
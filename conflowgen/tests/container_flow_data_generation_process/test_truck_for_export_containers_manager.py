@@ -5,7 +5,15 @@ from collections import Counter
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
 from conflowgen.domain_models.distribution_models.truck_arrival_distribution import TruckArrivalDistribution
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
 from conflowgen.domain_models.distribution_seeders import truck_arrival_distribution_seeder
 from conflowgen.container_flow_data_generation_process.truck_for_export_containers_manager import \
     TruckForExportContainersManager
@@ -18,7 +26,14 @@ class TestTruckForExportContainersManager(unittest.TestCase):
         """Create container database in memory"""
         sqlite_db = setup_sqlite_in_memory_db()
         sqlite_db.create_tables([
-            TruckArrivalDistribution
+            TruckArrivalDistribution,
+            Container,
+            Schedule,
+            LargeScheduledVehicle,
+            Destination,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup
         ])
         truck_arrival_distribution_seeder.seed()
 
@@ -121,3 +136,47 @@ class TestTruckForExportContainersManager(unittest.TestCase):
         if self.debug:
             sns.kdeplot(delivery_times, bw=0.01)
             plt.show(block=True)
+
+    def test_generate_trucks_for_delivering(self):
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestService",
+            vehicle_arrives_at=datetime.date(year=2021, month=8, day=7),
+            vehicle_arrives_at_time=datetime.time(hour=13, minute=15),
+            average_vehicle_capacity=90,
+            average_moved_capacity=90,
+        )
+        scheduled_arrival = datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15)
+        feeder_lsv = LargeScheduledVehicle.create(
+            capacity_in_teu=90,
+            moved_capacity=90,
+            scheduled_arrival=scheduled_arrival,
+            schedule=schedule
+        )
+        for delivered_by in (ModeOfTransport.truck, ModeOfTransport.truck, ModeOfTransport.train):
+            Container.create(
+                weight=20,
+                length=ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=delivered_by,
+                picked_up_by=ModeOfTransport.feeder,
+                picked_up_by_initial=ModeOfTransport.feeder,
+                picked_up_by_large_scheduled_vehicle=feeder_lsv
+            )
+
+        self.manager.generate_trucks_for_delivering()
+
+        self.assertEqual(Truck.select().count(), 2)
+        for container in Container.select():
+            if container.delivered_by != ModeOfTransport.truck:
+                self.assertIsNone(container.delivered_by_truck)
+                continue
+            truck: Truck = container.delivered_by_truck
+            self.assertTrue(truck.delivers_container)
+            self.assertFalse(truck.picks_up_container)
+            delivery_time = truck.truck_arrival_information_for_delivery.realized_container_delivery_time
+            self.assertLessEqual(delivery_time, scheduled_arrival)
+            self.assertEqual(
+                delivery_time,
+                truck.truck_arrival_information_for_delivery.planned_container_delivery_time_at_window_start
+            )
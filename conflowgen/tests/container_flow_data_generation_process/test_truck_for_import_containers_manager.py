@@ -5,7 +5,15 @@ from collections import Counter
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
 from conflowgen.domain_models.distribution_models.truck_arrival_distribution import TruckArrivalDistribution
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
 from conflowgen.domain_models.distribution_seeders import truck_arrival_distribution_seeder
 from conflowgen.container_flow_data_generation_process.truck_for_import_containers_manager import \
     TruckForImportContainersManager
@@ -18,7 +26,14 @@ class TestTruckForImportContainersManager(unittest.TestCase):
         """Create container database in memory"""
         sqlite_db = setup_sqlite_in_memory_db()
         sqlite_db.create_tables([
-            TruckArrivalDistribution
+            TruckArrivalDistribution,
+            Container,
+            Schedule,
+            LargeScheduledVehicle,
+            Destination,
+            Truck,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup
         ])
         truck_arrival_distribution_seeder.seed()
 
@@ -109,3 +124,51 @@ class TestTruckForImportContainersManager(unittest.TestCase):
         if self.debug:
             sns.kdeplot(pickup_times, bw=0.01)
             plt.show(block=True)
+
+    def test_generate_trucks_for_picking_up(self):
+        manager = TruckForImportContainersManager()
+        manager.reload_distribution(
+            minimum_dwell_time_in_hours=3,
+            maximum_dwell_time_in_hours=(5 * 24)
+        )
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestService",
+            vehicle_arrives_at=datetime.date(year=2021, month=8, day=7),
+            vehicle_arrives_at_time=datetime.time(hour=13, minute=15),
+            average_vehicle_capacity=90,
+            average_moved_capacity=90,
+        )
+        scheduled_arrival = datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15)
+        feeder_lsv = LargeScheduledVehicle.create(
+            capacity_in_teu=90,
+            moved_capacity=90,
+            scheduled_arrival=scheduled_arrival,
+            schedule=schedule
+        )
+        for picked_up_by in (ModeOfTransport.truck, ModeOfTransport.truck, ModeOfTransport.train):
+            Container.create(
+                weight=20,
+                length=ContainerLength.twenty_feet,
+                storage_requirement=StorageRequirement.standard,
+                delivered_by=ModeOfTransport.feeder,
+                delivered_by_large_scheduled_vehicle=feeder_lsv,
+                picked_up_by=picked_up_by,
+                picked_up_by_initial=picked_up_by
+            )
+
+        manager.generate_trucks_for_picking_up()
+
+        self.assertEqual(Truck.select().count(), 2)
+        for container in Container.select():
+            if container.picked_up_by != ModeOfTransport.truck:
+                self.assertIsNone(container.picked_up_by_truck)
+                continue
+            truck: Truck = container.picked_up_by_truck
+            self.assertTrue(truck.picks_up_container)
+            self.assertFalse(truck.delivers_container)
+            pickup_time = truck.truck_arrival_information_for_pickup.realized_container_pickup_time
+            self.assertGreaterEqual(pickup_time, scheduled_arrival + datetime.timedelta(hours=3))
+            self.assertLessEqual(pickup_time, scheduled_arrival + datetime.timedelta(hours=(5 * 24)))
+        self.assertEqual(len({container.picked_up_by_truck_id for container in Container.select().where(
+            Container.picked_up_by == ModeOfTransport.truck)}), 2, "Each container is picked up by its own truck")
@@ -0,0 +1,64 @@
+import datetime
+import unittest
+
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.preview.scheduled_vehicle_capacity_engine import ScheduledVehicleCapacityEngine
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
+
+
+class TestScheduledVehicleCapacityEngine(unittest.TestCase):
+    def setUp(self) -> None:
+        """Create container database in memory"""
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule
+        ])
+        self.start_date = datetime.date(2021, 7, 5)
+        self.end_date = datetime.date(2021, 7, 18)
+
+    @staticmethod
+    def _create_schedule(vehicle_type: ModeOfTransport, vehicle_arrives_every_k_days: int) -> None:
+        Schedule.create(
+            vehicle_type=vehicle_type,
+            service_name=f"Test{vehicle_type}Service",
+            vehicle_arrives_at=datetime.date(2021, 7, 7),
+            vehicle_arrives_at_time=datetime.time(15, 0),
+            average_vehicle_capacity=400,
+            average_moved_capacity=300,
+            vehicle_arrives_every_k_days=vehicle_arrives_every_k_days
+        )
+
+    def test_with_no_schedules(self):
+        capacities = ScheduledVehicleCapacityEngine.get_capacities(self.start_date, self.end_date, 0.2)
+        self.assertSetEqual(set(capacities.moved.keys()), set(ModeOfTransport.get_scheduled_vehicles()))
+        self.assertTrue(all(capacity == 0 for capacity in capacities.moved.values()))
+        self.assertTrue(all(capacity == 0 for capacity in capacities.maximum.values()))
+
+    def test_with_several_schedules(self):
+        self._create_schedule(ModeOfTransport.feeder, 7)
+        self._create_schedule(ModeOfTransport.train, 1)
+        self._create_schedule(ModeOfTransport.barge, -1)
+        capacities = ScheduledVehicleCapacityEngine.get_capacities(self.start_date, self.end_date, 0.2)
+        self.assertEqual(capacities.moved[ModeOfTransport.feeder], 2 * 300)
+        self.assertEqual(capacities.moved[ModeOfTransport.train], 14 * 300)
+        self.assertEqual(capacities.moved[ModeOfTransport.barge], 300)
+        self.assertEqual(capacities.moved[ModeOfTransport.deep_sea_vessel], 0)
+        self.assertAlmostEqual(capacities.maximum[ModeOfTransport.feeder], 2 * 360)
+        self.assertAlmostEqual(capacities.maximum[ModeOfTransport.barge], 360)
+
+        capacities_with_large_buffer = ScheduledVehicleCapacityEngine.get_capacities(
+            self.start_date, self.end_date, 0.5
+        )
+        self.assertEqual(capacities_with_large_buffer.maximum[ModeOfTransport.barge], 400)
+
+    def test_schedules_are_loaded_once(self):
+        self._create_schedule(ModeOfTransport.feeder, 7)
+        ScheduledVehicleCapacityEngine.get_capacities(self.start_date, self.end_date, 0.2)
+        self._create_schedule(ModeOfTransport.feeder, 7)
+        capacities = ScheduledVehicleCapacityEngine.get_capacities(self.start_date, self.end_date, 0.2)
+        self.assertEqual(capacities.moved[ModeOfTransport.feeder], 2 * 300)
+        DataSummariesCache.reset_cache()
+        capacities = ScheduledVehicleCapacityEngine.get_capacities(self.start_date, self.end_date, 0.2)
+        self.assertEqual(capacities.moved[ModeOfTransport.feeder], 4 * 300)
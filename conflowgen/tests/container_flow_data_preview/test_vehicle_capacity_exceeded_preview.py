@@ -1,11 +1,15 @@
 import datetime
 import unittest
 
+import numpy as np
+
 from conflowgen.domain_models.distribution_repositories.mode_of_transport_distribution_repository import \
     ModeOfTransportDistributionRepository
 from conflowgen.preview.vehicle_capacity_exceeded_preview import VehicleCapacityExceededPreview
 from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
 from conflowgen.domain_models.distribution_models.mode_of_transport_distribution import ModeOfTransportDistribution
+from conflowgen.domain_models.distribution_validators.mode_of_transport_distribution_validator import \
+    ModeOfTransportProportionsUnequalOneException
 from conflowgen.domain_models.large_vehicle_schedule import Schedule
 from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
 
@@ -130,3 +134,48 @@ class TestVehicleCapacityExceededPreview(unittest.TestCase):
         self.assertAlmostEqual(container_capacity_to_pick_up, 60, msg="20% of 300 is 60")
         self.assertEqual(maximum_capacity, -1, msg=f"mode_of_transport_from: {mode_of_transport_from}")
         self.assertFalse(vehicle_type_capacity_is_exceeded, msg=f"mode_of_transport_from: {mode_of_transport_from}")
+
+    def test_compare_for_several_mode_of_transport_distributions(self):
+        now = datetime.datetime.now()
+        for vehicle_type, vehicle_arrives_every_k_days in (
+                (ModeOfTransport.feeder, -1),
+                (ModeOfTransport.deep_sea_vessel, 7),
+                (ModeOfTransport.train, 3)):
+            Schedule.create(
+                vehicle_type=vehicle_type,
+                service_name=f"Test{vehicle_type}Service",
+                vehicle_arrives_at=(now + datetime.timedelta(days=2)).date(),
+                vehicle_arrives_at_time=now.time(),
+                average_vehicle_capacity=300,
+                average_moved_capacity=250,
+                vehicle_arrives_every_k_days=vehicle_arrives_every_k_days
+            )
+        distribution = ModeOfTransportDistributionRepository().get_distribution()
+        distribution_as_array = self.preview.convert_mode_of_transport_distribution_to_array(distribution)
+        distribution_with_more_trains = distribution_as_array.copy()
+        distribution_with_more_trains[:, list(ModeOfTransport).index(ModeOfTransport.train)] += 0.05
+        distribution_with_more_trains /= distribution_with_more_trains.sum(axis=1, keepdims=True)
+        distributions = np.stack([distribution_as_array, distribution_with_more_trains])
+
+        comparisons = self.preview.compare_for_mode_of_transport_distributions(distributions)
+        self.assertEqual(comparisons.currently_planned.shape, (2, len(ModeOfTransport)))
+
+        for i, distribution_as_array in enumerate(distributions):
+            self.preview.hypothesize_with_mode_of_transport_distribution({
+                delivered_by: {
+                    picked_up_by: distribution_as_array[j][k]
+                    for k, picked_up_by in enumerate(ModeOfTransport)
+                }
+                for j, delivered_by in enumerate(ModeOfTransport)
+            })
+            comparison = self.preview.compare()
+            for j, vehicle_type in enumerate(ModeOfTransport):
+                self.assertAlmostEqual(comparisons.currently_planned[i][j], comparison[vehicle_type].currently_planned)
+                self.assertAlmostEqual(comparisons.maximum[i][j], comparison[vehicle_type].maximum)
+                self.assertEqual(comparisons.exceeded[i][j], comparison[vehicle_type].exceeded)
+
+    def test_compare_for_malformed_mode_of_transport_distributions(self):
+        with self.assertRaises(ValueError):
+            self.preview.compare_for_mode_of_transport_distributions(np.full((2, 5), 0.2))
+        with self.assertRaises(ModeOfTransportProportionsUnequalOneException):
+            self.preview.compare_for_mode_of_transport_distributions(np.full((2, 5, 5), 0.5))
@@ -0,0 +1,105 @@
+import datetime
+import unittest
+
+import peewee
+
+from conflowgen.application_models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.database_connection.create_tables import create_tables, create_indexes, drop_indexes, \
+    get_managed_indexes
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Destination, Schedule
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestCreateTables(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sqlite_db = setup_sqlite_in_memory_db()
+
+    def _get_index_names(self, table_name: str) -> set:
+        return {index_metadata.name for index_metadata in self.sqlite_db.get_indexes(table_name)}
+
+    def test_create_tables_creates_managed_indexes(self):
+        create_tables(self.sqlite_db)
+        self.assertSetEqual(
+            {
+                "conflowgen_container_delivered_by_large_scheduled_vehicle_length",
+                "conflowgen_container_picked_up_by_large_scheduled_vehicle_length",
+                "conflowgen_container_delivered_by_length",
+                "conflowgen_container_picked_up_by_length",
+            },
+            {name for name in self._get_index_names("container") if name.startswith("conflowgen_")}
+        )
+        self.assertIn("conflowgen_largescheduledvehicle_scheduled_arrival",
+                      self._get_index_names("largescheduledvehicle"))
+        self.assertIn("conflowgen_destination_belongs_to_schedule_destination_name",
+                      self._get_index_names("destination"))
+
+    def test_count_of_containers_by_vehicle_uses_index(self):
+        create_tables(self.sqlite_db)
+        query_plan = self.sqlite_db.execute_sql(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM container "
+            "WHERE picked_up_by_large_scheduled_vehicle_id = 1 AND length = 20"
+        ).fetchall()
+        self.assertIn("conflowgen_container_picked_up_by_large_scheduled_vehicle_length", str(query_plan))
+
+    def test_destination_names_are_unique_within_schedule(self):
+        create_tables(self.sqlite_db)
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+        Destination.create(belongs_to_schedule=schedule, sequence_id=1, destination_name="A")
+        with self.assertRaises(peewee.IntegrityError):
+            Destination.create(belongs_to_schedule=schedule, sequence_id=2, destination_name="A")
+
+    def test_upgrade_existing_database(self):
+        create_tables(self.sqlite_db)
+        drop_indexes(self.sqlite_db)
+        self.sqlite_db.execute_sql('CREATE INDEX "conflowgen_container_weight" ON "container" ("weight")')
+        self.assertNotIn("conflowgen_container_picked_up_by_length", self._get_index_names("container"))
+
+        create_indexes(self.sqlite_db)
+        index_names = self._get_index_names("container")
+        self.assertNotIn("conflowgen_container_weight", index_names)
+        for managed_index in get_managed_indexes():
+            # noinspection PyProtectedMember
+            self.assertIn(managed_index._name, self._get_index_names(managed_index._model._meta.table_name))
+
+    def test_drop_indexes_keeps_foreign_key_indexes(self):
+        create_tables(self.sqlite_db)
+        drop_indexes(self.sqlite_db)
+        index_names = self._get_index_names("container")
+        self.assertFalse([name for name in index_names if name.startswith("conflowgen_")])
+        self.assertIn("container_picked_up_by_large_scheduled_vehicle_id", index_names)
+
+    def test_upgrade_with_duplicated_destinations(self):
+        create_tables(self.sqlite_db)
+        drop_indexes(self.sqlite_db)
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.feeder,
+            service_name="TestFeederService",
+            vehicle_arrives_at=datetime.date(2021, 7, 9),
+            vehicle_arrives_at_time=datetime.time(11),
+            average_vehicle_capacity=300,
+            average_moved_capacity=300
+        )
+        Destination.create(belongs_to_schedule=schedule, sequence_id=1, destination_name="A")
+        Destination.create(belongs_to_schedule=schedule, sequence_id=2, destination_name="A")
+        with self.assertLogs("conflowgen", level="WARNING"):
+            create_indexes(self.sqlite_db)
+        self.assertIn("conflowgen_container_picked_up_by_length", self._get_index_names("container"))
+
+    def test_upgrade_adds_missing_columns(self):
+        create_tables(self.sqlite_db)
+        ContainerFlowGenerationProperties.create()
+        self.sqlite_db.execute_sql('ALTER TABLE "containerflowgenerationproperties" DROP COLUMN "generation_stamp"')
+
+        create_tables(self.sqlite_db)
+        column_names = {column.name for column in self.sqlite_db.get_columns("containerflowgenerationproperties")}
+        self.assertIn("generation_stamp", column_names)
+        self.assertEqual(ContainerFlowGenerationProperties.get().generation_stamp, 0)
@@ -0,0 +1,105 @@
+import datetime
+import unittest
+
+from peewee import SqliteDatabase
+
+from conflowgen.database_connection.sql_tracer import SqlTracer, normalize_sql_statement, NoDatabaseToTraceException
+from conflowgen.domain_models.base_model import database_proxy
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.large_vehicle_schedule import Schedule
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+
+
+class TestSqlTracer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule
+        ])
+
+    @staticmethod
+    def _create_schedules(number_schedules: int) -> None:
+        for i in range(number_schedules):
+            Schedule.create(
+                vehicle_type=ModeOfTransport.feeder,
+                service_name=f"TestFeederService{i}",
+                vehicle_arrives_at=datetime.date(2021, 7, 9),
+                vehicle_arrives_at_time=datetime.time(11),
+                average_vehicle_capacity=300,
+                average_moved_capacity=300,
+                vehicle_arrives_every_k_days=-1
+            )
+
+    def test_normalize_sql_statement(self):
+        self.assertEqual(
+            normalize_sql_statement('SELECT "t1"."id" FROM "schedule" AS "t1"\n WHERE ("t1"."id" IN (?, ?, ?))'),
+            'SELECT "t1"."id" FROM "schedule" AS "t1" WHERE ("t1"."id" IN (?...))'
+        )
+        self.assertEqual(
+            normalize_sql_statement('INSERT INTO "x" ("a", "b") VALUES (?, ?), (?, ?), (?, ?)'),
+            normalize_sql_statement('INSERT INTO "x" ("a", "b") VALUES (?, ?)').replace("(?...)", "(?...), ...")
+        )
+        self.assertEqual(
+            normalize_sql_statement("SELECT * FROM x WHERE a = 'it''s' AND b = 4.5"),
+            "SELECT * FROM x WHERE a = ? AND b = ?"
+        )
+
+    def test_count_statements_per_shape(self):
+        self._create_schedules(3)
+        with SqlTracer() as sql_tracer:
+            for schedule_id in range(1, 4):
+                Schedule.select().where(Schedule.id == schedule_id).count()
+            list(Schedule.select())
+        self.assertEqual(sql_tracer.get_number_statements(), 4)
+        self.assertEqual(len(sql_tracer.get_statistics()), 2)
+        number_executions = sorted(s.number_executions for s in sql_tracer.get_statistics())
+        self.assertListEqual(number_executions, [1, 3])
+
+    def test_statements_after_leaving_the_context_are_not_traced(self):
+        with SqlTracer() as sql_tracer:
+            Schedule.select().count()
+        Schedule.select().count()
+        self.assertEqual(sql_tracer.get_number_statements(), 1)
+        self.assertNotIn("execute_sql", vars(self.sqlite_db))
+
+    def test_detect_repeatedly_selected_shapes(self):
+        self._create_schedules(20)
+        with SqlTracer() as sql_tracer:
+            for schedule in Schedule.select():
+                Schedule.select().where(Schedule.service_name == schedule.service_name).count()
+        repeatedly_selected_shapes = sql_tracer.get_repeatedly_selected_shapes(minimum_number_executions=10)
+        self.assertEqual(len(repeatedly_selected_shapes), 1)
+        self.assertEqual(repeatedly_selected_shapes[0].number_executions, 20)
+        self.assertIn("COUNT", repeatedly_selected_shapes[0].shape)
+
+    def test_flag_slow_statements(self):
+        with SqlTracer(slow_statement_threshold_in_seconds=0) as sql_tracer:
+            with self.assertLogs("conflowgen", level="WARNING"):
+                Schedule.select().count()
+        self.assertEqual(len(sql_tracer.slow_statements), 1)
+        self.assertIn("COUNT", sql_tracer.slow_statements[0].sql)
+
+    def test_nested_tracers(self):
+        with SqlTracer() as outer_sql_tracer:
+            Schedule.select().count()
+            with SqlTracer() as inner_sql_tracer:
+                Schedule.select().count()
+            Schedule.select().count()
+        self.assertEqual(outer_sql_tracer.get_number_statements(), 3)
+        self.assertEqual(inner_sql_tracer.get_number_statements(), 1)
+        self.assertNotIn("execute_sql", vars(self.sqlite_db))
+
+    def test_trace_without_database(self):
+        database_proxy.initialize(None)
+        with self.assertRaises(NoDatabaseToTraceException):
+            with SqlTracer():
+                pass
+
+    def test_trace_given_database(self):
+        other_sqlite_db = SqliteDatabase(":memory:")
+        with SqlTracer(database=other_sqlite_db) as sql_tracer:
+            Schedule.select().count()
+            other_sqlite_db.execute_sql("SELECT 1")
+        self.assertEqual(sql_tracer.get_number_statements(), 1)
+        self.assertIn("SELECT ?", sql_tracer.get_text_representation())
@@ -1,7 +1,15 @@
+import datetime
+import os
+import shutil
+import sqlite3
+import tempfile
 import unittest
+import unittest.mock
 
+from conflowgen.application_models.repositories.container_flow_generation_properties_repository import \
+    ContainerFlowGenerationPropertiesRepository
 from conflowgen.database_connection.sqlite_database_connection import SqliteDatabaseConnection, \
-    SqliteDatabaseIsMissingException
+    SqliteDatabaseIsMissingException, NoInMemoryDatabaseException
 
 
 class TestSqliteDatabaseConnection(unittest.TestCase):
@@ -70,3 +78,143 @@ class TestSqliteDatabaseConnection(unittest.TestCase):
         successfully_closed_2 = sqlite_db_connection_2.close()
         self.assertTrue(successfully_closed_2)
         self.sqlite_database_connection.delete_database(test_database_name)
+
+
+class TestSqliteDatabaseConnection__InMemory(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temporary_directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.temporary_directory.cleanup)
+        self.sqlite_database_connection = SqliteDatabaseConnection(
+            sqlite_databases_directory=self.temporary_directory.name
+        )
+        self.path_to_database = os.path.join(self.temporary_directory.name, "in-memory.sqlite")
+
+    @staticmethod
+    def _get_name_of_container_flow() -> str:
+        return ContainerFlowGenerationPropertiesRepository().get_container_flow_generation_properties().name
+
+    @staticmethod
+    def _set_name_of_container_flow(name: str) -> None:
+        repository = ContainerFlowGenerationPropertiesRepository()
+        properties = repository.get_container_flow_generation_properties()
+        properties.name = name
+        properties.start_date = datetime.date(2021, 7, 1)
+        properties.end_date = datetime.date(2021, 7, 31)
+        repository.set_container_flow_generation_properties(properties)
+
+    def test_file_is_only_written_when_persisted(self):
+        sqlite_db = self.sqlite_database_connection.choose_database_in_memory("in-memory.sqlite", create=True)
+        self.assertTrue(self.sqlite_database_connection.is_in_memory())
+        self._set_name_of_container_flow("in memory")
+        self.assertFalse(os.path.isfile(self.path_to_database))
+
+        self.sqlite_database_connection.persist_in_memory_database()
+        self.assertTrue(os.path.isfile(self.path_to_database))
+        self.assertFalse(os.path.isfile(self.path_to_database + ".tmp"))
+        sqlite_db.close()
+
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite")
+        self.assertFalse(self.sqlite_database_connection.is_in_memory())
+        self.assertEqual(self._get_name_of_container_flow(), "in memory")
+        sqlite_db.close()
+
+    def test_restore_existing_database_into_memory(self):
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite", create=True)
+        self._set_name_of_container_flow("on disk")
+        sqlite_db.close()
+
+        sqlite_db = self.sqlite_database_connection.choose_database_in_memory("in-memory.sqlite")
+        self.assertEqual(self._get_name_of_container_flow(), "on disk")
+        self._set_name_of_container_flow("changed in memory")
+        with sqlite3.connect(self.path_to_database) as sqlite_file_connection:
+            self.assertListEqual(
+                sqlite_file_connection.execute("SELECT name FROM containerflowgenerationproperties").fetchall(),
+                [("on disk",)]
+            )
+
+        self.sqlite_database_connection.persist_in_memory_database()
+        sqlite_db.close()
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite")
+        self.assertEqual(self._get_name_of_container_flow(), "changed in memory")
+        sqlite_db.close()
+
+    def test_reset_creates_new_database(self):
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite", create=True)
+        self._set_name_of_container_flow("on disk")
+        sqlite_db.close()
+        for choose_database in (
+                self.sqlite_database_connection.choose_database,
+                self.sqlite_database_connection.choose_database_in_memory
+        ):
+            with self.subTest(choose_database=choose_database.__name__):
+                sqlite_db = choose_database("in-memory.sqlite", create=True, reset=True)
+                self.assertIsNone(self._get_name_of_container_flow())
+                sqlite_db.close()
+
+    def test_reset_keeps_file_until_persisted(self):
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite", create=True)
+        self._set_name_of_container_flow("on disk")
+        sqlite_db.close()
+
+        sqlite_db = self.sqlite_database_connection.choose_database_in_memory(
+            "in-memory.sqlite", create=True, reset=True
+        )
+        self.assertIsNone(self._get_name_of_container_flow())
+        with sqlite3.connect(self.path_to_database) as sqlite_file_connection:
+            self.assertListEqual(
+                sqlite_file_connection.execute("SELECT name FROM containerflowgenerationproperties").fetchall(),
+                [("on disk",)]
+            )
+
+        self._set_name_of_container_flow("reset in memory")
+        self.sqlite_database_connection.persist_in_memory_database()
+        sqlite_db.close()
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite")
+        self.assertEqual(self._get_name_of_container_flow(), "reset in memory")
+        sqlite_db.close()
+
+    def test_temporary_file_is_removed_if_persisting_fails(self):
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite", create=True)
+        self._set_name_of_container_flow("on disk")
+        sqlite_db.close()
+
+        sqlite_db = self.sqlite_database_connection.choose_database_in_memory("in-memory.sqlite")
+        self._set_name_of_container_flow("changed in memory")
+        with unittest.mock.patch("os.fsync", side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.sqlite_database_connection.persist_in_memory_database()
+        self.assertFalse(os.path.isfile(self.path_to_database + ".tmp"))
+        sqlite_db.close()
+
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite")
+        self.assertEqual(self._get_name_of_container_flow(), "on disk")
+        sqlite_db.close()
+
+    def test_previous_content_survives_interruption_before_replacing_file(self):
+        sqlite_file_db = self.sqlite_database_connection.choose_database("in-memory.sqlite", create=True)
+        self._set_name_of_container_flow("on disk")
+        self.assertTrue(os.path.isfile(self.path_to_database + "-wal"))
+
+        sqlite_db = self.sqlite_database_connection.choose_database_in_memory("in-memory.sqlite")
+        self._set_name_of_container_flow("changed in memory")
+        with unittest.mock.patch("os.replace", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.sqlite_database_connection.persist_in_memory_database()
+
+        # Only the file itself is kept, e.g. because the write-ahead log has been lost in the crash
+        path_to_copy = os.path.join(self.temporary_directory.name, "copy.sqlite")
+        shutil.copyfile(self.path_to_database, path_to_copy)
+        sqlite_db.close()
+        sqlite_file_db.close()
+        with sqlite3.connect(path_to_copy) as sqlite_file_connection:
+            self.assertListEqual(
+                sqlite_file_connection.execute("SELECT name FROM containerflowgenerationproperties").fetchall(),
+                [("on disk",)]
+            )
+
+    def test_persist_requires_in_memory_database(self):
+        sqlite_db = self.sqlite_database_connection.choose_database("in-memory.sqlite", create=True)
+        with self.assertRaises(NoInMemoryDatabaseException):
+            self.sqlite_database_connection.persist_in_memory_database()
+        sqlite_db.close()
@@ -0,0 +1,96 @@
+"""
+Check if the attributes of many containers are sampled at once according to the distributions.
+"""
+
+import collections
+import unittest
+
+import numpy as np
+
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.factories.container_attribute_sampler import ContainerAttributeSampler
+
+
+class TestContainerAttributeSampler(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sampler = ContainerAttributeSampler(
+            container_length_distribution={
+                ContainerLength.twenty_feet: 0.5,
+                ContainerLength.forty_feet: 0.5,
+                ContainerLength.forty_five_feet: 0,
+                ContainerLength.other: 0
+            },
+            container_weight_distribution={
+                ContainerLength.twenty_feet: {10: 1},
+                ContainerLength.forty_feet: {20: 0.5, 30: 0.5},
+                ContainerLength.forty_five_feet: {20: 1},
+                ContainerLength.other: {20: 1}
+            },
+            storage_requirement_distribution={
+                container_length: {
+                    StorageRequirement.empty: 0.2,
+                    StorageRequirement.standard: 0.8,
+                    StorageRequirement.reefer: 0,
+                    StorageRequirement.dangerous_goods: 0
+                }
+                for container_length in ContainerLength
+            },
+            mode_of_transportation_distribution={
+                mode_of_transport: {
+                    ModeOfTransport.truck: 0.25,
+                    ModeOfTransport.train: 0.75,
+                    ModeOfTransport.feeder: 0,
+                    ModeOfTransport.deep_sea_vessel: 0,
+                    ModeOfTransport.barge: 0
+                }
+                for mode_of_transport in ModeOfTransport
+            },
+            random_number_generator=np.random.default_rng(3)
+        )
+
+    def test_sample_for_free_capacity(self) -> None:
+        container_attributes = self.sampler.sample_for_free_capacity(
+            free_capacity_in_teu=300,
+            delivered_by=ModeOfTransport.feeder
+        )
+        number_containers = len(container_attributes)
+        self.assertEqual(len(container_attributes.weight), number_containers)
+        self.assertEqual(len(container_attributes.storage_requirement), number_containers)
+        self.assertEqual(len(container_attributes.picked_up_by), number_containers)
+
+        used_capacity_in_teu = sum(ContainerLength.get_factor(length) for length in container_attributes.length)
+        self.assertLessEqual(used_capacity_in_teu, 300)
+        self.assertGreaterEqual(used_capacity_in_teu, 300 - ContainerAttributeSampler.ignored_capacity)
+
+        counted_lengths = collections.Counter(container_attributes.length)
+        self.assertSetEqual(set(counted_lengths.keys()), {ContainerLength.twenty_feet, ContainerLength.forty_feet})
+        self.assertAlmostEqual(counted_lengths[ContainerLength.twenty_feet] / number_containers, 0.5, delta=0.1)
+
+        counted_picked_up_by = collections.Counter(container_attributes.picked_up_by)
+        self.assertSetEqual(set(counted_picked_up_by.keys()), {ModeOfTransport.truck, ModeOfTransport.train})
+        self.assertAlmostEqual(counted_picked_up_by[ModeOfTransport.train] / number_containers, 0.75, delta=0.1)
+
+    def test_weight_depends_on_length_and_storage_requirement(self) -> None:
+        container_attributes = self.sampler.sample(
+            number_containers=200,
+            delivered_by=ModeOfTransport.truck
+        )
+        self.assertEqual(len(container_attributes), 200)
+        for length, weight, storage_requirement in zip(
+                container_attributes.length, container_attributes.weight, container_attributes.storage_requirement):
+            if storage_requirement == StorageRequirement.empty:
+                self.assertEqual(weight, 2 if length == ContainerLength.twenty_feet else 4)
+            elif length == ContainerLength.twenty_feet:
+                self.assertEqual(weight, 10)
+            else:
+                self.assertIn(weight, (20, 30))
+
+    def test_no_containers_for_small_free_capacity(self) -> None:
+        container_attributes = self.sampler.sample_for_free_capacity(
+            free_capacity_in_teu=ContainerAttributeSampler.ignored_capacity,
+            delivered_by=ModeOfTransport.feeder
+        )
+        self.assertEqual(len(container_attributes), 0)
@@ -80,3 +80,28 @@ class TestContainerFactory(unittest.TestCase):
             feeder_1.large_scheduled_vehicle
         )
         self.assertIsNone(containers[0].delivered_by_truck)
+
+    def test_create_containers_for_several_feeder_vessels(self) -> None:
+        number_created_containers = self.container_factory.create_containers_for_large_scheduled_vehicles(
+            self.feeders
+        )
+        self.assertEqual(
+            2,
+            number_created_containers,
+            "a single container should be generated for each vessel"
+        )
+        for feeder in self.feeders:
+            containers = Container.select().where(
+                Container.delivered_by_large_scheduled_vehicle == feeder.large_scheduled_vehicle
+            )
+            self.assertEqual(1, len(containers))
+            container: Container = containers[0]
+            self.assertEqual(container.delivered_by, ModeOfTransport.feeder)
+            self.assertEqual(container.picked_up_by, container.picked_up_by_initial)
+            self.assertIsNone(container.delivered_by_truck)
+            self.assertFalse(container.emergency_pickup)
+            self.assertTrue(
+                LargeScheduledVehicle.get_by_id(
+                    feeder.large_scheduled_vehicle.id
+                ).capacity_exhausted_while_determining_onward_transportation
+            )
@@ -107,3 +107,22 @@ class TestContainerFactory(unittest.TestCase):
             None,
             msg="Truck is assigned later"
         )
+
+    def test_create_container_rows_for_delivering_trucks(self) -> None:
+        container_rows = [
+            self.container_factory.create_container_row_for_delivering_truck(
+                picked_up_by_large_scheduled_vehicle_subtype=self.feeder
+            )
+            for _ in range(3)
+        ]
+        self.assertEqual(Container.select().count(), 0, msg="The containers are only kept in memory")
+
+        number_created_containers = self.container_factory.store_container_rows_for_delivering_trucks(container_rows)
+
+        self.assertEqual(number_created_containers, 3)
+        for container in Container.select():
+            self.assertEqual(container.delivered_by, ModeOfTransport.truck)
+            self.assertEqual(container.picked_up_by, ModeOfTransport.feeder)
+            self.assertEqual(container.picked_up_by_initial, ModeOfTransport.feeder)
+            self.assertEqual(container.picked_up_by_large_scheduled_vehicle, self.feeder.large_scheduled_vehicle)
+            self.assertIsNone(container.delivered_by_truck, msg="Truck is assigned later")
@@ -5,7 +5,8 @@ Check if time ranges are working
 import datetime
 import unittest
 
-from conflowgen.domain_models.factories.fleet_factory import create_arrivals_within_time_range
+from conflowgen.domain_models.factories.fleet_factory import create_arrivals_within_time_range, \
+    count_arrivals_within_time_range
 
 
 class TestVehicleFactory__create_arrivals_within_time_range(unittest.TestCase):
@@ -96,3 +97,37 @@ class TestVehicleFactory__create_arrivals_within_time_range(unittest.TestCase):
             datetime.time(15, 0)
         )
         self.assertEqual(len(arrivals), 0)
+
+    def test_create_time_range_with_daily_interval(self) -> None:
+        arrivals = create_arrivals_within_time_range(
+            datetime.date(2021, 7, 7),
+            datetime.date(2021, 7, 2),
+            datetime.date(2021, 7, 10),
+            1,
+            datetime.time(15, 0)
+        )
+        self.assertEqual(len(arrivals), 4)
+        self.assertEqual(arrivals[0], datetime.datetime(2021, 7, 7, 15))
+        self.assertEqual(arrivals[3], datetime.datetime(2021, 7, 10, 15))
+
+    def test_count_arrivals_matches_created_arrivals(self) -> None:
+        range_starts_at = datetime.date(2021, 7, 7)
+        for vehicle_arrives_every_k_days in (-1, 1, 2, 5, 7, 10, 30):
+            for shift_of_arrival_in_days in range(-20, 40, 3):
+                for length_of_range_in_days in (1, 6, 7, 11, 28):
+                    vehicle_arrives_at = range_starts_at + datetime.timedelta(days=shift_of_arrival_in_days)
+                    range_ends_at = range_starts_at + datetime.timedelta(days=length_of_range_in_days)
+                    arrivals = create_arrivals_within_time_range(
+                        range_starts_at,
+                        vehicle_arrives_at,
+                        range_ends_at,
+                        vehicle_arrives_every_k_days,
+                        datetime.time(15, 0)
+                    )
+                    number_arrivals = count_arrivals_within_time_range(
+                        range_starts_at,
+                        vehicle_arrives_at,
+                        range_ends_at,
+                        vehicle_arrives_every_k_days
+                    )
+                    self.assertEqual(number_arrivals, len(arrivals))
@@ -1,5 +1,6 @@
 import datetime
 import unittest
+import unittest.mock
 
 from conflowgen.domain_models.container import Container
 from conflowgen.domain_models.data_types.container_length import ContainerLength
@@ -101,3 +102,45 @@ class TestLargeScheduledVehicleRepository(unittest.TestCase):
 
         free_capacity_in_teu = self.lsv_repository.get_free_capacity_for_outbound_journey(self.train)
         self.assertEqual(free_capacity_in_teu, 0.5)
+
+    def test_warm_up_cache(self):
+        Container.create(
+            weight=20,
+            length=ContainerLength.forty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.truck,
+            picked_up_by=ModeOfTransport.train,
+            picked_up_by_initial=ModeOfTransport.train,
+            picked_up_by_large_scheduled_vehicle=self.train_lsv,
+        )
+        Container.create(
+            weight=20,
+            length=ContainerLength.twenty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.train,
+            picked_up_by=ModeOfTransport.truck,
+            picked_up_by_initial=ModeOfTransport.truck,
+            delivered_by_large_scheduled_vehicle=self.train_lsv,
+        )
+
+        self.lsv_repository.warm_up_cache({ModeOfTransport.train: [self.train]})
+
+        with unittest.mock.patch.object(
+                self.lsv_repository,
+                '_get_number_containers_for_outbound_journey',
+                return_value=0) as mock_outbound, unittest.mock.patch.object(
+                self.lsv_repository,
+                '_get_number_containers_for_inbound_journey',
+                return_value=0) as mock_inbound:
+            free_capacity_outbound_in_teu = self.lsv_repository.get_free_capacity_for_outbound_journey(self.train)
+            free_capacity_inbound_in_teu = self.lsv_repository.get_free_capacity_for_inbound_journey(self.train)
+        mock_outbound.assert_not_called()
+        mock_inbound.assert_not_called()
+        self.assertEqual(free_capacity_outbound_in_teu, 1)
+        self.assertEqual(free_capacity_inbound_in_teu, 2)
+
+    def test_warm_up_cache_only_for_inbound_journey(self):
+        lsv_repository = LargeScheduledVehicleRepository()
+        lsv_repository.warm_up_cache({ModeOfTransport.train: [self.train]}, outbound=False)
+        self.assertEqual(lsv_repository.free_capacity_for_inbound_journey_buffer, {self.train: 3})
+        self.assertEqual(lsv_repository.free_capacity_for_outbound_journey_buffer, {})
@@ -291,3 +291,105 @@ class TestScheduleRepository(unittest.TestCase):
                 required_capacity=ContainerLength.twenty_feet
             )
         mock_method.assert_called_once_with(train)
+
+    def test_find_vehicles_sorted_by_arrival(self):
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.train,
+            service_name="TestService",
+            vehicle_arrives_at=datetime.date(year=2021, month=8, day=7),
+            vehicle_arrives_at_time=datetime.time(hour=13, minute=15),
+            average_vehicle_capacity=90,
+            average_moved_capacity=90,
+        )
+        trains = []
+        for day in (9, 7, 8, 12):
+            train_lsv = LargeScheduledVehicle.create(
+                capacity_in_teu=90,
+                moved_capacity=3,
+                scheduled_arrival=datetime.datetime(year=2021, month=8, day=day, hour=13, minute=15),
+                schedule=schedule
+            )
+            trains.append(Train.create(large_scheduled_vehicle=train_lsv))
+
+        vehicles = self.schedule_repository.get_departing_vehicles(
+            start=datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15),
+            end=datetime.datetime(year=2021, month=8, day=9, hour=13, minute=15),
+            vehicle_type=ModeOfTransport.train,
+            required_capacity=ContainerLength.twenty_feet
+        )
+
+        self.assertListEqual(vehicles, [trains[1], trains[2], trains[0]])
+
+    def test_exhausted_vehicle_is_removed_from_index(self):
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.train,
+            service_name="TestService",
+            vehicle_arrives_at=datetime.date(year=2021, month=8, day=7),
+            vehicle_arrives_at_time=datetime.time(hour=13, minute=15),
+            average_vehicle_capacity=90,
+            average_moved_capacity=90,
+        )
+        train_lsv = LargeScheduledVehicle.create(
+            capacity_in_teu=90,
+            moved_capacity=2,
+            scheduled_arrival=datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15),
+            schedule=schedule
+        )
+        train = Train.create(
+            large_scheduled_vehicle=train_lsv
+        )
+        container = Container.create(
+            weight=20,
+            length=ContainerLength.forty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.truck,
+            picked_up_by=ModeOfTransport.train,
+            picked_up_by_initial=ModeOfTransport.train
+        )
+        kwargs = {
+            "start": datetime.datetime(year=2021, month=8, day=5, hour=0, minute=0),
+            "end": datetime.datetime(year=2021, month=8, day=10, hour=23, minute=59),
+            "vehicle_type": ModeOfTransport.train,
+            "required_capacity": ContainerLength.twenty_feet
+        }
+        self.assertListEqual(self.schedule_repository.get_departing_vehicles(**kwargs), [train])
+
+        self.schedule_repository.block_capacity_for_outbound_journey(train, container)
+
+        with unittest.mock.patch.object(
+                self.schedule_repository.large_scheduled_vehicle_repository,
+                'get_free_capacity_for_outbound_journey',
+                return_value=0) as mock_method:
+            vehicles = self.schedule_repository.get_departing_vehicles(**kwargs)
+        self.assertListEqual(vehicles, [])
+        mock_method.assert_not_called()
+
+    def test_reset_cache_reloads_index(self):
+        kwargs = {
+            "start": datetime.datetime(year=2021, month=8, day=5, hour=0, minute=0),
+            "end": datetime.datetime(year=2021, month=8, day=10, hour=23, minute=59),
+            "vehicle_type": ModeOfTransport.train,
+            "required_capacity": ContainerLength.twenty_feet
+        }
+        self.assertListEqual(self.schedule_repository.get_departing_vehicles(**kwargs), [])
+
+        schedule = Schedule.create(
+            vehicle_type=ModeOfTransport.train,
+            service_name="TestService",
+            vehicle_arrives_at=datetime.date(year=2021, month=8, day=7),
+            vehicle_arrives_at_time=datetime.time(hour=13, minute=15),
+            average_vehicle_capacity=90,
+            average_moved_capacity=90,
+        )
+        train_lsv = LargeScheduledVehicle.create(
+            capacity_in_teu=90,
+            moved_capacity=2,
+            scheduled_arrival=datetime.datetime(year=2021, month=8, day=7, hour=13, minute=15),
+            schedule=schedule
+        )
+        train = Train.create(
+            large_scheduled_vehicle=train_lsv
+        )
+        self.schedule_repository.reset_cache()
+
+        self.assertListEqual(self.schedule_repository.get_departing_vehicles(**kwargs), [train])
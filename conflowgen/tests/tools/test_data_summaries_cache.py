@@ -0,0 +1,118 @@
+import unittest
+
+from conflowgen.application_models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.domain_models.arrival_information import TruckArrivalInformationForDelivery, \
+    TruckArrivalInformationForPickup
+from conflowgen.domain_models.container import Container
+from conflowgen.domain_models.data_types.container_length import ContainerLength
+from conflowgen.domain_models.data_types.mode_of_transport import ModeOfTransport
+from conflowgen.domain_models.data_types.storage_requirement import StorageRequirement
+from conflowgen.domain_models.large_vehicle_schedule import Schedule, Destination
+from conflowgen.domain_models.vehicle import LargeScheduledVehicle, Truck
+from conflowgen.posthoc_analysis.inbound_and_outbound_vehicle_capacity_analysis import \
+    InboundAndOutboundVehicleCapacityAnalysis
+from conflowgen.tests.substitute_peewee_database import setup_sqlite_in_memory_db
+from conflowgen.tools.data_summaries_cache import DataSummariesCache
+
+
+class _Summary:
+
+    def __init__(self, factor: int):
+        self.factor = factor
+        self.number_calls = 0
+
+    def _get_state_for_caching(self):
+        return self.factor
+
+    @DataSummariesCache.cache_result
+    def get_summary(self, value: int):
+        self.number_calls += 1
+        return {"value": value * self.factor}
+
+
+class TestDataSummariesCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.sqlite_db = setup_sqlite_in_memory_db()
+        self.sqlite_db.create_tables([
+            Schedule,
+            Destination,
+            LargeScheduledVehicle,
+            TruckArrivalInformationForDelivery,
+            TruckArrivalInformationForPickup,
+            Truck,
+            Container,
+            ContainerFlowGenerationProperties
+        ])
+
+    def test_result_is_computed_once(self):
+        summary = _Summary(factor=2)
+        self.assertDictEqual(summary.get_summary(3), {"value": 6})
+        self.assertDictEqual(summary.get_summary(3), {"value": 6})
+        self.assertEqual(summary.number_calls, 1)
+
+    def test_result_depends_on_arguments_and_state(self):
+        summary = _Summary(factor=2)
+        self.assertDictEqual(summary.get_summary(3), {"value": 6})
+        self.assertDictEqual(summary.get_summary(4), {"value": 8})
+        summary.factor = 3
+        self.assertDictEqual(summary.get_summary(3), {"value": 9})
+        self.assertEqual(summary.number_calls, 3)
+
+    def test_modifying_the_result_does_not_alter_the_cache(self):
+        summary = _Summary(factor=2)
+        summary.get_summary(3)["value"] = 0
+        self.assertDictEqual(summary.get_summary(3), {"value": 6})
+
+    def test_reset_cache(self):
+        summary = _Summary(factor=2)
+        generation_stamp = DataSummariesCache.get_generation_stamp()
+        summary.get_summary(3)
+        DataSummariesCache.reset_cache()
+        summary.get_summary(3)
+        self.assertEqual(summary.number_calls, 2)
+        self.assertEqual(DataSummariesCache.get_generation_stamp(), generation_stamp + 1)
+        self.assertEqual(ContainerFlowGenerationProperties.get().generation_stamp, generation_stamp + 1)
+
+    def test_result_is_not_reused_after_data_has_been_changed_elsewhere(self):
+        ContainerFlowGenerationProperties.create()
+        summary = _Summary(factor=2)
+        summary.get_summary(3)
+        # E.g., another process has changed the data and incremented the stamp in the database
+        ContainerFlowGenerationProperties.update(
+            generation_stamp=ContainerFlowGenerationProperties.generation_stamp + 1
+        ).execute()
+        summary.get_summary(3)
+        self.assertEqual(summary.number_calls, 2)
+
+    def test_without_properties_table(self):
+        self.sqlite_db.drop_tables([ContainerFlowGenerationProperties])
+        summary = _Summary(factor=2)
+        self.assertIsNone(DataSummariesCache.get_generation_stamp())
+        summary.get_summary(3)
+        DataSummariesCache.reset_cache()
+        summary.get_summary(3)
+        self.assertEqual(summary.number_calls, 2)
+
+    def test_choosing_another_database_resets_cache(self):
+        summary = _Summary(factor=2)
+        summary.get_summary(3)
+        setup_sqlite_in_memory_db()
+        summary.get_summary(3)
+        self.assertEqual(summary.number_calls, 2)
+
+    def test_analysis_is_updated_after_reset(self):
+        analysis = InboundAndOutboundVehicleCapacityAnalysis(transportation_buffer=0.2)
+        self.assertEqual(analysis.get_inbound_capacity_of_vehicles()[ModeOfTransport.truck], 0)
+        Container.create(
+            weight=20,
+            length=ContainerLength.forty_feet,
+            storage_requirement=StorageRequirement.standard,
+            delivered_by=ModeOfTransport.truck,
+            picked_up_by=ModeOfTransport.feeder,
+            picked_up_by_initial=ModeOfTransport.feeder
+        )
+        # Containers created without the API are only considered once the cache is reset
+        self.assertEqual(analysis.get_inbound_capacity_of_vehicles()[ModeOfTransport.truck], 0)
+        DataSummariesCache.reset_cache()
+        self.assertEqual(analysis.get_inbound_capacity_of_vehicles()[ModeOfTransport.truck], 2)
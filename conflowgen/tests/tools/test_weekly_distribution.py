@@ -1,5 +1,8 @@
 import datetime
 import unittest
+from collections import Counter
+
+import numpy as np
 
 from conflowgen.tools.weekly_distribution import WeeklyDistribution
 
@@ -159,3 +162,63 @@ class TestWeeklyDistribution(unittest.TestCase):
                                    "Assert arrivals on other days")
         self.assertTrue(visited_sunday)
         self.assertTrue(visited_working_day)
+
+    def test_sample_time_windows(self):
+        weekly_distribution = WeeklyDistribution([
+            (0, .5),
+            (24, .2),
+            (48, .2),
+            (72, .1),
+            (96, 0),
+            (120, 0),
+            (144, 0)
+        ],
+            considered_time_window_in_hours=48,
+            minimum_dwell_time_in_hours=3
+        )
+        monday = datetime.datetime(year=2021, month=8, day=2, hour=3, minute=30)
+        wednesday = datetime.datetime(year=2021, month=8, day=4, hour=0)
+        points_in_time = [monday, wednesday] * 1000
+
+        time_window_starts, time_window_lengths = weekly_distribution.sample_time_windows(
+            points_in_time, np.random.default_rng(1)
+        )
+
+        self.assertEqual(len(time_window_starts), len(points_in_time))
+        for point_in_time in (monday, wednesday):
+            distribution_slice = weekly_distribution.get_distribution_slice(point_in_time)
+            drawn_time_windows = [
+                time_window_start
+                for time_window_start, drawn_for in zip(time_window_starts, points_in_time)
+                if drawn_for == point_in_time
+            ]
+            counted_time_windows = Counter(drawn_time_windows)
+            self.assertSetEqual(
+                set(counted_time_windows.keys()),
+                {time_window_start for time_window_start, fraction in distribution_slice.items() if fraction > 0}
+            )
+            for time_window_start, fraction in distribution_slice.items():
+                self.assertAlmostEqual(counted_time_windows[time_window_start] / 1000, fraction, delta=0.05)
+
+        # The first time window is shortened by the minimum dwell time, all other time windows last for a day
+        self.assertDictEqual(
+            dict(zip(time_window_starts.tolist(), time_window_lengths.tolist())),
+            {3: 21, 21: 24, 24: 24, 45: 24}
+        )
+
+    def test_hours_of_the_week_from_datetimes(self):
+        points_in_time = [
+            datetime.datetime(year=2021, month=8, day=2) + datetime.timedelta(hours=hours, minutes=59)
+            for hours in range(0, 2 * 168, 7)
+        ]
+        # pylint: disable=protected-access
+        hours_of_the_week = WeeklyDistribution._get_hours_of_the_week_from_datetimes(
+            np.array(points_in_time, dtype="datetime64[us]")
+        )
+        self.assertListEqual(
+            hours_of_the_week.tolist(),
+            [
+                WeeklyDistribution._get_hour_of_the_week_from_datetime(point_in_time)
+                for point_in_time in points_in_time
+            ]
+        )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import copy
+import functools
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from conflowgen.application_models.container_flow_generation_properties import ContainerFlowGenerationProperties
+from conflowgen.application_models.repositories.container_flow_generation_properties_repository import \
+    ContainerFlowGenerationPropertiesRepository
+from conflowgen.domain_models.base_model import database_proxy
+
+
+class DataSummariesCache:
+    """
+    The posthoc analyses and the previews summarize the data in the database. As long as the data is not changed, the
+    same summary does not need to be computed twice, e.g. when a report is first shown as text and then as a graph.
+    Whenever the data is changed, e.g. by generating the container flow or by setting a distribution, the cache must be
+    reset. The generation stamp that is stored in the database counts how often that has happened. It is part of the
+    key of each summary so that a summary is not reused once the data has been changed, even if that happened in
+    another process.
+    """
+
+    _results: Dict[Hashable, Any] = {}
+
+    @staticmethod
+    def _is_generation_stamp_stored() -> bool:
+        return database_proxy.obj is not None and ContainerFlowGenerationProperties.table_exists()
+
+    @classmethod
+    def get_generation_stamp(cls) -> Optional[int]:
+        """
+        Returns: How often the data in the database has been changed, or ``None`` if no database with a table for it
+            has been chosen
+        """
+        if not cls._is_generation_stamp_stored():
+            return None
+        return ContainerFlowGenerationPropertiesRepository.get_generation_stamp()
+
+    @classmethod
+    def reset_cache(cls) -> None:
+        """
+        Drops all summaries as the data they are based on has changed.
+        """
+        if cls._is_generation_stamp_stored():
+            ContainerFlowGenerationPropertiesRepository.increment_generation_stamp()
+        cls._results.clear()
+
+    @classmethod
+    def cache_result(cls, method: Callable) -> Callable:
+        """
+        Caches the result of a method of a posthoc analysis or a preview. The result is stored for the generation
+        stamp, the arguments and, in case of an instance, for the state returned by its ``_get_state_for_caching``
+        method. Each caller receives its own copy of the result so that modifying it does not alter the cache.
+        """
+
+        @functools.wraps(method)
+        def wrapper(instance_or_class, *args, **kwargs):
+            state = None
+            if not isinstance(instance_or_class, type):
+                state = instance_or_class._get_state_for_caching()  # pylint: disable=protected-access
+            key = (
+                cls.get_generation_stamp(), method.__module__, method.__qualname__, state, args,
+                tuple(sorted(kwargs.items()))
+            )
+            if key not in cls._results:
+                cls._results[key] = method(instance_or_class, *args, **kwargs)
+            return copy.deepcopy(cls._results[key])
+
+        return wrapper
+
+
+# Each database has its own data, so when another database is chosen, nothing of the previous one must be reused.
+database_proxy.attach_callback(lambda _: DataSummariesCache._results.clear())  # pylint: disable=protected-access
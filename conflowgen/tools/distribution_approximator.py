@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import math
-import random
 from typing import Dict
 
 import numpy as np
@@ -14,25 +13,40 @@ class SamplerExhaustedException(Exception):
 
 class DistributionApproximator:
 
-    def __init__(self, number_instances_per_category: Dict[any, int]) -> None:
+    def __init__(
+            self,
+            number_instances_per_category: Dict[any, int],
+            random_number_generator: np.random.Generator | None = None
+    ) -> None:
         """
         :param number_instances_per_category: For each key (category) the number of instances to draw is given
+        :param random_number_generator: The source of randomness, a new unseeded generator is used if none is given
         """
         self.target_distribution = np.array(
             list(number_instances_per_category.values()),
             dtype=np.int64
         )
         self.number_categories = len(self.target_distribution)
-        self.already_sampled = np.array([0 for _ in range(self.number_categories)])
+        self.already_sampled = np.zeros(self.number_categories, dtype=np.int64)
         self.categories = list(number_instances_per_category.keys())
+        if random_number_generator is None:
+            random_number_generator = np.random.default_rng()
+        self.random_number_generator = random_number_generator
+
+        # The gap between the target distribution and the drawn samples is maintained while sampling
+        self.current_gap = self.target_distribution.copy()
+        self.number_remaining_samples = int(self.current_gap.sum())
 
     @staticmethod
     def from_distribution(
             distribution: Dict[any, float],
-            number_items: int
+            number_items: int,
+            random_number_generator: np.random.Generator | None = None
     ) -> DistributionApproximator:
         assert math.isclose(sum(distribution.values()), 1, abs_tol=.001), \
             f"All probabilities must sum to 1, but you only achieved {sum(distribution.values())}"
+        if random_number_generator is None:
+            random_number_generator = np.random.default_rng()
 
         # Approach the distribution by estimating the number of instances per category
         probability_based_instance_estimation = {
@@ -45,15 +59,18 @@ class DistributionApproximator:
         number_items_in_category_estimation = sum(probability_based_instance_estimation.values())
         if number_items_in_category_estimation < number_items:
             items_lost_to_rounding = number_items - number_items_in_category_estimation
-            randomly_chosen_categories = random.choices(
-                population=list(distribution.keys()),
-                weights=list(distribution.values()),
-                k=items_lost_to_rounding
+            categories = list(distribution.keys())
+            probabilities = np.array(list(distribution.values()), dtype=np.float64)
+            randomly_chosen_category_indices = random_number_generator.choice(
+                len(categories),
+                size=items_lost_to_rounding,
+                p=probabilities / probabilities.sum()
             )
-            for category in randomly_chosen_categories:
-                probability_based_instance_estimation[category] += 1
+            for category_index in randomly_chosen_category_indices:
+                probability_based_instance_estimation[categories[category_index]] += 1
         distribution_approximator = DistributionApproximator(
-            probability_based_instance_estimation
+            probability_based_instance_estimation,
+            random_number_generator=random_number_generator
         )
         return distribution_approximator
 
@@ -61,16 +78,48 @@ class DistributionApproximator:
         """
         Draws pseudo-random element so that the target distribution is approximated best
         """
-        if self.already_sampled.sum() >= self.target_distribution.sum():
+        if self.number_remaining_samples <= 0:
             raise SamplerExhaustedException(
                 f"Only {self.target_distribution.sum()} draws are possible, "
                 "you invoked `.sample()` too often")
-        current_gap = self.target_distribution - self.already_sampled
-        selected_category = random.choices(
-            population=self.categories,
-            weights=current_gap,
-            k=1
-        )[0]
-        selected_category_index = self.categories.index(selected_category)
-        self.already_sampled[selected_category_index] += 1
-        return selected_category
+        selected_category_index = self.random_number_generator.choice(
+            self.number_categories,
+            p=self.current_gap / self.number_remaining_samples
+        )
+        self._mark_as_sampled(np.array([selected_category_index]))
+        return self.categories[selected_category_index]
+
+    def sample_indices(self, number_samples: int) -> np.ndarray:
+        """
+        Draws several elements at once. Drawing one element after the other weighted by the current gap is the same as
+        taking the first elements of a random permutation of all remaining instances, so both ways of sampling give the
+        same guarantees.
+
+        :param number_samples: The number of elements to draw
+        :return: The index of the category in :attr:`categories` for each drawn element
+        """
+        if number_samples > self.number_remaining_samples:
+            raise SamplerExhaustedException(
+                f"Only {self.number_remaining_samples} more draws are possible, but {number_samples} were requested")
+        remaining_instances = np.repeat(np.arange(self.number_categories), self.current_gap)
+        selected_category_indices = self.random_number_generator.permutation(remaining_instances)[:number_samples]
+        self._mark_as_sampled(selected_category_indices)
+        return selected_category_indices
+
+    def sample_many(self, number_samples: int) -> np.ndarray:
+        """
+        Draws several elements at once, see :meth:`sample_indices`.
+
+        :param number_samples: The number of elements to draw
+        :return: The drawn categories
+        """
+        return np.array(
+            [self.categories[category_index] for category_index in self.sample_indices(number_samples)],
+            dtype=object
+        )
+
+    def _mark_as_sampled(self, selected_category_indices: np.ndarray) -> None:
+        number_samples_per_category = np.bincount(selected_category_indices, minlength=self.number_categories)
+        self.already_sampled += number_samples_per_category
+        self.current_gap -= number_samples_per_category
+        self.number_remaining_samples -= len(selected_category_indices)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 import datetime
-from typing import List, Tuple, Union, Dict
+from typing import List, Sequence, Tuple, Union, Dict
+
+import numpy as np
 
 
 class InvalidDistributionSliceException(Exception):
@@ -35,6 +37,12 @@ class WeeklyDistribution:
                 - self.hour_of_the_week_fraction_pairs[0][0]
         )
 
+        # The slices only depend on the hour of the week they start at, so each of them is only determined once.
+        # Next to the slice itself, the hours after the start, the cumulative fractions, and the lengths of the time
+        # windows are kept for sampling.
+        self._distribution_slices: Dict[int, Dict[int, Union[int, float]]] = {}
+        self._distribution_slices_for_sampling: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
     @classmethod
     def _get_hour_of_the_week_from_datetime(cls, point_in_time: datetime.datetime) -> int:
         # Get the monday at midnight before the given point in time
@@ -50,8 +58,77 @@ class WeeklyDistribution:
             f"Time since Monday in completed hours: {completed_hours_since_monday}"
         return completed_hours_since_monday
 
+    @classmethod
+    def _get_hours_of_the_week_from_datetimes(cls, points_in_time: np.ndarray) -> np.ndarray:
+        # The 1st of January 1970 was a Thursday, so the Monday before is three days earlier
+        completed_hours_since_epoch = points_in_time.astype("datetime64[h]").astype(np.int64)
+        return (completed_hours_since_epoch + 3 * 24) % cls.HOURS_IN_WEEK
+
     def get_distribution_slice(self, _datetime: datetime.datetime) -> Dict[int, Union[int, float]]:
+        """
+        Args:
+            _datetime: The point in time the slice starts at
+
+        Returns: For each time window after the start (in hours), the probability of that time window. The same slice
+            is returned for all points in time within the same hour of the week, so it must not be modified.
+        """
         start_hour = self._get_hour_of_the_week_from_datetime(_datetime)
+        return self._get_distribution_slice_for_start_hour(start_hour)
+
+    def _get_distribution_slice_for_start_hour(self, start_hour: int) -> Dict[int, Union[int, float]]:
+        if start_hour not in self._distribution_slices:
+            self._distribution_slices[start_hour] = self._create_distribution_slice(start_hour)
+        return self._distribution_slices[start_hour]
+
+    def _get_distribution_slice_for_sampling(self, start_hour: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if start_hour not in self._distribution_slices_for_sampling:
+            distribution_slice = self._get_distribution_slice_for_start_hour(start_hour)
+            hours_after_start = np.array(list(distribution_slice.keys()), dtype=np.float64)
+            cumulative_fractions = np.cumsum(np.array(list(distribution_slice.values()), dtype=np.float64))
+            # Each time window lasts until the next one starts, the last one has the regular length
+            time_window_lengths = np.append(np.diff(hours_after_start), self.time_window_length_in_hours)
+            self._distribution_slices_for_sampling[start_hour] = \
+                hours_after_start, cumulative_fractions, time_window_lengths
+        return self._distribution_slices_for_sampling[start_hour]
+
+    def sample_time_windows(
+            self,
+            points_in_time: Sequence[datetime.datetime] | np.ndarray,
+            random_number_generator: np.random.Generator
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draws a time window for each point in time from the distribution slice starting at that point in time.
+
+        Args:
+            points_in_time: The points in time the slices start at
+            random_number_generator: The source of randomness
+
+        Returns: For each point in time the start of the drawn time window in hours after the point in time and the
+            length of the drawn time window in hours
+        """
+        start_hours = self._get_hours_of_the_week_from_datetimes(
+            np.array(points_in_time, dtype="datetime64[us]").reshape(-1)
+        )
+        random_numbers = random_number_generator.random(len(start_hours))
+        time_window_starts = np.empty(len(start_hours), dtype=np.float64)
+        time_window_lengths = np.empty(len(start_hours), dtype=np.float64)
+
+        # All points in time that start at the same hour of the week are drawn from the same slice
+        for start_hour in np.unique(start_hours):
+            starts_at_hour = start_hours == start_hour
+            hours_after_start, cumulative_fractions, time_window_lengths_of_slice = \
+                self._get_distribution_slice_for_sampling(int(start_hour))
+            indices = np.searchsorted(
+                cumulative_fractions,
+                random_numbers[starts_at_hour] * cumulative_fractions[-1],
+                side="right"
+            )
+            indices = np.minimum(indices, len(hours_after_start) - 1)
+            time_window_starts[starts_at_hour] = hours_after_start[indices]
+            time_window_lengths[starts_at_hour] = time_window_lengths_of_slice[indices]
+        return time_window_starts, time_window_lengths
+
+    def _create_distribution_slice(self, start_hour: int) -> Dict[int, Union[int, float]]:
         end_hour = start_hour + self.considered_time_window_in_hours
         assert 0 <= start_hour <= self.HOURS_IN_WEEK, "Start hour must be in first week"
         assert start_hour < end_hour, "Start hour must be before end hour"
@@ -93,3 +170,15 @@ class WeeklyDistribution:
             for (hour_after_start, hour_fraction) in not_normalized_distribution_slice
         }
         return distribution_slice
+
+
+def shift_by_hours(points_in_time: np.ndarray, hours: np.ndarray | float) -> np.ndarray:
+    """
+    Args:
+        points_in_time: The points in time to shift
+        hours: The number of hours to shift each point in time by, fractions of an hour are allowed
+
+    Returns: The shifted points in time with a precision of microseconds
+    """
+    microseconds = np.round(np.asarray(hours, dtype=np.float64) * 3600 * 1_000_000).astype(np.int64)
+    return points_in_time.astype("datetime64[us]") + microseconds.astype("timedelta64[us]")
@@ -28,6 +28,7 @@ setup(
             'pytest',
             'pytest-cov',  # create coverage report
             'pytest-github-actions-annotate-failures',  # turns pytest failures into action annotations
+            'pyarrow',  # the export to Apache Parquet and Feather is tested as well
 
             # build documentation
             'sphinx',
@@ -47,6 +48,10 @@ setup(
             'matplotlib',
             'seaborn',
             'kaleido',  # plotly depends on this package for SVG export
+        ],
+        # Only needed when you export the container flow to Apache Parquet or Feather
+        'arrow': [
+            'pyarrow',
         ]
     },
     license='MIT',